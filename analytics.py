@@ -0,0 +1,181 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from encoding import ORGANIZATIONS, from_cents
+
+
+# Auflösungen: Name → Breite eines Buckets in Sekunden
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Ohne ?start= liefert eine Abfrage so viele Buckets bis ?end=
+DEFAULT_BUCKETS = 60
+
+# Höchstens so viele Buckets pro Abfrage (längere Zeiträume werden vorne gekürzt)
+MAX_BUCKETS = 1440
+
+_ORG_INDEX = {org: i for i, org in enumerate(ORGANIZATIONS)}
+_COLUMNS = len(ORGANIZATIONS)
+
+
+class Rollup:
+    """
+    Spendensummen pro Organisation in Zeit-Buckets einer Auflösung.
+
+    Gespeichert werden nur Buckets mit Spenden: 'starts' enthält die
+    Bucket-Anfänge (Unix-Zeit) aufsteigend, 'values' die Summen in Cent
+    zeilenweise (eine Zeile pro Bucket, eine Spalte pro Organisation in der
+    Reihenfolge von ORGANIZATIONS). Beides sind array('q'); Bereichssummen
+    laufen über Slices der Arrays statt über einzelne Blöcke.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self.starts = array("q")
+        self.values = array("q")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _row(self, timestamp: float, create: bool) -> Optional[int]:
+        """Zeile des Buckets für 'timestamp' (mit create: wird bei Bedarf angelegt)."""
+        start = int(timestamp // self.width) * self.width
+        # Blöcke kommen fast immer in Zeitreihenfolge: zuerst den letzten Bucket prüfen
+        if self.starts and self.starts[-1] == start:
+            return len(self.starts) - 1
+        row = bisect_left(self.starts, start)
+        if row < len(self.starts) and self.starts[row] == start:
+            return row
+        if not create:
+            return None
+        self.starts.insert(row, start)
+        self.values[row * _COLUMNS:row * _COLUMNS] = array("q", bytes(8 * _COLUMNS))
+        return row
+
+    def add(self, timestamp: float, summary: Dict[str, int], sign: int = 1):
+        """
+        Addiert (sign=1) oder subtrahiert (sign=-1) die Spendensummen eines
+        Blocks im Bucket seines Zeitstempels. Leer gewordene Buckets werden
+        entfernt.
+        """
+        if not summary:
+            return
+        row = self._row(timestamp, create=sign > 0)
+        if row is None:
+            return
+        base = row * _COLUMNS
+        for org, cents in summary.items():
+            self.values[base + _ORG_INDEX[org]] += sign * cents
+        if sign < 0 and not any(self.values[base:base + _COLUMNS]):
+            del self.starts[row]
+            del self.values[base:base + _COLUMNS]
+
+    def query(self, start: float, end: float) -> Dict[str, Any]:
+        """
+        Buckets mit Spenden im Zeitraum [start, end) und die Summen darüber.
+
+        Returns:
+            {"buckets": [{"start", "total", "per_organization"}], "total", "per_organization"}
+        """
+        low = bisect_left(self.starts, int(start // self.width) * self.width)
+        high = bisect_left(self.starts, end)
+        starts = self.starts[low:high]
+        values = self.values[low * _COLUMNS:high * _COLUMNS]
+
+        buckets = []
+        for row, bucket_start in enumerate(starts):
+            cents = values[row * _COLUMNS:(row + 1) * _COLUMNS]
+            buckets.append({
+                "start": bucket_start,
+                "total": from_cents(sum(cents)),
+                "per_organization": {org: from_cents(cents[i]) for i, org in enumerate(ORGANIZATIONS)}
+            })
+        # Spaltensummen: jede Organisation als Slice mit Schrittweite _COLUMNS
+        totals = [sum(values[i::_COLUMNS]) for i in range(_COLUMNS)]
+        return {
+            "buckets": buckets,
+            "total": from_cents(sum(totals)),
+            "per_organization": {org: from_cents(totals[i]) for i, org in enumerate(ORGANIZATIONS)}
+        }
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return {"starts": self.starts.tolist(), "values": self.values.tolist()}
+
+    @classmethod
+    def from_dict(cls, width: int, data: Dict[str, List[int]]) -> "Rollup":
+        rollup = cls(width)
+        rollup.starts = array("q", data["starts"])
+        rollup.values = array("q", data["values"])
+        if len(rollup.values) != len(rollup.starts) * _COLUMNS:
+            raise ValueError("Rollup-Daten passen nicht zur Anzahl Organisationen")
+        return rollup
+
+
+class DonationAnalytics:
+    """
+    Spendensummen pro Organisation nach Minute, Stunde und Tag.
+
+    Wird wie die Gesamtsummen pro Block fortgeschrieben (Blockchain._apply_block),
+    beim Zurückrollen von Blöcken um deren Summen verringert und in Snapshots
+    gespeichert. Maßgeblich ist der Zeitstempel des Blocks: er ist auf allen
+    Nodes gleich und auch bei gekürzten Blöcken (nur Summary) vorhanden.
+    """
+
+    def __init__(self, rollups: Optional[Dict[str, Rollup]] = None):
+        self.rollups = rollups or {name: Rollup(width) for name, width in RESOLUTIONS.items()}
+        # Abfragen laufen ohne den Blockchain-Lock (der beim Mining gehalten wird)
+        self._lock = threading.Lock()
+
+    def add_block(self, timestamp: float, summary: Dict[str, int]):
+        with self._lock:
+            for rollup in self.rollups.values():
+                rollup.add(timestamp, summary)
+
+    def remove_block(self, timestamp: float, summary: Dict[str, int]):
+        with self._lock:
+            for rollup in self.rollups.values():
+                rollup.add(timestamp, summary, sign=-1)
+
+    def query(self, resolution: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Spenden pro Bucket im Zeitraum [start, end).
+
+        Args:
+            resolution: "minute", "hour" oder "day"
+            start: Unix-Zeit (Standard: DEFAULT_BUCKETS Buckets vor 'end')
+            end: Unix-Zeit (Standard: jetzt, einschließlich des laufenden Buckets)
+
+        Returns:
+            {"resolution", "start", "end", "buckets", "total", "per_organization"};
+            Buckets ohne Spenden werden ausgelassen
+
+        Raises:
+            ValueError: bei unbekannter Auflösung
+        """
+        if resolution not in self.rollups:
+            raise ValueError(f"Unbekannte Auflösung: {resolution}")
+        width = RESOLUTIONS[resolution]
+        if end is None:
+            end = (int(time.time() // width) + 1) * width
+        if start is None:
+            start = end - DEFAULT_BUCKETS * width
+        start = max(start, end - MAX_BUCKETS * width)
+
+        with self._lock:
+            result = self.rollups[resolution].query(start, end)
+        return dict(result, resolution=resolution, start=start, end=end)
+
+    def to_dict(self) -> Dict[str, Dict[str, List[int]]]:
+        with self._lock:
+            return {name: rollup.to_dict() for name, rollup in self.rollups.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, List[int]]]) -> "DonationAnalytics":
+        """
+        Raises:
+            ValueError, KeyError: wenn die Daten nicht zu RESOLUTIONS/ORGANIZATIONS passen
+        """
+        return cls({name: Rollup.from_dict(width, data[name]) for name, width in RESOLUTIONS.items()})
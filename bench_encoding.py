@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON vs. Binärkodierung für Blöcke
+Vergleicht Kodieren, Dekodieren, Hashen und Größe auf einer synthetischen Chain.
+
+Aufruf:
+    python3 bench_encoding.py [--blocks 200] [--seed 42] [--output ergebnis.json]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import timeit
+
+from encoding import (ORGANIZATIONS, block_header, block_summary, encode_chain, decode_chain,
+                      encode_block, decode_block, encode_nonce, transaction_root)
+from mempool import transaction_id
+
+
+def synthetic_chain(blocks: int, seed: int, transactions_per_block: int = 5):
+    """Erzeugt eine reproduzierbare Chain (Liste von Block-Dictionaries, nicht gemined)."""
+    rng = random.Random(seed)
+    chain = []
+    previous_hash = "0"
+    timestamp = 1735689600.0
+
+    for index in range(blocks):
+        transactions = []
+        for _ in range(transactions_per_block):
+            timestamp = round(timestamp + rng.uniform(0.5, 30.0), 6)
+            tx = {
+                "sender": f"Spender{rng.randint(1, 500)}",
+                "recipient": rng.choice(ORGANIZATIONS),
+                "amount": rng.choice([5, 10, 20, 50, 100]) + rng.randint(0, 99) / 100,
+                "timestamp": timestamp
+            }
+            tx["id"] = transaction_id(tx)
+            transactions.append(tx)
+
+        block_hash = "".join(rng.choice("0123456789abcdef") for _ in range(64))
+        chain.append({
+            "index": index,
+            "transactions": transactions,
+            "previous_hash": previous_hash,
+            "timestamp": timestamp,
+            "nonce": rng.randint(0, 10**6),
+            "hash": block_hash
+        })
+        previous_hash = block_hash
+
+    return chain
+
+
+def _json_block_hash(block_data):
+    """Bisheriger Hash-Pfad: json.dumps(sort_keys=True) + SHA-256."""
+    block_string = json.dumps({
+        "index": block_data["index"],
+        "transactions": block_data["transactions"],
+        "previous_hash": block_data["previous_hash"],
+        "timestamp": block_data["timestamp"],
+        "nonce": block_data["nonce"]
+    }, sort_keys=True)
+    return hashlib.sha256(block_string.encode()).hexdigest()
+
+
+def _binary_block_hash(block_data):
+    """Neuer Hash-Pfad: Header (Merkle-Wurzel, Summary) + Nonce, SHA-256."""
+    transactions = block_data["transactions"]
+    header = block_header(block_data["index"], block_data["timestamp"], block_data["previous_hash"],
+                          transaction_root(transactions), block_summary(transactions), len(transactions))
+    return hashlib.sha256(header + encode_nonce(block_data["nonce"])).hexdigest()
+
+
+def _measure(func, repeat: int) -> float:
+    """Beste Zeit pro Aufruf in Millisekunden."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def run(blocks: int = 200, seed: int = 42, repeat: int = 5):
+    """Führt den Vergleich aus und gibt die Ergebnisse als Dictionary zurück."""
+    chain = synthetic_chain(blocks, seed)
+    block = chain[len(chain) // 2]
+
+    json_chain = json.dumps({"chain": chain, "length": len(chain)})
+    binary_chain = encode_chain(chain)
+    json_block = json.dumps(block)
+    binary_block = encode_block(block)
+
+    return {
+        "blocks": blocks,
+        "seed": seed,
+        "size_bytes": {
+            "json_chain": len(json_chain.encode()),
+            "binary_chain": len(binary_chain),
+        },
+        "ms": {
+            "json_encode_chain": _measure(lambda: json.dumps({"chain": chain, "length": len(chain)}), repeat),
+            "binary_encode_chain": _measure(lambda: encode_chain(chain), repeat),
+            "json_decode_chain": _measure(lambda: json.loads(json_chain), repeat),
+            "binary_decode_chain": _measure(lambda: decode_chain(binary_chain), repeat),
+            "json_encode_block": _measure(lambda: json.dumps(block), repeat),
+            "binary_encode_block": _measure(lambda: encode_block(block), repeat),
+            "json_decode_block": _measure(lambda: json.loads(json_block), repeat),
+            "binary_decode_block": _measure(lambda: decode_block(binary_block), repeat),
+            "json_hash_block": _measure(lambda: _json_block_hash(block), repeat),
+            "binary_hash_block": _measure(lambda: _binary_block_hash(block), repeat),
+        }
+    }
+
+
+def print_results(results):
+    print("\n" + "="*60)
+    print(f"  ENCODING BENCHMARK ({results['blocks']} Blöcke, Seed {results['seed']})")
+    print("="*60)
+
+    sizes = results["size_bytes"]
+    print(f"Größe Chain:  JSON {sizes['json_chain']:>9} B | "
+          f"Binär {sizes['binary_chain']:>9} B "
+          f"({sizes['binary_chain'] / sizes['json_chain']:.0%})")
+
+    ms = results["ms"]
+    for operation in ["encode_chain", "decode_chain", "encode_block", "decode_block", "hash_block"]:
+        json_ms = ms[f"json_{operation}"]
+        binary_ms = ms[f"binary_{operation}"]
+        print(f"{operation:<13} JSON {json_ms:>9.4f} ms | Binär {binary_ms:>9.4f} ms "
+              f"(Faktor {json_ms / binary_ms:.2f})")
+    print("Faktor = JSON-Zeit / Binär-Zeit (unter 1: Binär langsamer)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON vs. Binärkodierung")
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    results = run(blocks=args.blocks, seed=args.seed, repeat=args.repeat)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Ergebnisse gespeichert: {args.output}")
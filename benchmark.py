@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite für Mining, Validierung, Sync und API-Durchsatz
+Läuft offline auf einem Rechner (Flask-Testclient, keine Peers).
+Synthetische Chains werden mit festem Seed erzeugt, damit Ergebnisse
+zwischen Commits vergleichbar sind.
+
+Aufruf:
+    python3 benchmark.py                       # Ergebnisse nach benchmark_results/<commit>.json
+    python3 benchmark.py --quick               # kleinere Größen (schneller Überblick)
+    python3 benchmark.py --compare benchmark_results/abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from blockchain import Block, Blockchain
+from encoding import ORGANIZATIONS
+from mempool import transaction_id
+
+
+RESULTS_DIR = "benchmark_results"
+
+# Ab dieser relativen Änderung wird ein Wert beim Vergleich markiert
+REGRESSION_THRESHOLD = 0.10
+
+
+# ==================== SYNTHETISCHE DATEN ====================
+
+def synthetic_transactions(rng: random.Random, count: int, start_time: float):
+    """Erzeugt 'count' reproduzierbare Spenden ab 'start_time'."""
+    transactions = []
+    timestamp = start_time
+    for _ in range(count):
+        timestamp = round(timestamp + rng.uniform(0.5, 30.0), 6)
+        tx = {
+            "sender": f"Spender{rng.randint(1, 500)}",
+            "recipient": rng.choice(ORGANIZATIONS),
+            "amount": rng.choice([5, 10, 20, 50, 100]) + rng.randint(0, 99) / 100,
+            "timestamp": timestamp
+        }
+        tx["id"] = transaction_id(tx)
+        transactions.append(tx)
+    return transactions
+
+
+def build_chain(length: int, difficulty: int = 2, seed: int = 42,
+                transactions_per_block: int = 5) -> Blockchain:
+    """
+    Baut eine gültige, geminte Chain mit 'length' Blöcken (inkl. Genesis),
+    samt abgeleitetem Zustand (Spendensummen, Index, Analytics) wie nach
+    dem Laden oder Mining auf einem Node.
+    Gleicher Seed → gleiche Chain (gleiche Hashes, gleiche Nonces).
+    """
+    rng = random.Random(seed)
+    blockchain = Blockchain(difficulty=difficulty)
+    timestamp = blockchain.chain[0].timestamp
+
+    for index in range(1, length):
+        transactions = synthetic_transactions(rng, transactions_per_block, timestamp)
+        timestamp = transactions[-1]["timestamp"]
+        block = Block(index, transactions, blockchain.get_latest_block().hash, timestamp=timestamp)
+        block.mine_block(difficulty)
+        blockchain.chain.append(block)
+        blockchain._apply_block(block)
+
+    blockchain.validated_height = len(blockchain.chain)
+    return blockchain
+
+
+# ==================== MESSUNGEN ====================
+
+def _best_of(func, repeat: int) -> float:
+    """Beste Laufzeit (Sekunden) aus 'repeat' Durchläufen."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_mining(difficulties, blocks_per_difficulty: int, seed: int):
+    """Hashrate von Block.mine_block je Schwierigkeit."""
+    results = {}
+    for difficulty in difficulties:
+        rng = random.Random(seed)
+        hashes = 0
+        seconds = 0.0
+        for index in range(1, blocks_per_difficulty + 1):
+            transactions = synthetic_transactions(rng, 5, 1735689600.0 + index * 600)
+            block = Block(index, transactions, "0" * 64, timestamp=transactions[-1]["timestamp"])
+            start = time.perf_counter()
+            block.mine_block(difficulty)
+            seconds += time.perf_counter() - start
+            hashes += block.nonce
+        results[str(difficulty)] = {
+            "hashes": hashes,
+            "seconds": seconds,
+            "hashrate": hashes / seconds if seconds else 0.0,
+            "seconds_per_block": seconds / blocks_per_difficulty
+        }
+    return results
+
+
+def bench_validation(lengths, difficulty: int, seed: int, repeat: int):
+    """is_chain_valid und replace_chain in Abhängigkeit von der Chain-Länge."""
+    results = {}
+    for length in lengths:
+        blockchain = build_chain(length, difficulty, seed)
+        chain_data = blockchain.get_chain_data()
+
+        def replace():
+            # Frische, kürzere Chain ersetzen lassen (nur Genesis)
+            Blockchain(difficulty=difficulty).replace_chain(chain_data)
+
+        results[str(length)] = {
+            "is_chain_valid_ms": _best_of(blockchain.is_chain_valid, repeat) * 1000,
+            "replace_chain_ms": _best_of(replace, repeat) * 1000
+        }
+    return results
+
+
+def bench_api(history_sizes, difficulty: int, seed: int, requests_per_size: int):
+    """Latenz von GET /stats und GET /chain in Abhängigkeit von der Historie."""
+    import node
+    client = node.app.test_client()
+    results = {}
+
+    for size in history_sizes:
+        node.blockchain = build_chain(size, difficulty, seed)
+        entry = {}
+        for endpoint in ["/stats", "/chain"]:
+            latencies = []
+            for _ in range(requests_per_size):
+                start = time.perf_counter()
+                response = client.get(endpoint)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, f"{endpoint}: {response.status_code}"
+            key = endpoint.strip("/")
+            entry[f"{key}_p50_ms"] = statistics.median(latencies) * 1000
+            entry[f"{key}_max_ms"] = max(latencies) * 1000
+        entry["chain_bytes"] = len(client.get("/chain").data)
+        results[str(size)] = entry
+
+    return results
+
+
+def bench_ingestion(transactions: int, difficulty: int, seed: int):
+    """Durchsatz von POST /transactions/new (inkl. Auto-Mining alle 5 Transaktionen)."""
+    import node
+    client = node.app.test_client()
+    node.blockchain = Blockchain(difficulty=difficulty)
+    node.peer_nodes.clear()
+
+    rng = random.Random(seed)
+    payloads = [{
+        "sender": f"Spender{rng.randint(1, 500)}",
+        "recipient": rng.choice(ORGANIZATIONS),
+        "amount": rng.choice([5, 10, 20, 50])
+    } for _ in range(transactions)]
+
+    latencies = []
+    start = time.perf_counter()
+    for payload in payloads:
+        request_start = time.perf_counter()
+        response = client.post("/transactions/new", json=payload)
+        latencies.append(time.perf_counter() - request_start)
+        assert response.status_code == 201, response.get_json()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "transactions": transactions,
+        "difficulty": difficulty,
+        "seconds": seconds,
+        "transactions_per_second": transactions / seconds,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "blocks": len(node.blockchain.chain)
+    }
+
+
+# ==================== ERGEBNISSE ====================
+
+def git_commit() -> str:
+    """Aktueller Commit (kurz), oder "unknown" außerhalb eines Git-Repos."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(quick: bool = False, seed: int = 42):
+    """Führt alle Benchmarks aus und gibt die Ergebnisse als Dictionary zurück."""
+    if quick:
+        config = {"difficulties": [1, 2, 3], "mining_blocks": 5, "lengths": [10, 50],
+                  "history_sizes": [10, 50], "api_requests": 10, "ingestion": 50}
+    else:
+        config = {"difficulties": [1, 2, 3, 4], "mining_blocks": 10, "lengths": [10, 100, 500],
+                  "history_sizes": [10, 100, 500], "api_requests": 30, "ingestion": 200}
+
+    print("⛏️  Mining...")
+    mining = bench_mining(config["difficulties"], config["mining_blocks"], seed)
+    print("🔍 Validierung / replace_chain...")
+    validation = bench_validation(config["lengths"], difficulty=2, seed=seed, repeat=3)
+    print("📡 API-Latenz...")
+    api = bench_api(config["history_sizes"], difficulty=2, seed=seed,
+                    requests_per_size=config["api_requests"])
+    print("📥 Spenden-Durchsatz...")
+    ingestion = bench_ingestion(config["ingestion"], difficulty=2, seed=seed)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "quick": quick
+        },
+        "mining": mining,
+        "validation": validation,
+        "api": api,
+        "ingestion": ingestion
+    }
+
+
+def _flatten(results, prefix=""):
+    """{"a": {"b": 1}} → {"a.b": 1} (nur Zahlen, ohne "meta")."""
+    flat = {}
+    for key, value in results.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def _higher_is_better(path: str) -> bool:
+    return path.endswith("hashrate") or path.endswith("per_second")
+
+
+def compare(current, baseline):
+    """Gibt die relativen Änderungen gegenüber einem früheren Ergebnis aus."""
+    print("\n" + "="*60)
+    print(f"  VERGLEICH {baseline['meta']['commit']} → {current['meta']['commit']}")
+    print("="*60)
+
+    old = _flatten(baseline)
+    regressions = 0
+    for path, value in _flatten(current).items():
+        # Maximalwerte sind zu verrauscht für einen sinnvollen Vergleich
+        if path not in old or not old[path] or path.endswith("_max_ms") or not any(
+                path.endswith(suffix) for suffix in ("_ms", "hashrate", "per_second", "_bytes")):
+            continue
+        change = (value - old[path]) / old[path]
+        worse = -change if _higher_is_better(path) else change
+        marker = "❌" if worse > REGRESSION_THRESHOLD else ("✅" if worse < -REGRESSION_THRESHOLD else "  ")
+        regressions += worse > REGRESSION_THRESHOLD
+        print(f"{marker} {path:<45} {old[path]:>12.3f} → {value:>12.3f} ({change:+.1%})")
+
+    print(f"\n{regressions} mögliche Regression(en) (Schwelle {REGRESSION_THRESHOLD:.0%})")
+    print("="*60 + "\n")
+    return regressions
+
+
+def print_summary(results):
+    print("\n" + "="*60)
+    print(f"  BENCHMARK {results['meta']['commit']}")
+    print("="*60)
+    for difficulty, entry in results["mining"].items():
+        print(f"Mining d={difficulty}: {entry['hashrate']:>12.0f} H/s, {entry['seconds_per_block']*1000:>9.2f} ms/Block")
+    for length, entry in results["validation"].items():
+        print(f"Chain {length:>5} Blöcke: is_chain_valid {entry['is_chain_valid_ms']:>8.2f} ms, "
+              f"replace_chain {entry['replace_chain_ms']:>8.2f} ms")
+    for size, entry in results["api"].items():
+        print(f"API {size:>5} Blöcke: /stats {entry['stats_p50_ms']:>7.2f} ms, "
+              f"/chain {entry['chain_p50_ms']:>7.2f} ms ({entry['chain_bytes']} B)")
+    ingestion = results["ingestion"]
+    print(f"Spenden: {ingestion['transactions_per_second']:.1f} Tx/s "
+          f"(p50 {ingestion['p50_ms']:.2f} ms, p99 {ingestion['p99_ms']:.2f} ms)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark-Suite der Blockchain")
+    parser.add_argument("--quick", action="store_true", help="Kleinere Größen")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help=f"Ergebnis-Datei (Standard: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--compare", help="Früheres Ergebnis zum Vergleich")
+    args = parser.parse_args()
+
+    results = run_suite(quick=args.quick, seed=args.seed)
+    print_summary(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Ergebnisse gespeichert: {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(results, baseline) else 0)
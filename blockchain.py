@@ -1,13 +1,45 @@
 import hashlib
 import json
+import threading
 import time
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from analytics import DonationAnalytics
+from encoding import (ORGANIZATIONS, block_header, block_summary, decode_block_meta, decode_block_transactions,
+                      encode_nonce, encode_transaction, from_cents, to_cents, transaction_root)
+from merkle import merkle_proof
+from mempool import Mempool, EVICT_OLDEST, transaction_id
+from metrics import REGISTRY
+from log import SUMMARY, get_logger, kv, rate_limited
+from profiler import profiled
+from storage import ChainStore
+
+
+log = get_logger("blockchain")
+
+
+# Metriken (Abruf über GET /metrics). Beim Mining wird nur einmal pro Block gemessen.
+BLOCKS_MINED = REGISTRY.counter("blockchain_blocks_mined_total", "Anzahl geminter Blöcke")
+HASHES = REGISTRY.counter("blockchain_hashes_total", "Beim Mining berechnete Hashes")
+HASHRATE = REGISTRY.gauge("blockchain_hashrate", "Hashrate beim zuletzt geminten Block (Hashes/s)")
+MINING_SECONDS = REGISTRY.histogram("blockchain_mining_seconds", "Mining-Dauer pro Block in Sekunden")
+VALIDATION_SECONDS = REGISTRY.histogram("blockchain_chain_validation_seconds",
+                                        "Dauer von is_chain_valid in Sekunden")
+REPLACE_SECONDS = REGISTRY.histogram("blockchain_replace_chain_seconds",
+                                     "Dauer von replace_chain in Sekunden")
+# Konsens-Phasen: fetch und decode misst node.py, validate und swap replace_chain bzw. extend_chain
+CONSENSUS_PHASE_SECONDS = REGISTRY.histogram(
+    "consensus_phase_seconds", "Dauer der Konsens-Phasen (fetch, decode, validate, swap) in Sekunden",
+    ["phase"])
 
 
 class Block:
     """
     Ein Block in der Blockchain.
     Enthält Transaktionen und ist mit dem vorherigen Block verkettet.
+    
+    Gekürzte Blöcke (pruned) enthalten nur noch den Header (inkl. Merkle-Wurzel
+    und Anzahl der Transaktionen) und die Spendensummen pro Organisation.
     """
     
     def __init__(self, index: int, transactions: List[Dict], previous_hash: str, timestamp: float = None):
@@ -21,32 +53,90 @@ class Block:
             timestamp: Zeitpunkt der Block-Erstellung (optional)
         """
         self.index = index
+        self._record: Optional[bytes] = None   # Binärkodierung, solange die Transaktionen nicht dekodiert sind
         self.transactions = transactions
         self.previous_hash = previous_hash
-        self.timestamp = timestamp or time.time()
+        # Auf Mikrosekunden gerundet, damit der Zeitstempel exakt kodiert werden kann
+        self.timestamp = timestamp or round(time.time(), 6)
         self.nonce = 0  # Wird beim Mining verändert
         self.hash = ""  # Wird beim Mining berechnet
+        
+        # Nur bei gekürzten Blöcken gesetzt (sonst aus den Transaktionen berechnet)
+        self.pruned = False
+        self.tx_root = ""                    # Merkle-Wurzel (Hex)
+        self.tx_count = 0
+        self.summary: Dict[str, int] = {}    # Organisation → Summe in Cent
+    
+    @property
+    def transactions(self) -> List[Dict]:
+        """Transaktionen; bei aus dem Speicher geladenen Blöcken erst beim ersten Zugriff dekodiert."""
+        # Erst den Datensatz lesen: der Setter leert ihn erst nach dem Setzen der Liste
+        record = self._record
+        transactions = self._transactions
+        if transactions is None:
+            transactions = self._transactions = decode_block_transactions(record)
+        return transactions
+    
+    @transactions.setter
+    def transactions(self, transactions: List[Dict]):
+        self._transactions = transactions
+        self._record = None
+    
+    def donation_summary(self) -> Dict[str, int]:
+        """Spendensumme pro Organisation in Cent."""
+        return self.summary if self.pruned else block_summary(self.transactions)
+    
+    def header(self) -> bytes:
+        """Kanonische Binärkodierung aller gehashten Block-Daten außer der Nonce."""
+        if self.pruned:
+            return block_header(self.index, self.timestamp, self.previous_hash,
+                                bytes.fromhex(self.tx_root), self.summary, self.tx_count)
+        return block_header(self.index, self.timestamp, self.previous_hash,
+                            transaction_root(self.transactions), block_summary(self.transactions),
+                            len(self.transactions))
     
     def calculate_hash(self) -> str:
         """
         Berechnet den SHA-256 Hash dieses Blocks.
-        Der Hash hängt von allen Block-Daten ab, inkl. Nonce.
+        Der Hash hängt vom Header ab (Transaktionen über die Merkle-Wurzel,
+        Spendensummen über den Summary-Hash) und von der Nonce
+        (kanonische Binärkodierung, siehe encoding.py).
         
         Returns:
             Hex-String des Hash-Werts
         """
-        # Alle Block-Daten in einen String umwandeln
-        block_string = json.dumps({
+        return hashlib.sha256(self.header() + encode_nonce(self.nonce)).hexdigest()
+    
+    def header_data(self) -> Dict[str, Any]:
+        """Header-Daten ohne Transaktionen (für Light-Clients, siehe encoding.encode_headers)."""
+        if self.pruned:
+            tx_root, tx_count, summary = self.tx_root, self.tx_count, self.summary
+        else:
+            tx_root = transaction_root(self.transactions).hex()
+            tx_count = len(self.transactions)
+            summary = block_summary(self.transactions)
+        return {
             "index": self.index,
-            "transactions": self.transactions,
-            "previous_hash": self.previous_hash,
             "timestamp": self.timestamp,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        
-        # SHA-256 Hash berechnen
-        return hashlib.sha256(block_string.encode()).hexdigest()
+            "previous_hash": self.previous_hash,
+            "tx_root": tx_root,
+            "tx_count": tx_count,
+            "summary": {org: from_cents(cents) for org, cents in summary.items()},
+            "nonce": self.nonce,
+            "hash": self.hash
+        }
     
+    def prune(self):
+        """Entfernt die Transaktionen, behält Header-Daten und Spendensummen."""
+        if self.pruned:
+            return
+        self.tx_root = transaction_root(self.transactions).hex()
+        self.tx_count = len(self.transactions)
+        self.summary = block_summary(self.transactions)
+        self.pruned = True
+        self.transactions = []
+    
+    @profiled
     def mine_block(self, difficulty: int):
         """
         Proof-of-Work: Findet eine Nonce, sodass der Hash mit 'difficulty' Nullen beginnt.
@@ -57,20 +147,67 @@ class Block:
         # Ziel: Hash muss mit dieser Anzahl Nullen beginnen
         target = "0" * difficulty
         
-        print(f"⛏️  Mining Block {self.index}...")
+        log.debug("Mining gestartet", extra=kv(index=self.index, difficulty=difficulty))
         start_time = time.time()
         
+        # Block-Daten nur einmal kodieren und hashen, pro Versuch nur die Nonce anhängen
+        prefix_hash = hashlib.sha256(self.header())
+        
         # Solange probieren, bis der Hash die Bedingung erfüllt
         while not self.hash.startswith(target):
             self.nonce += 1
-            self.hash = self.calculate_hash()
+            attempt = prefix_hash.copy()
+            attempt.update(encode_nonce(self.nonce))
+            self.hash = attempt.hexdigest()
         
         mining_time = time.time() - start_time
-        print(f"✅ Block {self.index} gemined! Hash: {self.hash[:20]}... (Nonce: {self.nonce}, Zeit: {mining_time:.2f}s)")
+        BLOCKS_MINED.inc()
+        HASHES.inc(self.nonce)
+        MINING_SECONDS.observe(mining_time)
+        if mining_time > 0:
+            HASHRATE.set(self.nonce / mining_time)
+        log.log(SUMMARY, "Block gemined", extra=kv(
+            index=self.index, hash=self.hash[:20], nonce=self.nonce, seconds=round(mining_time, 3)))
+    
+    @classmethod
+    def from_dict(cls, block_data: Dict[str, Any]) -> "Block":
+        """Erstellt einen Block aus einem Dictionary (z.B. von einem Peer)."""
+        block = cls(
+            index=block_data['index'],
+            transactions=block_data['transactions'],
+            previous_hash=block_data['previous_hash'],
+            timestamp=block_data['timestamp']
+        )
+        block.nonce = block_data['nonce']
+        block.hash = block_data['hash']
+        if block_data.get('pruned'):
+            # Mitgeschickte Transaktionen sind nicht durch den Hash gedeckt (nur tx_root) - verwerfen
+            block.transactions = []
+            block.pruned = True
+            block.tx_root = block_data['tx_root']
+            block.tx_count = block_data['tx_count']
+            block.summary = {org: to_cents(amount) for org, amount in block_data['summary'].items()}
+        return block
+    
+    @classmethod
+    def from_record(cls, record: bytes) -> "Block":
+        """
+        Erstellt einen Block aus seiner gespeicherten Binärkodierung
+        (siehe ChainStore.load_records). Die Transaktionen werden erst beim
+        ersten Zugriff dekodiert.
+        
+        Raises:
+            ValueError: bei kaputten Header-Daten
+        """
+        block = cls.from_dict(dict(decode_block_meta(record), transactions=[]))
+        if not block.pruned:
+            block._transactions = None
+            block._record = record
+        return block
     
     def to_dict(self) -> Dict[str, Any]:
         """Konvertiert den Block in ein Dictionary (für JSON)."""
-        return {
+        block_data = {
             "index": self.index,
             "transactions": self.transactions,
             "previous_hash": self.previous_hash,
@@ -78,6 +215,95 @@ class Block:
             "nonce": self.nonce,
             "hash": self.hash
         }
+        if self.pruned:
+            block_data.update({
+                "pruned": True,
+                "tx_root": self.tx_root,
+                "tx_count": self.tx_count,
+                "summary": {org: from_cents(cents) for org, cents in self.summary.items()}
+            })
+        return block_data
+
+
+# Fester Zeitstempel des Genesis-Blocks (1. Januar 2025, 00:00 UTC).
+# Dadurch ist der Genesis-Block auf allen Nodes identisch.
+GENESIS_TIMESTAMP = 1735689600.0
+
+# Vorberechnete Nonces des Genesis-Blocks je Schwierigkeit.
+# Neu berechnen, wenn sich Genesis-Inhalt oder Hash-Berechnung ändern:
+#   python3 -c "from blockchain import _mine_genesis; print(_mine_genesis(4).nonce)"
+GENESIS_NONCES = {
+    1: 29,
+    2: 30,
+    3: 7391,
+    4: 9664,
+    5: 1217453,
+    6: 12695281,
+}
+
+# Alle wie viele Blöcke ein Snapshot des abgeleiteten Zustands geschrieben wird
+SNAPSHOT_INTERVAL = 100
+
+# Gekürzt wird in Schüben, damit blocks.dat nicht bei jedem Block neu geschrieben wird
+PRUNE_BATCH = 100
+
+# Bereits geprüfte Genesis-Blöcke (Schwierigkeit → Block-Daten), pro Prozess
+_genesis_cache: Dict[int, Dict[str, Any]] = {}
+
+
+def _genesis_template() -> Block:
+    """Erstellt den (noch nicht geminten) Genesis-Block mit festem Inhalt."""
+    transaction = {
+        "sender": "System",
+        "recipient": "Genesis",
+        "amount": 0,
+        "timestamp": GENESIS_TIMESTAMP
+    }
+    transaction["id"] = transaction_id(transaction)
+    return Block(
+        index=0,
+        transactions=[transaction],
+        previous_hash="0",
+        timestamp=GENESIS_TIMESTAMP
+    )
+
+
+def _mine_genesis(difficulty: int) -> Block:
+    """Mined den Genesis-Block für eine Schwierigkeit (nur für neue Schwierigkeiten nötig)."""
+    block = _genesis_template()
+    block.mine_block(difficulty)
+    return block
+
+
+def genesis_block(difficulty: int) -> Block:
+    """
+    Gibt den deterministischen Genesis-Block für eine Schwierigkeit zurück.
+    Die vorberechnete Nonce wird beim ersten Aufruf einmal geprüft und danach
+    aus dem Cache geladen. Für unbekannte Schwierigkeiten wird einmal gemined.
+    
+    Args:
+        difficulty: Mining-Schwierigkeit
+        
+    Returns:
+        Eine neue Kopie des Genesis-Blocks
+    """
+    if difficulty not in _genesis_cache:
+        block = _genesis_template()
+        nonce = GENESIS_NONCES.get(difficulty)
+        
+        if nonce is not None:
+            block.nonce = nonce
+            block.hash = block.calculate_hash()
+        
+        if nonce is None or not block.hash.startswith("0" * difficulty):
+            log.warning("Keine gültige Genesis-Nonce - mine neu", extra=kv(difficulty=difficulty))
+            block = _mine_genesis(difficulty)
+        
+        _genesis_cache[difficulty] = block.to_dict()
+    
+    # Kopie zurückgeben, damit Änderungen den Cache nicht beeinflussen
+    block_data = json.loads(json.dumps(_genesis_cache[difficulty]))
+    return Block.from_dict(block_data)
 
 
 class Blockchain:
@@ -86,42 +312,287 @@ class Blockchain:
     Verwaltet die Kette von Blöcken, den Mempool und das Mining.
     """
     
-    def __init__(self, difficulty: int = 4):
+    def __init__(self, difficulty: int = 4, mempool_max_size: int = 1000,
+                 mempool_max_bytes: int = 1_000_000, mempool_eviction: str = EVICT_OLDEST,
+                 store: Optional[ChainStore] = None, snapshot_interval: int = SNAPSHOT_INTERVAL,
+                 prune_depth: Optional[int] = None):
         """
         Initialisiert eine neue Blockchain.
         
         Args:
             difficulty: Mining-Schwierigkeit (Anzahl führender Nullen)
+            mempool_max_size: Maximale Anzahl wartender Transaktionen
+            mempool_max_bytes: Maximaler Speicher des Mempools in Bytes
+            mempool_eviction: Strategie bei vollem Mempool ("oldest" oder "reject")
+            store: Speicher für Blöcke und Snapshots (None = nur im Arbeitsspeicher)
+            snapshot_interval: Alle wie viele Blöcke ein Snapshot geschrieben wird
+            prune_depth: Nur die neuesten 'prune_depth' Blöcke mit Transaktionen
+                behalten, ältere kürzen (None = Archiv, alles behalten)
         """
         self.chain: List[Block] = []
         self.difficulty = difficulty
-        self.mempool: List[Dict] = []  # Noch nicht geminte Transaktionen
+        # Noch nicht geminte Transaktionen
+        self.mempool = Mempool(
+            max_size=mempool_max_size,
+            max_bytes=mempool_max_bytes,
+            eviction_policy=mempool_eviction
+        )
         self.max_transactions_per_block = 5  # Blöcke mit max. 5 Transaktionen
         
+        # Abgeleiteter Zustand, wird pro Block fortgeschrieben (siehe _apply_block)
+        # und in Snapshots gespeichert (der Transaktions-Index in txindex.dat)
+        self._tx_index: Optional[Dict[str, int]] = {}  # Transaktions-ID → Block-Index (None = noch nicht geladen)
+        self.donation_totals: Dict[str, int] = {org: 0 for org in ORGANIZATIONS}  # Organisation → Cent
+        self.analytics = DonationAnalytics()         # Summen pro Minute/Stunde/Tag
+        self.validated_height = 0                    # Anzahl geprüfter Blöcke
+        
+        # Ergebnis der letzten vollständigen Prüfung (siehe audit_chain, None = noch nicht geprüft)
+        self.chain_valid: Optional[bool] = None
+        
+        # Schützt Mining und Chain-Ersetzung vor gleichzeitigen Request-Threads
+        self._lock = threading.RLock()
+        
+        self.store = store
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_height = 0
+        
+        self.prune_depth = prune_depth
+        self.pruned_height = 1   # Blöcke 1 .. pruned_height-1 sind gekürzt (Genesis nie)
+        
         # Genesis Block erstellen (der erste Block)
         self.create_genesis_block()
+        
+        # Gespeicherte Chain laden (Snapshot + nur die Blöcke danach prüfen)
+        if self.store is not None:
+            self._load_from_store()
     
     def create_genesis_block(self):
-        """Erstellt den ersten Block in der Chain."""
-        genesis_block = Block(
-            index=0,
-            transactions=[{
-                "sender": "System",
-                "recipient": "Genesis",
-                "amount": 0,
-                "timestamp": time.time()
-            }],
-            previous_hash="0"
-        )
-        genesis_block.mine_block(self.difficulty)
-        self.chain.append(genesis_block)
-        print(f"🎉 Genesis Block erstellt!\n")
+        """
+        Fügt den ersten Block in die Chain ein.
+        Der Genesis-Block ist vorberechnet und auf allen Nodes gleich
+        (gemeinsame Wurzel für den Konsens), es wird nicht gemined.
+        """
+        block = genesis_block(self.difficulty)
+        self.chain.append(block)
+        self._apply_block(block)
+        self.validated_height = 1
+    
+    @property
+    def tx_index(self) -> Dict[str, int]:
+        """Transaktions-ID → Block-Index; nach einem Neustart erst beim ersten Zugriff aus txindex.dat gelesen."""
+        if self._tx_index is None:
+            with self._lock:
+                if self._tx_index is None:
+                    self._tx_index = self.store.load_tx_index()
+        return self._tx_index
+    
+    @tx_index.setter
+    def tx_index(self, tx_index: Dict[str, int]):
+        self._tx_index = tx_index
+    
+    def _reset_derived_state(self):
+        self.tx_index = {}
+        self.donation_totals = {org: 0 for org in ORGANIZATIONS}
+        self.analytics = DonationAnalytics()
+        self.validated_height = 0
+    
+    def _apply_block(self, block: Block):
+        """Schreibt den abgeleiteten Zustand (Index, Spendensummen, Analytics) für einen Block fort."""
+        # Noch nicht geladener Index: txindex.dat wird in _persist bzw. _sync_tx_index fortgeschrieben
+        if self._tx_index is not None:
+            for tx in block.transactions:
+                if "id" in tx:
+                    self._tx_index[tx["id"]] = block.index
+        summary = block.donation_summary()
+        for org, cents in summary.items():
+            self.donation_totals[org] = self.donation_totals.get(org, 0) + cents
+        self.analytics.add_block(block.timestamp, summary)
+    
+    def get_donation_totals(self) -> Dict[str, Any]:
+        """
+        Spendensummen ohne Durchlauf durch die Chain.
+        
+        Returns:
+            {"total": Gesamtsumme, "per_organization": {Organisation: Summe}}
+        """
+        per_organization = {org: from_cents(self.donation_totals.get(org, 0)) for org in ORGANIZATIONS}
+        return {
+            "total": from_cents(sum(self.donation_totals.values())),
+            "per_organization": per_organization
+        }
+    
+    # ==================== PERSISTENZ ====================
+    
+    def derived_state(self) -> Dict[str, Any]:
+        """Abgeleiteter Zustand für einen Snapshot, markiert mit Höhe und Tip-Hash."""
+        with self._lock:
+            return {
+                "height": len(self.chain),
+                "tip_hash": self.get_latest_block().hash,
+                "difficulty": self.difficulty,
+                "validated_height": self.validated_height,
+                "donation_totals": dict(self.donation_totals),
+                "analytics": self.analytics.to_dict(),
+                "created": time.time()
+            }
+    
+    def _restore_derived_state(self, state: Dict[str, Any]):
+        self.donation_totals = {org: state["donation_totals"].get(org, 0) for org in ORGANIZATIONS}
+        self.analytics = DonationAnalytics.from_dict(state["analytics"])
+        self.validated_height = state["validated_height"]
+    
+    def _load_from_store(self):
+        """
+        Lädt die gespeicherte Chain. Der abgeleitete Zustand kommt aus dem
+        neuesten Snapshot, der zur gespeicherten Chain passt; nur Blöcke nach
+        dem Snapshot werden geprüft und nachgespielt. Die Transaktionen der
+        Blöcke davor werden erst bei Bedarf dekodiert, der Transaktions-Index
+        erst beim ersten Zugriff gelesen - ein Neustart dauert so kaum länger,
+        wenn die Chain wächst. Die ganze Chain prüft audit_chain.
+        
+        Raises:
+            ValueError: wenn die gespeicherte Chain einen anderen Genesis-Block hat
+        """
+        start = time.perf_counter()
+        blocks: List[Block] = []
+        for record in self.store.load_records():
+            try:
+                blocks.append(Block.from_record(record))
+            except ValueError as e:
+                log.warning("Gespeicherte Chain ab Block unlesbar - wird abgeschnitten",
+                            extra=kv(block=len(blocks), error=e))
+                self.store.truncate(len(blocks))
+                break
+        if not blocks:
+            self.store.append(self.chain[0].to_dict())
+            self._sync_tx_index()
+            return
+        if blocks[0].hash != self.chain[0].hash:
+            raise ValueError("Gespeicherte Chain hat einen anderen Genesis-Block (andere Schwierigkeit?)")
+        self._tx_index = None
+        
+        # Neuester Snapshot, dessen Tip in der gespeicherten Chain liegt
+        resume_height = 1
+        for state in self.store.load_snapshots():
+            height = state.get("height", 0)
+            if (state.get("difficulty") == self.difficulty and 1 <= height <= len(blocks)
+                    and blocks[height - 1].hash == state.get("tip_hash")
+                    and state.get("validated_height") == height):
+                self._restore_derived_state(state)
+                self._snapshot_height = resume_height = height
+                break
+        
+        # Doppelte Transaktionen wurden vor dem Speichern geprüft (und wieder von audit_chain),
+        # hier nur, ob die Blöcke unbeschädigt sind
+        self.chain = blocks[:resume_height]
+        for block in blocks[resume_height:]:
+            if not self._is_valid_successor(block, self.chain[-1]):
+                log.warning("Gespeicherte Chain ab Block ungültig - wird abgeschnitten",
+                            extra=kv(block=block.index))
+                self.store.truncate(len(self.chain))
+                break
+            self.chain.append(block)
+            self._apply_block(block)
+        self.validated_height = len(self.chain)
+        self.pruned_height = next((block.index for block in self.chain[1:] if not block.pruned), len(self.chain))
+        self._sync_tx_index()
+        
+        log.log(SUMMARY, "Chain geladen", extra=kv(
+            length=len(self.chain), snapshot=resume_height if resume_height > 1 else None,
+            replayed=len(self.chain) - resume_height, seconds=round(time.perf_counter() - start, 3)))
+        self._maybe_prune()
+        self._maybe_snapshot()
+    
+    def _sync_tx_index(self):
+        """
+        Gleicht txindex.dat an die geladene Chain an: Einträge abgeschnittener
+        Blöcke entfernen, fehlende (Absturz zwischen blocks.dat und txindex.dat)
+        aus den Blöcken nachtragen.
+        """
+        covered = self.store.tx_index_height()
+        if covered != len(self.chain):
+            height = min(covered, len(self.chain))
+            self.store.replace_tx_ids_from(height, self._tx_entries(height), len(self.chain))
+    
+    def _tx_entries(self, start: int) -> List[Tuple[int, str]]:
+        """(Block-Index, Transaktions-ID) aller Transaktionen ab Block 'start' (für txindex.dat)."""
+        return [(block.index, tx["id"]) for block in self.chain[start:] for tx in block.transactions if "id" in tx]
+    
+    def _persist(self, fork_height: int):
+        """Speichert die Blöcke ab 'fork_height' (ab dort hat sich die Chain geändert)."""
+        self.pruned_height = min(self.pruned_height, fork_height)
+        if self.store is not None:
+            self.store.replace_from(fork_height, [block.to_dict() for block in self.chain[fork_height:]])
+            self.store.replace_tx_ids_from(fork_height, self._tx_entries(fork_height), len(self.chain))
+            self._snapshot_height = min(self._snapshot_height, fork_height)
+        self._maybe_prune()
+        self._maybe_snapshot()
+    
+    def _maybe_prune(self):
+        """Kürzt alte Blöcke, sobald ein ganzer Schub unter der Kürzungstiefe liegt."""
+        if self.prune_depth is not None and (
+                len(self.chain) - self.prune_depth - self.pruned_height >= PRUNE_BATCH):
+            self.prune()
+    
+    def prune(self) -> int:
+        """
+        Kürzt alle Blöcke, die tiefer als prune_depth unter dem Tip liegen:
+        Transaktionen werden entfernt, Header und Spendensummen bleiben.
+        Die Chain bleibt über die Header prüfbar.
+        
+        Returns:
+            Anzahl neu gekürzter Blöcke
+        """
+        if self.prune_depth is None:
+            return 0
+        with self._lock:
+            horizon = len(self.chain) - self.prune_depth
+            pruned = 0
+            for block in self.chain[1:max(1, horizon)]:
+                if not block.pruned:
+                    block.prune()
+                    pruned += 1
+            self.pruned_height = max(self.pruned_height, horizon)
+            if pruned and self.store is not None:
+                self.store.rewrite(self.get_chain_data())
+        if pruned:
+            log.info("Blöcke gekürzt", extra=kv(count=pruned, below=horizon))
+        return pruned
+    
+    def _maybe_snapshot(self):
+        """Schreibt einen Snapshot, wenn seit dem letzten genug Blöcke dazugekommen sind."""
+        if self.store is None or len(self.chain) - self._snapshot_height < self.snapshot_interval:
+            return
+        self.store.save_snapshot(self.derived_state())
+        self._snapshot_height = len(self.chain)
+        log.info("Snapshot gespeichert", extra=kv(height=len(self.chain)))
     
     def get_latest_block(self) -> Block:
         """Gibt den neuesten Block in der Chain zurück."""
         return self.chain[-1]
     
-    def add_transaction(self, sender: str, recipient: str, amount: float) -> bool:
+    def build_transaction(self, sender: str, recipient: str, amount: float,
+                          timestamp: float = None) -> Dict:
+        """
+        Erstellt eine Transaktion mit ID, ohne sie hinzuzufügen. Betrag wird
+        auf Cent und Zeitstempel auf Mikrosekunden gerundet, damit die
+        Binärkodierung (Hash, Übertragung) exakt ist.
+        
+        Raises:
+            ValueError: wenn der Betrag keine endliche Zahl im i64-Cent-Bereich ist
+                oder Absender/Empfänger sich nicht kodieren lassen
+        """
+        transaction = {
+            "sender": sender,
+            "recipient": recipient,
+            "amount": from_cents(to_cents(amount)),
+            "timestamp": round(timestamp or time.time(), 6)
+        }
+        transaction["id"] = transaction_id(transaction)
+        return transaction
+    
+    def add_transaction(self, sender: str, recipient: str, amount: float,
+                        timestamp: float = None) -> Optional[Dict]:
         """
         Fügt eine neue Transaktion zum Mempool hinzu.
         
@@ -129,52 +600,141 @@ class Blockchain:
             sender: Name des Spenders (oder "Anonymous")
             recipient: Name der Organisation
             amount: Spendenbetrag
+            timestamp: Zeitpunkt der Spende (optional, z.B. von einem Peer)
             
         Returns:
-            True wenn erfolgreich
+            Die Transaktion (inkl. ID), oder None bei Duplikat (im Mempool oder
+            schon in einem Block, siehe find_transaction) / vollem Mempool
+            
+        Raises:
+            ValueError: wenn der Betrag keine endliche Zahl im i64-Cent-Bereich ist
+                oder Absender/Empfänger sich nicht kodieren lassen
         """
-        transaction = {
-            "sender": sender,
-            "recipient": recipient,
-            "amount": amount,
-            "timestamp": time.time()
-        }
+        transaction = self.build_transaction(sender, recipient, amount, timestamp)
         
-        self.mempool.append(transaction)
-        print(f"📝 Transaktion hinzugefügt: {sender} → {recipient}: {amount}€")
+        # Schon bestätigte Transaktionen (z.B. verspätet weitergeleitet) nicht erneut aufnehmen
+        if transaction["id"] in self.tx_index or not self.mempool.add(transaction):
+            return None
+        log.debug("Transaktion hinzugefügt", extra=kv(
+            id=transaction["id"][:16], sender=sender, recipient=recipient, amount=transaction["amount"]))
         
         # Automatisch minen, wenn genug Transaktionen da sind
         if len(self.mempool) >= self.max_transactions_per_block:
             self.mine_pending_transactions()
         
-        return True
+        return transaction
     
     def mine_pending_transactions(self):
         """
-        Mined alle Transaktionen im Mempool zu einem neuen Block.
+        Mined die ältesten Transaktionen im Mempool (bis zur Block-Kapazität)
+        zu einem neuen Block.
         """
-        if not self.mempool:
-            print("⚠️  Keine Transaktionen zum Minen vorhanden.")
-            return False
-        
-        # Neuen Block mit allen Transaktionen aus dem Mempool erstellen
-        new_block = Block(
-            index=len(self.chain),
-            transactions=self.mempool.copy(),
-            previous_hash=self.get_latest_block().hash
-        )
+        with self._lock:
+            if not self.mempool:
+                log.info("Keine Transaktionen zum Minen vorhanden")
+                return False
+            
+            # Neuen Block mit den ältesten Transaktionen aus dem Mempool erstellen
+            transactions = self.mempool.take(self.max_transactions_per_block)
+            new_block = Block(
+                index=len(self.chain),
+                transactions=transactions,
+                previous_hash=self.get_latest_block().hash
+            )
+            
+            # Block minen (Proof-of-Work); bei einem Fehler gehen die Transaktionen zurück
+            try:
+                new_block.mine_block(self.difficulty)
+            except Exception:
+                self.mempool.requeue(transactions)
+                raise
+            
+            # Block zur Chain hinzufügen
+            self.chain.append(new_block)
+            self._apply_block(new_block)
+            self.validated_height = len(self.chain)
+            self._persist(new_block.index)
+            
+            return True
+    
+    def find_transaction(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Sucht eine Transaktion in Chain und Mempool.
         
-        # Block minen (Proof-of-Work)
-        new_block.mine_block(self.difficulty)
+        Args:
+            tx_id: ID der Transaktion
+            
+        Returns:
+            Status-Dictionary ("confirmed" mit Block-Index oder "pending"),
+            None wenn unbekannt
+        """
+        block_index = self.tx_index.get(tx_id)
+        if block_index is not None:
+            return {
+                "status": "confirmed",
+                "block": block_index,
+                "confirmations": len(self.chain) - block_index
+            }
+        if tx_id in self.mempool:
+            return {"status": "pending"}
+        return None
+    
+    def transaction_proof(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Inclusion-Proof einer bestätigten Transaktion für Light-Clients.
         
-        # Block zur Chain hinzufügen
-        self.chain.append(new_block)
+        Der Client prüft SHA-256(encoded) == tx_id und rechnet mit dem Proof
+        die Merkle-Wurzel nach, die er aus dem (per PoW geprüften) Header kennt.
         
-        # Mempool leeren
-        self.mempool = []
+        Args:
+            tx_id: ID der Transaktion
+            
+        Returns:
+            Transaktion, Kodierung (Hex), Block, Position und Proof-Schritte;
+            {"pruned": True, "block": ...} wenn der Block gekürzt ist;
+            None wenn die Transaktion nicht in der Chain ist
+        """
+        chain = self.chain
+        block_index = self.tx_index.get(tx_id)
+        if block_index is None or block_index >= len(chain):
+            return None
+        block = chain[block_index]
+        if block.pruned:
+            return {"pruned": True, "block": block_index}
         
-        return True
+        ids = [tx["id"] for tx in block.transactions]
+        if tx_id not in ids:
+            return None
+        position = ids.index(tx_id)
+        proof = merkle_proof([bytes.fromhex(i) for i in ids], position)
+        return {
+            "transaction": block.transactions[position],
+            "encoded": encode_transaction(block.transactions[position]).hex(),
+            "block": block_index,
+            "block_hash": block.hash,
+            "position": position,
+            "proof": [{"side": side, "hash": sibling.hex()} for side, sibling in proof],
+            "confirmations": len(chain) - block_index
+        }
+    
+    def recent_transactions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Die neuesten bestätigten Transaktionen, neueste zuerst, jeweils mit
+        Inclusion-Proof (wie transaction_proof). Endet beim ersten gekürzten Block.
+        """
+        proofs: List[Dict[str, Any]] = []
+        for block in reversed(self.chain):
+            if block.pruned:
+                break
+            for tx in reversed(block.transactions):
+                if len(proofs) >= limit:
+                    return proofs
+                proof = self.transaction_proof(tx["id"])
+                if proof is not None and not proof.get("pruned"):
+                    proofs.append(proof)
+        return proofs
     
+    @VALIDATION_SECONDS.time()
     def is_chain_valid(self) -> bool:
         """
         Überprüft, ob die Blockchain gültig ist.
@@ -183,27 +743,96 @@ class Blockchain:
         Returns:
             True wenn die Chain gültig ist, sonst False
         """
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
-            
-            # 1. Check: Ist der gespeicherte Hash korrekt?
-            if current_block.hash != current_block.calculate_hash():
-                print(f"❌ Block {i}: Hash wurde manipuliert!")
-                return False
-            
-            # 2. Check: Stimmt die Verkettung?
-            if current_block.previous_hash != previous_block.hash:
-                print(f"❌ Block {i}: Previous Hash stimmt nicht!")
-                return False
-            
-            # 3. Check: Erfüllt der Hash die Schwierigkeit?
-            if not current_block.hash.startswith("0" * self.difficulty):
-                print(f"❌ Block {i}: Proof-of-Work ungültig!")
+        chain = self.chain
+        confirmed = set()
+        for i in range(1, len(chain)):
+            block = chain[i]
+            if (not self._is_valid_successor(block, chain[i - 1])
+                    or self._reuses_transactions(block, confirmed.__contains__)):
                 return False
+            confirmed.update(tx["id"] for tx in block.transactions)
+        return True
+    
+    def audit_chain(self) -> bool:
+        """
+        Prüft die ganze Chain (is_chain_valid, ohne Lock) und merkt sich das
+        Ergebnis für /stats (chain_valid). Neue Blöcke werden schon beim
+        Übernehmen geprüft; das hier erkennt nachträglich beschädigte Blöcke
+        und prüft nach einem Neustart auch die Blöcke vor dem Snapshot.
+        
+        Returns:
+            True wenn die Chain gültig ist, sonst False
+        """
+        self.chain_valid = self.is_chain_valid()
+        if not self.chain_valid:
+            log.warning("Vollständige Prüfung: Chain ungültig", extra=kv(length=len(self.chain)))
+        return self.chain_valid
+    
+    def _is_valid_successor(self, current_block: Block, previous_block: Block) -> bool:
+        """Prüft einen Block gegen seinen Vorgänger (Hash, Verkettung, PoW, Transaktions-IDs)."""
+        i = current_block.index
+        
+        # 1. Check: Ist der gespeicherte Hash korrekt?
+        try:
+            calculated_hash = current_block.calculate_hash()
+        except (ValueError, KeyError, TypeError):
+            log.warning("Chain ungültig: Block-Daten fehlerhaft", extra=rate_limited("invalid_chain", block=i))
+            return False
+        
+        if current_block.hash != calculated_hash:
+            log.warning("Chain ungültig: Hash manipuliert", extra=rate_limited("invalid_chain", block=i))
+            return False
+        
+        # 2. Check: Stimmt die Verkettung?
+        if current_block.previous_hash != previous_block.hash:
+            log.warning("Chain ungültig: Previous Hash stimmt nicht", extra=rate_limited("invalid_chain", block=i))
+            return False
+        
+        # 3. Check: Erfüllt der Hash die Schwierigkeit?
+        if not current_block.hash.startswith("0" * self.difficulty):
+            log.warning("Chain ungültig: Proof-of-Work fehlt", extra=rate_limited("invalid_chain", block=i))
+            return False
+        
+        # 4. Check: Passen die Transaktions-IDs zum Inhalt?
+        if any(tx.get("id") != transaction_id(tx) for tx in current_block.transactions):
+            log.warning("Chain ungültig: Transaktions-ID stimmt nicht", extra=rate_limited("invalid_chain", block=i))
+            return False
+        
+        # 5. Check: Keine Transaktion doppelt im Block
+        if len({tx["id"] for tx in current_block.transactions}) != len(current_block.transactions):
+            log.warning("Chain ungültig: Transaktion doppelt im Block", extra=rate_limited("invalid_chain", block=i))
+            return False
         
         return True
     
+    def _reuses_transactions(self, block: Block, confirmed: Callable[[str], bool]) -> bool:
+        """
+        Prüft, ob ein Block eine schon bestätigte Transaktion noch einmal enthält.
+        
+        Args:
+            confirmed: liefert True für IDs, die in einem früheren Block stehen
+        """
+        if any(confirmed(tx["id"]) for tx in block.transactions):
+            log.warning("Chain ungültig: Transaktion schon bestätigt",
+                        extra=rate_limited("invalid_chain", block=block.index))
+            return True
+        return False
+    
+    def _allows_pruned(self, block: Block, chain_length: int) -> bool:
+        """
+        Prüft, ob ein Block von einem Peer gekürzt sein darf: nur wenn wir
+        selbst kürzen (kein Archiv-Node) und nur außerhalb unseres
+        Kürzungs-Fensters (die neuesten prune_depth Blöcke der Chain mit
+        'chain_length' Blöcken behalten ihre Transaktionen).
+        """
+        if not block.pruned or (self.prune_depth is not None
+                                and block.index < chain_length - self.prune_depth):
+            return True
+        log.warning("Chain abgelehnt: gekürzter Block", extra=rate_limited("invalid_chain", block=block.index))
+        return False
+    
+    @profiled
+    @REPLACE_SECONDS.time()
     def replace_chain(self, new_chain: List[Dict]) -> bool:
         """
         Ersetzt die aktuelle Chain, wenn die neue länger und gültig ist.
@@ -215,32 +844,130 @@ class Blockchain:
         Returns:
             True wenn ersetzt wurde, sonst False
         """
-        # Chain aus Dictionaries zurück in Block-Objekte umwandeln
-        new_blockchain = Blockchain(difficulty=self.difficulty)
-        new_blockchain.chain = []
+        # Nur Chains mit dem gleichen Genesis-Block sind kompatibel
+        if not new_chain or new_chain[0]['hash'] != self.chain[0].hash:
+            log.warning("Chain abgelehnt: anderer Genesis-Block", extra=rate_limited("foreign_genesis"))
+            return False
         
-        for block_data in new_chain:
-            block = Block(
-                index=block_data['index'],
-                transactions=block_data['transactions'],
-                previous_hash=block_data['previous_hash'],
-                timestamp=block_data['timestamp']
-            )
-            block.nonce = block_data['nonce']
-            block.hash = block_data['hash']
-            new_blockchain.chain.append(block)
-        
-        # Prüfen: Ist die neue Chain länger und gültig?
-        if len(new_blockchain.chain) > len(self.chain) and new_blockchain.is_chain_valid():
-            print(f"🔄 Chain ersetzt! Neue Länge: {len(new_blockchain.chain)}")
-            self.chain = new_blockchain.chain
+        # Chain aus Dictionaries zurück in Block-Objekte umwandeln und prüfen:
+        # Ist die neue Chain länger und gültig? (Validierung ohne Lock)
+        with CONSENSUS_PHASE_SECONDS.labels("validate").time():
+            new_blockchain = Blockchain(difficulty=self.difficulty)
+            try:
+                new_blockchain.chain = [Block.from_dict(block_data) for block_data in new_chain]
+                new_blockchain._reset_derived_state()
+                for block in new_blockchain.chain:
+                    new_blockchain._apply_block(block)
+            except (KeyError, TypeError, ValueError):
+                log.warning("Chain abgelehnt: unvollständige Block-Daten", extra=rate_limited("invalid_chain"))
+                return False
+            
+            if len(new_blockchain.chain) <= len(self.chain) or not new_blockchain.is_chain_valid():
+                return False
+        
+        with self._lock, CONSENSUS_PHASE_SECONDS.labels("swap").time():
+            # Während der Validierung könnte lokal ein Block gemined worden sein
+            if len(new_blockchain.chain) <= len(self.chain):
+                return False
+            
+            fork_height = next((i for i, (old, new) in enumerate(zip(self.chain, new_blockchain.chain))
+                                if old.hash != new.hash), len(self.chain))
+            if not all(self._allows_pruned(block, len(new_blockchain.chain))
+                       for block in new_blockchain.chain[fork_height:]):
+                return False
+            
+            log.log(SUMMARY, "Chain ersetzt", extra=kv(length=len(new_blockchain.chain)))
+            # Gemeinsamen Teil behalten: bei uns evtl. noch mit Transaktionen,
+            # beim Peer schon gekürzt (wichtig für den Archiv-Node)
+            self.chain = self.chain[:fork_height] + new_blockchain.chain[fork_height:]
+            self.tx_index = {tx_id: i for tx_id, i in self.tx_index.items() if i < fork_height}
+            self.tx_index.update((tx_id, i) for tx_id, i in new_blockchain.tx_index.items() if i >= fork_height)
+            self.donation_totals = new_blockchain.donation_totals
+            self.analytics = new_blockchain.analytics
+            self.validated_height = len(self.chain)
+            self._persist(fork_height)
+            
+            # Bereits in der neuen Chain enthaltene Transaktionen aus dem Mempool entfernen
+            self.mempool.remove(self.tx_index.keys())
             return True
+    
+    @profiled
+    def extend_chain(self, fork_height: int, blocks: List[Dict]) -> bool:
+        """
+        Übernimmt die Blöcke eines Peers ab 'fork_height' (erster Block, der
+        sich von unserer Chain unterscheidet), wenn die Chain dadurch länger
+        wird. Anders als replace_chain werden nur die neuen Blöcke geprüft und
+        der abgeleitete Zustand nur für die ausgetauschten Blöcke fortgeschrieben.
         
-        return False
+        Args:
+            fork_height: Index des ersten neuen Blocks (mindestens 1)
+            blocks: Blöcke fork_height, fork_height+1, ... als Dictionaries
+            
+        Returns:
+            True wenn übernommen wurde, sonst False
+        """
+        chain = self.chain
+        if not blocks or not 1 <= fork_height <= len(chain) or fork_height + len(blocks) <= len(chain):
+            return False
+        
+        # Validierung ohne Lock: neue Blöcke gegen unseren Block vor dem Fork-Punkt
+        with CONSENSUS_PHASE_SECONDS.labels("validate").time():
+            try:
+                new_blocks = [Block.from_dict(block_data) for block_data in blocks]
+            except (KeyError, TypeError, ValueError):
+                log.warning("Blöcke abgelehnt: unvollständige Block-Daten", extra=rate_limited("invalid_chain"))
+                return False
+            # Bestätigt: vor dem Fork-Punkt (tx_index) oder in einem der neuen Blöcke davor
+            tx_index = self.tx_index
+            new_ids = set()
+            def confirmed(tx_id: str) -> bool:
+                return tx_id in new_ids or tx_index.get(tx_id, fork_height) < fork_height
+            
+            previous = chain[fork_height - 1]
+            new_length = fork_height + len(new_blocks)
+            for expected_index, block in enumerate(new_blocks, start=fork_height):
+                if (block.index != expected_index or not self._is_valid_successor(block, previous)
+                        or not self._allows_pruned(block, new_length)
+                        or self._reuses_transactions(block, confirmed)):
+                    return False
+                new_ids.update(tx["id"] for tx in block.transactions)
+                previous = block
+        
+        with self._lock, CONSENSUS_PHASE_SECONDS.labels("swap").time():
+            # Während der Validierung könnte sich die Chain geändert haben
+            if (len(self.chain) < fork_height or self.chain[fork_height - 1].hash != new_blocks[0].previous_hash
+                    or fork_height + len(new_blocks) <= len(self.chain)):
+                return False
+            
+            # Abgeleiteten Zustand für die verworfenen Blöcke zurückrechnen
+            for block in self.chain[fork_height:]:
+                summary = block.donation_summary()
+                for org, cents in summary.items():
+                    self.donation_totals[org] -= cents
+                self.analytics.remove_block(block.timestamp, summary)
+                for tx in block.transactions:
+                    self.tx_index.pop(tx.get("id"), None)
+            if any(block.pruned for block in self.chain[fork_height:]):
+                self.tx_index = {tx_id: i for tx_id, i in self.tx_index.items() if i < fork_height}
+            
+            self.chain = self.chain[:fork_height] + new_blocks
+            for block in new_blocks:
+                self._apply_block(block)
+            self.validated_height = len(self.chain)
+            self._persist(fork_height)
+            log.log(SUMMARY, "Chain erweitert", extra=kv(fork=fork_height, length=len(self.chain)))
+            
+            # In den neuen Blöcken enthaltene Transaktionen aus dem Mempool entfernen
+            self.mempool.remove(tx["id"] for block in new_blocks for tx in block.transactions if "id" in tx)
+            return True
     
-    def get_chain_data(self) -> List[Dict]:
-        """Gibt die gesamte Chain als Liste von Dictionaries zurück."""
-        return [block.to_dict() for block in self.chain]
+    def get_chain_data(self, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """Gibt die Chain (oder die Blöcke start..end-1) als Liste von Dictionaries zurück."""
+        return [block.to_dict() for block in self.chain[start:end]]
+    
+    def get_headers(self, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """Header-Daten der Blöcke start..end-1 (siehe Block.header_data)."""
+        return [block.header_data() for block in self.chain[start:end]]
     
     def print_chain(self):
         """Gibt die gesamte Blockchain formatiert aus."""
@@ -257,6 +984,9 @@ class Blockchain:
             print(f"Block #{block.index}")
             print(f"  Hash: {block.hash[:40]}...")
             print(f"  Previous Hash: {block.previous_hash[:40]}...")
+            if block.pruned:
+                print(f"  Transaktionen: {block.tx_count} (gekürzt)")
+                continue
             print(f"  Transaktionen: {len(block.transactions)}")
             for tx in block.transactions:
                 print(f"    - {tx['sender']} → {tx['recipient']}: {tx['amount']}€")
@@ -265,6 +995,9 @@ class Blockchain:
 
 # Test-Code (wird nur ausgeführt, wenn diese Datei direkt gestartet wird)
 if __name__ == "__main__":
+    from log import setup_logging, shutdown_logging
+    setup_logging(level="DEBUG")
+    
     print("🚀 Blockchain-Test wird gestartet...\n")
     
     # Blockchain mit Schwierigkeit 4 erstellen
@@ -289,4 +1022,6 @@ if __name__ == "__main__":
     # Manipulation testen
     print("\n🔧 Manipuliere Block 1...")
     blockchain.chain[1].transactions[0]['amount'] = 999999
-    print(f"Ist die Blockchain noch gültig? {blockchain.is_chain_valid()}")
\ No newline at end of file
+    print(f"Ist die Blockchain noch gültig? {blockchain.is_chain_valid()}")
+    
+    shutdown_logging()
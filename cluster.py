@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Cluster-Harness: N Nodes in einem Prozess mit simuliertem Netzwerk
+Jeder Node ist eine eigene Instanz von node.py (eigene Flask-App, Chain,
+Peers). Statt HTTP läuft die Kommunikation über ein SimulatedNetwork,
+das Latenz, Paketverlust, Partitionen und langsame Peers simuliert.
+
+Gemessen werden Konvergenzzeit, übertragene Bytes pro Block und Orphan-Rate.
+
+Aufruf:
+    python3 cluster.py --nodes 10 --blocks 20 --latency 0.005 --loss 0.02
+    python3 cluster.py --nodes 10 --partition 3 --miners 2
+    python3 cluster.py --nodes 20 --topology seed --fanout 3   # Peers per Discovery
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import requests
+
+from blockchain import Blockchain
+from encoding import ORGANIZATIONS
+from peers import GOSSIP_FANOUT, PeerManager
+
+
+NODE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "node.py")
+
+
+# ==================== SIMULIERTES NETZWERK ====================
+
+class SimulatedResponse:
+    """Minimaler Ersatz für requests.Response (status_code, content, headers, json())."""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class SimulatedNetwork:
+    """
+    Verbindet Node-Instanzen über ihre Flask-Testclients.
+
+    Attributes:
+        latency: Grundlatenz pro Anfrage in Sekunden (Hin + Rück)
+        jitter: Zufällige Zusatzlatenz (0..jitter Sekunden)
+        loss: Wahrscheinlichkeit, dass eine Anfrage verloren geht
+        slow_nodes: Adresse → zusätzliche Latenz für Anfragen an diesen Node
+
+    Die simulierte Zeit (clock) läuft um die Latenz jeder Anfrage und per
+    advance weiter, z.B. um PEER_INTERVAL pro Sync-Runde. Die PeerManager im
+    Cluster nutzen sie für Backoff und Heartbeat, damit Sekunden-Backoffs
+    nicht an der echten (viel kürzeren) Laufzeit gemessen werden.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.slow_nodes: Dict[str, float] = {}
+        self._groups: Optional[List[Set[str]]] = None
+        self._apps: Dict[str, object] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._now = 0.0
+
+        # Statistik
+        self.requests = 0
+        self.failed = 0
+        self.bytes_sent = 0
+        self.bytes_by_path: Dict[str, int] = {}
+
+    def attach(self, address: str, app):
+        """Registriert einen Node unter seiner Adresse."""
+        self._apps[address] = app.test_client()
+
+    def partition(self, *groups: Set[str]):
+        """Teilt das Netz: Anfragen zwischen verschiedenen Gruppen schlagen fehl."""
+        self._groups = [set(group) for group in groups]
+
+    def heal(self):
+        """Hebt alle Partitionen auf."""
+        self._groups = None
+
+    def clock(self) -> float:
+        """Simulierte Zeit in Sekunden (monoton, für PeerManager(clock=...))."""
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float):
+        """Lässt die simulierte Zeit um 'seconds' weiterlaufen."""
+        with self._lock:
+            self._now += seconds
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.failed = 0
+            self.bytes_sent = 0
+            self.bytes_by_path = {}
+
+    def _reachable(self, source: str, target: str) -> bool:
+        if self._groups is None:
+            return True
+        return any(source in group and target in group for group in self._groups)
+
+    def request(self, source: str, method: str, url: str, **kwargs) -> SimulatedResponse:
+        parts = urlsplit(url)
+        target = f"{parts.scheme}://{parts.netloc}"
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        with self._lock:
+            self.requests += 1
+            lost = self._rng.random() < self.loss
+            delay = self.latency + self._rng.uniform(0, self.jitter) + self.slow_nodes.get(target, 0.0)
+            self._now += delay
+
+        client = self._apps.get(target)
+        if client is None or lost or not self._reachable(source, target):
+            with self._lock:
+                self.failed += 1
+            if delay:
+                time.sleep(delay)
+            raise requests.exceptions.ConnectionError(f"Simuliert: {target} nicht erreichbar")
+
+        if delay:
+            time.sleep(delay)
+
+        request_kwargs = {"headers": kwargs.get("headers") or {}}
+        if "json" in kwargs:
+            request_kwargs["json"] = kwargs["json"]
+        if "data" in kwargs:
+            request_kwargs["data"] = kwargs["data"]
+        response = client.open(path, method=method, **request_kwargs)
+
+        if "json" in kwargs:
+            request_bytes = len(json.dumps(kwargs["json"]))
+        else:
+            request_bytes = len(kwargs.get("data") or b"")
+        transferred = request_bytes + len(response.data)
+        route = parts.path
+        with self._lock:
+            self.bytes_sent += transferred
+            self.bytes_by_path[route] = self.bytes_by_path.get(route, 0) + transferred
+
+        return SimulatedResponse(response.status_code, response.data, dict(response.headers))
+
+
+class SimulatedTransport:
+    """Transport eines Nodes im simulierten Netzwerk (gleiche Schnittstelle wie HttpTransport)."""
+
+    def __init__(self, network: SimulatedNetwork, source: str):
+        self.network = network
+        self.source = source
+
+    def get(self, url: str, **kwargs) -> SimulatedResponse:
+        return self.network.request(self.source, "GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> SimulatedResponse:
+        return self.network.request(self.source, "POST", url, **kwargs)
+
+
+# ==================== CLUSTER ====================
+
+def load_node_instance(name: str):
+    """Lädt node.py als eigenständiges Modul (eigene App, Chain und Peer-Liste)."""
+    spec = importlib.util.spec_from_file_location(name, NODE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Cluster:
+    """
+    N Node-Instanzen in einem Prozess.
+
+    Hinweis: Die Metrik-Registry ist prozessweit, /metrics zeigt im Harness
+    daher die Summe über alle Nodes.
+    """
+
+    def __init__(self, size: int, network: Optional[SimulatedNetwork] = None,
+                 difficulty: int = 2, topology: str = "mesh", fanout: int = GOSSIP_FANOUT,
+                 seed: int = 42):
+        self.network = network or SimulatedNetwork()
+        self.nodes = []
+        self.addresses: List[str] = []
+
+        for i in range(size):
+            address = f"http://sim-node-{i}"
+            module = load_node_instance(f"sim_node_{i}")
+            module.blockchain = Blockchain(difficulty=difficulty)
+            module.transport = SimulatedTransport(self.network, address)
+            module.peer_nodes = PeerManager(fanout=fanout, rng=random.Random(seed + i),
+                                            clock=self.network.clock)
+            module.NODE_ADDRESS = address
+            # Testclients haben alle 127.0.0.1 als Absender: Nodes erkennen sich am Token
+            module.PEER_TOKEN = f"cluster-{seed}"
+            module._own_addresses = {address}
+            self.network.attach(address, module.app)
+            self.nodes.append(module)
+            self.addresses.append(address)
+
+        self.connect(topology)
+
+    def connect(self, topology: str = "mesh"):
+        """
+        Registriert Peers: "mesh" (jeder mit jedem), "ring" oder "seed" (alle
+        kennen nur Node 0, den Rest finden sie per Discovery, siehe discover).
+        """
+        size = len(self.nodes)
+        for i, module in enumerate(self.nodes):
+            if topology == "mesh":
+                peers = [address for j, address in enumerate(self.addresses) if j != i]
+            elif topology == "ring":
+                peers = {self.addresses[(i - 1) % size], self.addresses[(i + 1) % size]} - {self.addresses[i]}
+            elif topology == "seed":
+                peers = [self.addresses[0]] if i else []
+            else:
+                raise ValueError(f"Unbekannte Topologie: {topology}")
+            for peer in peers:
+                module.app.test_client().post("/nodes/register", json={"node_address": peer})
+
+    def client(self, i: int):
+        return self.nodes[i].app.test_client()
+
+    def donate(self, i: int, sender: str, recipient: str, amount: float):
+        """Sendet eine Spende an Node i (wie das Frontend, inkl. Broadcast)."""
+        return self.client(i).post("/transactions/new", json={
+            "sender": sender, "recipient": recipient, "amount": amount
+        })
+
+    def settle(self):
+        """
+        Wartet, bis alle Nodes ihre Weiterleitungen (node.relay) und
+        Peer-Prüfungen (node.queue_probe) abgearbeitet haben. Eine Aufgabe kann
+        bei einem anderen Node neue auslösen, daher erst nach zwei Durchläufen
+        ohne wartende Aufgaben fertig.
+        """
+        idle_sweeps = 0
+        while idle_sweeps < 2:
+            busy = False
+            for module in self.nodes:
+                for pending in (module._relay_queue, module._probe_queue):
+                    if pending.unfinished_tasks:
+                        busy = True
+                        pending.join()
+            idle_sweeps = 0 if busy else idle_sweeps + 1
+
+    def mine_local(self, i: int) -> Optional[str]:
+        """Mined auf Node i ohne Broadcast und gibt den Hash des neuen Blocks zurück."""
+        blockchain = self.nodes[i].blockchain
+        if not blockchain.mempool:
+            return None
+        blockchain.mine_pending_transactions()
+        return blockchain.get_latest_block().hash
+
+    def announce(self, i: int):
+        """Node i meldet seinen neuesten Block an die Peers."""
+        with self.nodes[i].app.app_context():
+            self.nodes[i].broadcast_new_block()
+        self.settle()
+
+    def sync_round(self):
+        """Jeder Node führt einmal Konsens aus (ein Heartbeat-Intervall später)."""
+        self.network.advance(self.nodes[0].PEER_INTERVAL)
+        for i in range(len(self.nodes)):
+            self.client(i).post("/consensus")
+        self.settle()
+
+    def heartbeat_round(self):
+        """Jeder Node fragt die Tips aller Peers ab (wie der Heartbeat, ohne auf PEER_INTERVAL zu warten)."""
+        for module in self.nodes:
+            module.run_consensus(list(module.peer_nodes))
+
+    def discover(self, rounds: int = 3):
+        """Führt auf jedem Node 'rounds' Runden Peer-Austausch aus (wie der Peer-Thread)."""
+        for _ in range(rounds):
+            for module in self.nodes:
+                module.discover_peers()
+            self.settle()
+
+    def tips(self) -> List[str]:
+        return [module.blockchain.get_latest_block().hash for module in self.nodes]
+
+    def converged(self) -> bool:
+        return len(set(self.tips())) == 1
+
+    def wait_converged(self, max_rounds: int = 5) -> bool:
+        """Führt Sync-Runden aus, bis alle Nodes den gleichen Tip haben."""
+        self.settle()
+        for _ in range(max_rounds):
+            if self.converged():
+                return True
+            self.sync_round()
+        return self.converged()
+
+    def canonical_chain(self) -> List[str]:
+        """Hashes der längsten Chain im Cluster."""
+        longest = max(self.nodes, key=lambda module: len(module.blockchain.chain))
+        return [block.hash for block in longest.blockchain.chain]
+
+
+# ==================== SZENARIO ====================
+
+def run_scenario(nodes: int = 5, blocks: int = 10, miners: int = 1, latency: float = 0.002,
+                 jitter: float = 0.0, loss: float = 0.0, partition: int = 0, slow: int = 0,
+                 difficulty: int = 2, topology: str = "mesh", fanout: int = GOSSIP_FANOUT,
+                 seed: int = 42):
+    """
+    Spielt 'blocks' Runden durch: pro Runde spenden 'miners' zufällige Nodes
+    und minen gleichzeitig (ohne voneinander zu wissen), danach melden alle
+    ihren Block. Gemessen wird, bis der Cluster wieder einen gemeinsamen Tip hat.
+
+    Args:
+        partition: Anzahl Runden, in denen das Netz in zwei Hälften geteilt ist
+        slow: Anzahl Nodes mit 10x Latenz
+    """
+    rng = random.Random(seed)
+    network = SimulatedNetwork(latency=latency, jitter=jitter, loss=loss, seed=seed)
+    cluster = Cluster(nodes, network, difficulty=difficulty, topology=topology, fanout=fanout, seed=seed)
+    if topology == "seed":
+        cluster.discover()
+    for address in rng.sample(cluster.addresses, min(slow, nodes)):
+        network.slow_nodes[address] = latency * 10
+    network.reset_stats()
+
+    mined: List[str] = []
+    convergence_times: List[float] = []
+    unconverged = 0
+
+    for round_number in range(blocks):
+        if round_number < partition:
+            half = set(cluster.addresses[: nodes // 2])
+            network.partition(half, set(cluster.addresses) - half)
+        else:
+            network.heal()
+
+        start = time.perf_counter()
+        round_miners = rng.sample(range(nodes), min(miners, nodes))
+        for i in round_miners:
+            cluster.nodes[i].blockchain.add_transaction(
+                f"Spender{rng.randint(1, 500)}", rng.choice(ORGANIZATIONS), rng.randint(1, 100))
+            block_hash = cluster.mine_local(i)
+            if block_hash:
+                mined.append(block_hash)
+        for i in round_miners:
+            cluster.announce(i)
+
+        if cluster.wait_converged():
+            convergence_times.append(time.perf_counter() - start)
+        else:
+            unconverged += 1
+
+    network.heal()
+    cluster.wait_converged(max_rounds=10)
+    canonical = set(cluster.canonical_chain())
+    orphans = sum(1 for block_hash in mined if block_hash not in canonical)
+    sent, bytes_by_path = network.bytes_sent, network.bytes_by_path
+    requests_sent, failed = network.requests, network.failed
+
+    # Leerlauf: ein Heartbeat ohne neue Blöcke (nur Tip-Abfragen)
+    network.reset_stats()
+    cluster.heartbeat_round()
+    idle_bytes = network.bytes_sent
+
+    return {
+        "nodes": nodes,
+        "peers_per_node": statistics.mean(len(module.peer_nodes) for module in cluster.nodes),
+        "blocks_mined": len(mined),
+        "converged_rounds": len(convergence_times),
+        "unconverged_rounds": unconverged,
+        "convergence_p50_s": statistics.median(convergence_times) if convergence_times else None,
+        "convergence_max_s": max(convergence_times) if convergence_times else None,
+        "bytes_per_block": sent / max(1, len(mined)),
+        "bytes_by_path": bytes_by_path,
+        "idle_heartbeat_bytes_per_node": idle_bytes / nodes,
+        "requests": requests_sent,
+        "failed_requests": failed,
+        "orphan_rate": orphans / max(1, len(mined)),
+        "final_height": len(cluster.canonical_chain()),
+        "converged": cluster.converged()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulierter Multi-Node-Cluster")
+    parser.add_argument("--nodes", type=int, default=5)
+    parser.add_argument("--blocks", type=int, default=10)
+    parser.add_argument("--miners", type=int, default=1, help="Gleichzeitig minende Nodes pro Runde")
+    parser.add_argument("--latency", type=float, default=0.002, help="Sekunden pro Anfrage")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="Verlustrate 0..1")
+    parser.add_argument("--partition", type=int, default=0, help="Runden mit geteiltem Netz")
+    parser.add_argument("--slow", type=int, default=0, help="Anzahl langsamer Nodes")
+    parser.add_argument("--topology", choices=["mesh", "ring", "seed"], default="mesh")
+    parser.add_argument("--fanout", type=int, default=GOSSIP_FANOUT, help="Peers pro Broadcast")
+    parser.add_argument("--difficulty", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ergebnis als JSON speichern")
+    args = parser.parse_args()
+
+    results = run_scenario(
+        nodes=args.nodes, blocks=args.blocks, miners=args.miners, latency=args.latency,
+        jitter=args.jitter, loss=args.loss, partition=args.partition, slow=args.slow,
+        difficulty=args.difficulty, topology=args.topology, fanout=args.fanout, seed=args.seed
+    )
+
+    print("\n" + "="*60)
+    print(f"  CLUSTER ({results['nodes']} Nodes, {results['blocks_mined']} Blöcke)")
+    print("="*60)
+    for key, value in results.items():
+        print(f"{key:<22} {value}")
+    print("="*60 + "\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Ergebnisse gespeichert: {args.output}")
@@ -0,0 +1,468 @@
+import hashlib
+import math
+import struct
+from typing import Any, Dict, List, Tuple
+
+from merkle import merkle_root
+
+
+# Organisationen (fest vorgegeben).
+# Die Reihenfolge ist Teil des Binärformats (Organisation = 1 Byte Index):
+# neue Organisationen nur hinten anhängen, nie umsortieren!
+ORGANIZATIONS = [
+    "Rotes Kreuz",
+    "WWF",
+    "Ärzte ohne Grenzen",
+    "UNICEF",
+    "Greenpeace"
+]
+
+# Content-Type für das Binärformat (Alternative zu application/json)
+BINARY_MIME = "application/x-spenden-binary"
+
+# Kennung + Version am Anfang einer binär kodierten Chain
+CHAIN_MAGIC = b"SPND"
+HEADERS_MAGIC = b"SPNH"   # Header-Liste für Light-Clients (/headers)
+FORMAT_VERSION = 2   # 2: Header mit Merkle-Wurzel und Summary-Hash, gekürzte Blöcke
+
+_ORG_INDEX = {org: i for i, org in enumerate(ORGANIZATIONS)}
+_RECIPIENT_STRING = 0xFF  # Markierung: Empfänger folgt als String
+
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_TX_NUMBERS = struct.Struct(">qq")            # amount (Cent), timestamp (µs)
+_TX_ORG_NUMBERS = struct.Struct(">Bqq")       # Organisations-Index, amount, timestamp (häufigster Fall)
+_BLOCK_HEADER = struct.Struct(">Iq32s32s32sI")  # index, timestamp (µs), previous_hash, tx_root, summary_hash, Anzahl Tx
+_BLOCK_TRAILER = struct.Struct(">Q32s")       # nonce, hash
+_SUMMARY_ENTRY = struct.Struct(">Bq")         # Organisations-Index, Summe (Cent)
+
+# Block-Flags (1 Byte nach dem Header)
+_FLAG_PRUNED = 0x01   # nur Header + Summary, Transaktionen entfernt
+
+_TX_FIELDS = {"sender", "recipient", "amount", "timestamp", "id"}
+_ZERO_HASH = bytes(32)
+
+# Wertebereich von Beträgen (Cent) und Zeitstempeln (µs), beide i64 im Binärformat
+_I64_MIN = -2 ** 63
+_I64_MAX = 2 ** 63 - 1
+
+
+# ==================== ZAHLEN ====================
+
+def to_cents(amount: Any) -> int:
+    """
+    Wandelt einen Betrag in ganze Cent um (2 Nachkommastellen).
+    
+    Raises:
+        ValueError: wenn der Betrag keine endliche Zahl ist oder nicht in
+                    ein i64 (Cent) passt
+    """
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        raise ValueError(f"Ungültiger Betrag: {amount!r}")
+    if not math.isfinite(amount):
+        raise ValueError(f"Ungültiger Betrag: {amount!r}")
+    cents = round(amount * 100)
+    if not _I64_MIN <= cents <= _I64_MAX:
+        raise ValueError(f"Betrag außerhalb des gültigen Bereichs: {amount!r}")
+    return cents
+
+
+def from_cents(cents: int):
+    """Wandelt Cent zurück in einen Betrag (int, falls ganzzahlig)."""
+    return cents // 100 if cents % 100 == 0 else cents / 100
+
+
+def to_micros(timestamp: float) -> int:
+    """
+    Wandelt einen Zeitstempel in ganze Mikrosekunden um.
+    
+    Raises:
+        ValueError: wenn der Zeitstempel keine endliche Zahl ist oder nicht
+                    in ein i64 (µs) passt
+    """
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+        raise ValueError(f"Ungültiger Zeitstempel: {timestamp!r}")
+    micros = round(timestamp * 1_000_000)
+    if not _I64_MIN <= micros <= _I64_MAX:
+        raise ValueError(f"Zeitstempel außerhalb des gültigen Bereichs: {timestamp!r}")
+    return micros
+
+
+def from_micros(micros: int) -> float:
+    """Wandelt Mikrosekunden zurück in einen Zeitstempel (Sekunden)."""
+    return micros / 1_000_000
+
+
+def _hash_to_bytes(hex_hash: str) -> bytes:
+    """Hash als Hex-String → 32 Bytes ("0" beim Genesis-Block → Nullen)."""
+    if hex_hash == "0":
+        return _ZERO_HASH
+    raw = bytes.fromhex(hex_hash)
+    if len(raw) != 32:
+        raise ValueError(f"Ungültiger Hash: {hex_hash!r}")
+    return raw
+
+
+def _hash_from_bytes(raw: bytes) -> str:
+    return "0" if raw == _ZERO_HASH else raw.hex()
+
+
+def _encode_string(value: str, field: str = "String") -> bytes:
+    if not isinstance(value, str):
+        raise ValueError(f"{field} muss ein String sein: {value!r}")
+    raw = value.encode("utf-8")
+    if len(raw) > 0xFFFF:
+        raise ValueError(f"{field} zu lang für das Binärformat")
+    return _U16.pack(len(raw)) + raw
+
+
+def _decode_string(data: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    return data[offset:offset + length].decode("utf-8"), offset + length
+
+
+# ==================== TRANSAKTIONEN ====================
+
+def encode_transaction(transaction: Dict) -> bytes:
+    """
+    Kodiert eine Transaktion kanonisch (ohne "id", die daraus abgeleitet wird).
+
+    Format: sender (u16 Länge + UTF-8) | Empfänger (u8 Organisations-Index,
+    oder 0xFF + String) | Betrag (i64 Cent) | Zeitstempel (i64 µs)
+
+    Raises:
+        ValueError: bei unbekannten Feldern oder ungültigen Werten
+    """
+    return _encode_transaction(transaction, to_cents(transaction["amount"]))
+
+
+def _encode_transaction(transaction: Dict, cents: int) -> bytes:
+    """encode_transaction mit schon umgerechnetem Betrag (encode_block braucht die Cent auch für die Summary)."""
+    if not _TX_FIELDS.issuperset(transaction):
+        raise ValueError(f"Unbekannte Transaktionsfelder: {set(transaction) - _TX_FIELDS}")
+
+    sender = _encode_string(transaction["sender"], "Absender")
+    recipient = transaction["recipient"]
+    org_index = _ORG_INDEX.get(recipient) if isinstance(recipient, str) else None
+    if org_index is not None:
+        return sender + _TX_ORG_NUMBERS.pack(org_index, cents, to_micros(transaction["timestamp"]))
+    return (sender + _U8.pack(_RECIPIENT_STRING) + _encode_string(recipient, "Empfänger")
+            + _TX_NUMBERS.pack(cents, to_micros(transaction["timestamp"])))
+
+
+def decode_transaction(data: bytes, offset: int = 0) -> Tuple[Dict, int]:
+    """
+    Dekodiert eine Transaktion ab 'offset'.
+
+    Returns:
+        (Transaktion ohne "id", Offset hinter der Transaktion)
+    """
+    (length,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    sender = data[offset:offset + length].decode("utf-8")
+    offset += length
+    if data[offset] == _RECIPIENT_STRING:
+        recipient, offset = _decode_string(data, offset + _U8.size)
+        cents, micros = _TX_NUMBERS.unpack_from(data, offset)
+        offset += _TX_NUMBERS.size
+    else:
+        org_index, cents, micros = _TX_ORG_NUMBERS.unpack_from(data, offset)
+        offset += _TX_ORG_NUMBERS.size
+        recipient = ORGANIZATIONS[org_index]
+
+    return {
+        "sender": sender,
+        "recipient": recipient,
+        "amount": from_cents(cents),
+        "timestamp": from_micros(micros)
+    }, offset
+
+
+# ==================== SUMMARIES ====================
+
+def block_summary(transactions: List[Dict]) -> Dict[str, int]:
+    """Spendensumme pro Organisation in Cent (nur Organisationen mit Spenden)."""
+    summary: Dict[str, int] = {}
+    for tx in transactions:
+        if tx["recipient"] in _ORG_INDEX:
+            summary[tx["recipient"]] = summary.get(tx["recipient"], 0) + to_cents(tx["amount"])
+    return summary
+
+
+def encode_summary(summary: Dict[str, int]) -> bytes:
+    """
+    Kodiert eine Summary kanonisch: u8 Anzahl, dann (u8 Organisations-Index,
+    i64 Cent) nach Index sortiert.
+    """
+    entries = sorted((_ORG_INDEX[org], cents) for org, cents in summary.items() if cents)
+    return _U8.pack(len(entries)) + b"".join(_SUMMARY_ENTRY.pack(*entry) for entry in entries)
+
+
+def decode_summary(data: bytes, offset: int = 0) -> Tuple[Dict[str, int], int]:
+    (count,) = _U8.unpack_from(data, offset)
+    offset += _U8.size
+    summary = {}
+    for _ in range(count):
+        org_index, cents = _SUMMARY_ENTRY.unpack_from(data, offset)
+        offset += _SUMMARY_ENTRY.size
+        summary[ORGANIZATIONS[org_index]] = cents
+    return summary, offset
+
+
+def summary_hash(summary: Dict[str, int]) -> bytes:
+    return hashlib.sha256(encode_summary(summary)).digest()
+
+
+# ==================== BLÖCKE ====================
+
+def transaction_root(transactions: List[Dict]) -> bytes:
+    """Merkle-Wurzel über die Transaktions-IDs eines Blocks."""
+    return merkle_root([bytes.fromhex(tx["id"]) for tx in transactions])
+
+
+def block_header(index: int, timestamp: float, previous_hash: str, tx_root: bytes,
+                 summary: Dict[str, int], tx_count: int) -> bytes:
+    """
+    Kodiert den Block-Header (alle gehashten Daten außer der Nonce).
+    Der Block-Hash ist SHA-256(header + nonce als u64).
+
+    Transaktionen (über die Merkle-Wurzel) und Spendensummen (über den
+    Summary-Hash) sind im Header festgeschrieben. Dadurch lässt sich ein
+    Block auch ohne Transaktionen prüfen (gekürzte Blöcke, Light-Clients).
+    """
+    return _BLOCK_HEADER.pack(index, to_micros(timestamp), _hash_to_bytes(previous_hash),
+                              tx_root, summary_hash(summary), tx_count)
+
+
+def encode_nonce(nonce: int) -> bytes:
+    """Kodiert die Nonce (u64), wie sie an den Header angehängt wird."""
+    return _U64.pack(nonce)
+
+
+def encode_block(block_data: Dict) -> bytes:
+    """
+    Kodiert einen Block (Dictionary wie Block.to_dict()) für die Übertragung.
+
+    Format: Header | u8 Flags | Transaktionen (bzw. Summary bei gekürzten
+    Blöcken) | nonce (u64) | hash (32 Bytes)
+    """
+    if block_data.get("pruned"):
+        summary = {org: to_cents(amount) for org, amount in block_data["summary"].items()}
+        header = block_header(block_data["index"], block_data["timestamp"], block_data["previous_hash"],
+                              bytes.fromhex(block_data["tx_root"]), summary, block_data["tx_count"])
+        body = _U8.pack(_FLAG_PRUNED) + encode_summary(summary)
+    else:
+        # Ein Durchlauf: Betrag nur einmal umrechnen (für Kodierung und Summary)
+        transactions = block_data["transactions"]
+        summary: Dict[str, int] = {}
+        records = [_U8.pack(0)]
+        for tx in transactions:
+            cents = to_cents(tx["amount"])
+            records.append(_encode_transaction(tx, cents))
+            if tx["recipient"] in _ORG_INDEX:
+                summary[tx["recipient"]] = summary.get(tx["recipient"], 0) + cents
+        header = block_header(block_data["index"], block_data["timestamp"], block_data["previous_hash"],
+                              transaction_root(transactions), summary, len(transactions))
+        body = b"".join(records)
+    return header + body + _BLOCK_TRAILER.pack(block_data["nonce"], _hash_to_bytes(block_data["hash"]))
+
+
+def decode_block(data: bytes, offset: int = 0) -> Tuple[Dict, int]:
+    """
+    Dekodiert einen Block ab 'offset'. Transaktions-IDs werden neu berechnet.
+
+    Returns:
+        (Block als Dictionary, Offset hinter dem Block)
+    """
+    index, micros, previous_hash, tx_root, _, tx_count = _BLOCK_HEADER.unpack_from(data, offset)
+    offset += _BLOCK_HEADER.size
+    (flags,) = _U8.unpack_from(data, offset)
+    offset += _U8.size
+
+    block_data: Dict[str, Any] = {"index": index}
+    if flags & _FLAG_PRUNED:
+        summary, offset = decode_summary(data, offset)
+        block_data.update({
+            "transactions": [],
+            "pruned": True,
+            "tx_root": tx_root.hex(),
+            "tx_count": tx_count,
+            "summary": {org: from_cents(cents) for org, cents in summary.items()}
+        })
+    else:
+        block_data["transactions"], offset = _decode_transactions(data, offset, tx_count)
+
+    nonce, block_hash = _BLOCK_TRAILER.unpack_from(data, offset)
+    offset += _BLOCK_TRAILER.size
+
+    block_data.update({
+        "previous_hash": _hash_from_bytes(previous_hash),
+        "timestamp": from_micros(micros),
+        "nonce": nonce,
+        "hash": block_hash.hex()
+    })
+    return block_data, offset
+
+
+def _decode_transactions(data: bytes, offset: int, count: int) -> Tuple[List[Dict], int]:
+    transactions = []
+    for _ in range(count):
+        tx_start = offset
+        tx, offset = decode_transaction(data, offset)
+        tx["id"] = transaction_id_from_bytes(data[tx_start:offset])
+        transactions.append(tx)
+    return transactions, offset
+
+
+def decode_block_meta(record: bytes) -> Dict:
+    """
+    Dekodiert von einem einzelnen Block (genau ein encode_block-Ergebnis)
+    nur Header, Summary gekürzter Blöcke und Trailer. Die Transaktionen
+    bleiben kodiert (siehe decode_block_transactions), so kostet das Laden
+    einer gespeicherten Chain pro Block nur ein paar struct-Aufrufe.
+
+    Returns:
+        Block als Dictionary ohne "transactions"
+
+    Raises:
+        ValueError: bei kaputten Daten
+    """
+    try:
+        index, micros, previous_hash, tx_root, _, tx_count = _BLOCK_HEADER.unpack_from(record)
+        (flags,) = _U8.unpack_from(record, _BLOCK_HEADER.size)
+        nonce, block_hash = _BLOCK_TRAILER.unpack_from(record, len(record) - _BLOCK_TRAILER.size)
+        block_data: Dict[str, Any] = {
+            "index": index,
+            "previous_hash": _hash_from_bytes(previous_hash),
+            "timestamp": from_micros(micros),
+            "nonce": nonce,
+            "hash": block_hash.hex()
+        }
+        if flags & _FLAG_PRUNED:
+            summary, offset = decode_summary(record, _BLOCK_HEADER.size + _U8.size)
+            if offset != len(record) - _BLOCK_TRAILER.size:
+                raise ValueError("Länge passt nicht zur Summary")
+            block_data.update({
+                "pruned": True,
+                "tx_root": tx_root.hex(),
+                "tx_count": tx_count,
+                "summary": {org: from_cents(cents) for org, cents in summary.items()}
+            })
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Kaputte Block-Daten: {e}") from e
+    return block_data
+
+
+def decode_block_transactions(record: bytes) -> List[Dict]:
+    """
+    Dekodiert die Transaktionen eines einzelnen, nicht gekürzten Blocks
+    (wie decode_block, IDs werden neu berechnet).
+
+    Raises:
+        ValueError: bei kaputten Daten
+    """
+    try:
+        (tx_count,) = _U32.unpack_from(record, _BLOCK_HEADER.size - _U32.size)
+        transactions, offset = _decode_transactions(record, _BLOCK_HEADER.size + _U8.size, tx_count)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Kaputte Transaktionsdaten: {e}") from e
+    if offset != len(record) - _BLOCK_TRAILER.size:
+        raise ValueError("Kaputte Transaktionsdaten: Länge passt nicht")
+    return transactions
+
+
+def encode_chain(chain: List[Dict]) -> bytes:
+    """Kodiert eine Chain (Liste von Block-Dictionaries) für /chain."""
+    parts = [CHAIN_MAGIC, _U8.pack(FORMAT_VERSION), _U32.pack(len(chain))]
+    parts.extend(encode_block(block_data) for block_data in chain)
+    return b"".join(parts)
+
+
+def decode_chain(data: bytes) -> List[Dict]:
+    """
+    Dekodiert eine binär kodierte Chain.
+
+    Raises:
+        ValueError: bei falscher Kennung/Version oder kaputten Daten
+    """
+    if data[:4] != CHAIN_MAGIC:
+        raise ValueError("Keine binär kodierte Chain")
+    try:
+        (version,) = _U8.unpack_from(data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Nicht unterstützte Format-Version: {version}")
+        (count,) = _U32.unpack_from(data, 5)
+        offset = 9
+        chain = []
+        for _ in range(count):
+            block_data, offset = decode_block(data, offset)
+            chain.append(block_data)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Kaputte Chain-Daten: {e}") from e
+    return chain
+
+
+# ==================== HEADER (LIGHT-CLIENTS) ====================
+
+def encode_headers(headers: List[Dict]) -> bytes:
+    """
+    Kodiert Block-Header für /headers (wie Block.header_data()).
+
+    Pro Header: Header (wie gehasht) | nonce (u64) | hash (32 Bytes) | Summary.
+    Ein Light-Client hasht Header + Nonce direkt und prüft die Summary gegen
+    den Summary-Hash im Header, ohne die Kodierung nachbauen zu müssen.
+    """
+    parts = [HEADERS_MAGIC, _U8.pack(FORMAT_VERSION), _U32.pack(len(headers))]
+    for header_data in headers:
+        summary = {org: to_cents(amount) for org, amount in header_data["summary"].items()}
+        parts.append(block_header(header_data["index"], header_data["timestamp"],
+                                  header_data["previous_hash"], bytes.fromhex(header_data["tx_root"]),
+                                  summary, header_data["tx_count"]))
+        parts.append(_BLOCK_TRAILER.pack(header_data["nonce"], _hash_to_bytes(header_data["hash"])))
+        parts.append(encode_summary(summary))
+    return b"".join(parts)
+
+
+def decode_headers(data: bytes) -> List[Dict]:
+    """
+    Dekodiert eine Header-Liste.
+
+    Raises:
+        ValueError: bei falscher Kennung/Version oder kaputten Daten
+    """
+    if data[:4] != HEADERS_MAGIC:
+        raise ValueError("Keine binär kodierte Header-Liste")
+    try:
+        (version,) = _U8.unpack_from(data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Nicht unterstützte Format-Version: {version}")
+        (count,) = _U32.unpack_from(data, 5)
+        offset = 9
+        headers = []
+        for _ in range(count):
+            index, micros, previous_hash, tx_root, _, tx_count = _BLOCK_HEADER.unpack_from(data, offset)
+            offset += _BLOCK_HEADER.size
+            nonce, block_hash = _BLOCK_TRAILER.unpack_from(data, offset)
+            offset += _BLOCK_TRAILER.size
+            summary, offset = decode_summary(data, offset)
+            headers.append({
+                "index": index,
+                "timestamp": from_micros(micros),
+                "previous_hash": _hash_from_bytes(previous_hash),
+                "tx_root": tx_root.hex(),
+                "tx_count": tx_count,
+                "summary": {org: from_cents(cents) for org, cents in summary.items()},
+                "nonce": nonce,
+                "hash": block_hash.hex()
+            })
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Kaputte Header-Daten: {e}") from e
+    return headers
+
+
+def transaction_id_from_bytes(encoded: bytes) -> str:
+    """Transaktions-ID = SHA-256 der kanonischen Kodierung."""
+    return hashlib.sha256(encoded).hexdigest()
@@ -0,0 +1,338 @@
+// Light-Client: lädt nur Block-Header (GET /headers, Binärformat) und prüft
+// Proof-of-Work, Verkettung und Spendensummen selbst. Spenden werden per
+// Merkle-Proof (GET /transactions/recent) gegen die geprüften Header belegt.
+// Vertrauensanker ist der Genesis-Block (GENESIS_HASH in script.js).
+
+const BINARY_MIME = 'application/x-spenden-binary';
+
+// Geprüfter Stand wird in localStorage gespeichert und einige Blöcke hinter
+// dem Tip festgeschrieben, damit ein kurzer Fork ihn nicht ungültig macht
+const CHECKPOINT_KEY = 'spenden-light-checkpoint';
+const CHECKPOINT_DEPTH = 6;
+const CHECKPOINT_ROOTS = 50;   // Merkle-Wurzeln der letzten Blöcke für Proofs
+const RECENT_HEADERS = 20;     // Für den Block-Explorer
+
+// Aufbau eines Headers (siehe encoding.py)
+const HEADER_SIZE = 112;       // index, timestamp, previous_hash, tx_root, summary_hash, Anzahl Tx
+const NONCE_SIZE = 8;
+const HASH_SIZE = 32;
+
+// ==================== SHA-256 ====================
+
+// crypto.subtle gibt es nur in "sicheren Kontexten" (https/localhost),
+// die Pis liefern das Frontend aber über http aus - daher in reinem JS
+const SHA256_K = new Uint32Array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+]);
+
+function sha256(bytes) {
+    const length = bytes.length;
+    const padded = new Uint8Array(Math.ceil((length + 9) / 64) * 64);
+    padded.set(bytes);
+    padded[length] = 0x80;
+    const view = new DataView(padded.buffer);
+    view.setUint32(padded.length - 8, Math.floor(length / 0x20000000));
+    view.setUint32(padded.length - 4, (length * 8) >>> 0);
+
+    const h = new Uint32Array([
+        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+    ]);
+    const w = new Uint32Array(64);
+    const rotr = (x, n) => (x >>> n) | (x << (32 - n));
+
+    for (let offset = 0; offset < padded.length; offset += 64) {
+        for (let i = 0; i < 16; i++) w[i] = view.getUint32(offset + i * 4);
+        for (let i = 16; i < 64; i++) {
+            const s0 = rotr(w[i - 15], 7) ^ rotr(w[i - 15], 18) ^ (w[i - 15] >>> 3);
+            const s1 = rotr(w[i - 2], 17) ^ rotr(w[i - 2], 19) ^ (w[i - 2] >>> 10);
+            w[i] = w[i - 16] + s0 + w[i - 7] + s1;
+        }
+        let [a, b, c, d, e, f, g, hh] = h;
+        for (let i = 0; i < 64; i++) {
+            const t1 = hh + (rotr(e, 6) ^ rotr(e, 11) ^ rotr(e, 25)) + ((e & f) ^ (~e & g)) + SHA256_K[i] + w[i];
+            const t2 = (rotr(a, 2) ^ rotr(a, 13) ^ rotr(a, 22)) + ((a & b) ^ (a & c) ^ (b & c));
+            hh = g; g = f; f = e; e = (d + t1) >>> 0;
+            d = c; c = b; b = a; a = (t1 + t2) >>> 0;
+        }
+        h[0] += a; h[1] += b; h[2] += c; h[3] += d;
+        h[4] += e; h[5] += f; h[6] += g; h[7] += hh;
+    }
+
+    const digest = new Uint8Array(32);
+    const digestView = new DataView(digest.buffer);
+    h.forEach((value, i) => digestView.setUint32(i * 4, value));
+    return digest;
+}
+
+function toHex(bytes) {
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function fromHex(hex) {
+    const bytes = new Uint8Array(hex.length / 2);
+    for (let i = 0; i < bytes.length; i++) bytes[i] = parseInt(hex.substr(i * 2, 2), 16);
+    return bytes;
+}
+
+function concatBytes(...parts) {
+    const result = new Uint8Array(parts.reduce((sum, part) => sum + part.length, 0));
+    let offset = 0;
+    parts.forEach(part => { result.set(part, offset); offset += part.length; });
+    return result;
+}
+
+// ==================== HEADER ====================
+
+// Ein Header aus /headers: Header (wie gehasht) | nonce | hash | Summary
+function parseHeaders(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(buffer);
+    if (String.fromCharCode(...bytes.slice(0, 4)) !== 'SPNH') {
+        throw new Error('Keine Header-Liste');
+    }
+    const count = view.getUint32(5);
+    let offset = 9;
+    const headers = [];
+
+    for (let n = 0; n < count; n++) {
+        const start = offset;
+        const header = {
+            index: view.getUint32(offset),
+            timestamp: Number(view.getBigInt64(offset + 4)) / 1e6,
+            previousHash: toHex(bytes.slice(offset + 12, offset + 44)),
+            txRoot: toHex(bytes.slice(offset + 44, offset + 76)),
+            summaryHash: bytes.slice(offset + 76, offset + 108),
+            txCount: view.getUint32(offset + 108),
+        };
+        offset += HEADER_SIZE;
+        header.nonce = view.getBigUint64(offset);
+        offset += NONCE_SIZE;
+        header.hash = toHex(bytes.slice(offset, offset + HASH_SIZE));
+        header.computedHash = toHex(sha256(bytes.slice(start, offset)));
+        offset += HASH_SIZE;
+
+        const summaryStart = offset;
+        const entries = bytes[offset];
+        offset += 1;
+        header.summary = {};   // Organisations-Index → Cent
+        for (let i = 0; i < entries; i++) {
+            header.summary[bytes[offset]] = Number(view.getBigInt64(offset + 1));
+            offset += 9;
+        }
+        header.summaryOk = toHex(sha256(bytes.slice(summaryStart, offset))) === toHex(header.summaryHash);
+        headers.push(header);
+    }
+    return headers;
+}
+
+function verifyHeader(header, previous) {
+    if (header.index !== previous.index + 1) throw new Error(`Header #${header.index}: falscher Index`);
+    if (header.previousHash !== previous.hash) throw new Error(`Header #${header.index}: falsche Verkettung`);
+    if (header.computedHash !== header.hash) throw new Error(`Header #${header.index}: Hash passt nicht`);
+    if (!header.hash.startsWith('0'.repeat(DIFFICULTY))) throw new Error(`Header #${header.index}: Proof-of-Work ungültig`);
+    if (!header.summaryOk) throw new Error(`Header #${header.index}: Summary passt nicht zum Header`);
+}
+
+// ==================== ZUSTAND ====================
+
+// checkpoint: festgeschriebener Stand (Höhe, Hash, Summen, letzte Merkle-Wurzeln)
+// headers: geprüfte Header nach dem Checkpoint
+// recent: die letzten geprüften Header (für den Block-Explorer)
+const light = {
+    checkpoint: null,
+    headers: [],
+    recent: []
+};
+
+function genesisCheckpoint() {
+    return { index: 0, hash: GENESIS_HASH, totals: {}, roots: {} };
+}
+
+function loadCheckpoint() {
+    try {
+        const saved = JSON.parse(localStorage.getItem(CHECKPOINT_KEY));
+        if (saved && saved.genesis === GENESIS_HASH) return saved.checkpoint;
+    } catch (error) {
+        console.warn('Checkpoint nicht lesbar:', error);
+    }
+    return genesisCheckpoint();
+}
+
+function addSummary(totals, summary) {
+    for (const [org, cents] of Object.entries(summary)) {
+        totals[org] = (totals[org] || 0) + cents;
+    }
+}
+
+// Header, die CHECKPOINT_DEPTH Blöcke hinter dem Tip liegen, in den Checkpoint übernehmen
+function advanceCheckpoint() {
+    const settled = light.headers.length - CHECKPOINT_DEPTH;
+    if (settled <= 0) return;
+
+    const checkpoint = light.checkpoint;
+    light.headers.splice(0, settled).forEach(header => {
+        addSummary(checkpoint.totals, header.summary);
+        checkpoint.roots[header.index] = header.txRoot;
+        checkpoint.index = header.index;
+        checkpoint.hash = header.hash;
+    });
+    Object.keys(checkpoint.roots)
+        .filter(index => index <= checkpoint.index - CHECKPOINT_ROOTS)
+        .forEach(index => delete checkpoint.roots[index]);
+
+    localStorage.setItem(CHECKPOINT_KEY, JSON.stringify({ genesis: GENESIS_HASH, checkpoint }));
+}
+
+function lightTip() {
+    return light.headers.length ? light.headers[light.headers.length - 1] : light.checkpoint;
+}
+
+function lightHeight() {
+    return lightTip().index + 1;
+}
+
+// ==================== SYNC ====================
+
+async function fetchHeaders(start) {
+    for (let attempt = 0; attempt < NODES.length; attempt++) {
+        try {
+            const response = await fetch(`${getCurrentNode()}/headers?start=${start}`, {
+                headers: { 'Accept': BINARY_MIME }
+            });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return {
+                headers: parseHeaders(await response.arrayBuffer()),
+                length: parseInt(response.headers.get('X-Chain-Length'), 10)
+            };
+        } catch (error) {
+            console.error(`Fehler bei ${getCurrentNode()}: ${error.message}`);
+            switchToNextNode();
+        }
+    }
+    throw new Error('Alle Nodes nicht erreichbar');
+}
+
+// Lädt neue Header ab dem eigenen Tip. Passt der erste nicht (Fork), wird
+// auf den Checkpoint und notfalls auf Genesis zurückgegangen. Eine Chain
+// wird nur übernommen, wenn sie länger ist.
+// Gleichzeitige Aufrufe (Statistik, Transaktionen, Explorer) teilen sich einen Sync.
+let runningSync = null;
+
+function syncHeaders() {
+    if (!runningSync) {
+        runningSync = doSyncHeaders().finally(() => { runningSync = null; });
+    }
+    return runningSync;
+}
+
+async function doSyncHeaders() {
+    if (!light.checkpoint) light.checkpoint = loadCheckpoint();
+
+    let base = light.headers.length;
+    let result = await fetchHeaders(lightHeight());
+    while (result.length > lightHeight() && result.headers.length
+           && result.headers[0].previousHash !== (base ? light.headers[base - 1] : light.checkpoint).hash) {
+        if (base > 0) {
+            base = 0;
+        } else if (light.checkpoint.index > 0) {
+            console.warn('Fork hinter dem Checkpoint - lade Header ab Genesis');
+            light.checkpoint = genesisCheckpoint();
+            light.headers = [];
+        } else {
+            throw new Error('Node hat einen anderen Genesis-Block');
+        }
+        result = await fetchHeaders((base ? light.headers[base - 1] : light.checkpoint).index + 1);
+    }
+    if (result.length <= lightHeight()) return lightHeight();
+
+    const candidate = light.headers.slice(0, base);
+    let previous = base ? candidate[base - 1] : light.checkpoint;
+    while (result.headers.length) {
+        result.headers.forEach(header => {
+            verifyHeader(header, previous);
+            candidate.push(header);
+            previous = header;
+        });
+        if (previous.index + 1 >= result.length) break;
+        result = await fetchHeaders(previous.index + 1);
+    }
+
+    if (previous.index + 1 > lightHeight()) {
+        const added = candidate.slice(base);
+        light.recent = light.recent
+            .filter(header => header.index < added[0].index)
+            .concat(added)
+            .slice(-RECENT_HEADERS);
+        light.headers = candidate;
+        advanceCheckpoint();
+    }
+    return lightHeight();
+}
+
+function lightTotals() {
+    const totals = { ...light.checkpoint.totals };
+    light.headers.forEach(header => addSummary(totals, header.summary));
+
+    const perOrganization = {};
+    organizations.forEach((org, i) => { perOrganization[org] = (totals[i] || 0) / 100; });
+    const total = Object.values(totals).reduce((sum, cents) => sum + cents, 0) / 100;
+    return { total, perOrganization };
+}
+
+// ==================== PROOFS ====================
+
+function txRootFor(index) {
+    const header = light.headers.find(h => h.index === index);
+    return header ? header.txRoot : light.checkpoint.roots[index];
+}
+
+// Transaktion aus der kanonischen Kodierung lesen (siehe encoding.encode_transaction)
+function decodeTransaction(bytes) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const decoder = new TextDecoder();
+    let offset = 0;
+    const readString = () => {
+        const length = view.getUint16(offset);
+        const value = decoder.decode(bytes.slice(offset + 2, offset + 2 + length));
+        offset += 2 + length;
+        return value;
+    };
+
+    const sender = readString();
+    const orgIndex = bytes[offset];
+    offset += 1;
+    const recipient = orgIndex === 0xFF ? readString() : organizations[orgIndex];
+    const amount = Number(view.getBigInt64(offset)) / 100;
+    const timestamp = Number(view.getBigInt64(offset + 8)) / 1e6;
+    return { sender, recipient, amount, timestamp };
+}
+
+// Prüft einen Proof aus /transactions/recent bzw. /transactions/<id>/proof.
+// Gibt die (aus der Kodierung gelesene) Transaktion zurück, null wenn der
+// Block nicht in den gespeicherten Headern liegt.
+function verifyTransactionProof(proofData) {
+    const txRoot = txRootFor(proofData.block);
+    if (!txRoot) return null;
+
+    const encoded = fromHex(proofData.encoded);
+    const txId = toHex(sha256(encoded));
+    if (txId !== proofData.transaction.id) throw new Error(`Transaktion ${txId.slice(0, 16)}: falsche ID`);
+
+    let node = sha256(concatBytes(new Uint8Array([0]), fromHex(txId)));
+    proofData.proof.forEach(step => {
+        const sibling = fromHex(step.hash);
+        node = step.side === 'L'
+            ? sha256(concatBytes(new Uint8Array([1]), sibling, node))
+            : sha256(concatBytes(new Uint8Array([1]), node, sibling));
+    });
+    if (toHex(node) !== txRoot) throw new Error(`Transaktion ${txId.slice(0, 16)}: Merkle-Proof ungültig`);
+
+    return { ...decodeTransaction(encoded), id: txId, blockIndex: proofData.block };
+}
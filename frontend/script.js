@@ -4,6 +4,15 @@ const NODES = [
     'http://192.168.178.99:5002'   // Pi 4
 ];
 
+// Light-Modus: nur Block-Header laden und selbst prüfen (siehe light.js),
+// Spenden per Merkle-Proof. false = volle Chain laden und dem Node vertrauen.
+const LIGHT_MODE = true;
+
+// Vertrauensanker für den Light-Modus: Genesis-Block und Schwierigkeit der Chain
+// (python3 -c "from blockchain import genesis_block; print(genesis_block(4).hash)")
+const DIFFICULTY = 4;
+const GENESIS_HASH = '00009915146a1865fb6a7a3496799af9970c6184458da9e049d13409bbae5601';
+
 // Globale Variablen
 let currentNodeIndex = 0;
 let organizations = [];
@@ -173,69 +182,123 @@ async function handleDonation(e) {
 // ==================== STATISTICS ====================
 
 async function loadStatistics() {
+    if (LIGHT_MODE) {
+        return loadLightStatistics();
+    }
+    
     try {
         const data = await apiRequest('/stats');
-        
-        document.getElementById('total-donations').textContent = `${data.total_donations} €`;
-        document.getElementById('total-blocks').textContent = data.total_blocks;
-        document.getElementById('pending-transactions').textContent = data.pending_transactions;
-        
-        const validBadge = document.getElementById('chain-valid');
-        if (data.chain_valid) {
-            validBadge.innerHTML = '<span class="status-badge valid">✓ Gültig</span>';
-        } else {
-            validBadge.innerHTML = '<span class="status-badge invalid">✗ Ungültig</span>';
-        }
-        
-        // Spenden pro Organisation
-        const orgList = document.getElementById('org-list');
-        orgList.innerHTML = '';
-        
-        const sortedOrgs = Object.entries(data.donations_per_organization)
-            .sort((a, b) => b[1] - a[1]);
-        
-        sortedOrgs.forEach(([org, amount]) => {
-            const item = document.createElement('div');
-            item.className = 'org-item';
-            item.innerHTML = `
-                <span class="org-name">${org}</span>
-                <span class="org-amount">${amount} €</span>
-            `;
-            orgList.appendChild(item);
-        });
-        
+        renderStatistics(data.total_donations, data.total_blocks, data.pending_transactions,
+                         data.chain_valid, data.donations_per_organization);
     } catch (error) {
         console.error('Fehler beim Laden der Statistiken:', error);
     }
 }
 
+// Light-Modus: Summen aus den selbst geprüften Headern, nur der Mempool kommt vom Node
+async function loadLightStatistics() {
+    let valid = true;
+    try {
+        await syncHeaders();
+    } catch (error) {
+        console.error('Header-Prüfung fehlgeschlagen:', error);
+        valid = false;
+    }
+    
+    if (!light.checkpoint) return;
+    
+    let pending = '-';
+    try {
+        pending = (await apiRequest('/health')).pending_transactions;
+    } catch (error) {
+        console.error('Fehler beim Laden des Mempools:', error);
+    }
+    
+    const totals = lightTotals();
+    renderStatistics(totals.total, lightHeight(), pending, valid, totals.perOrganization);
+}
+
+function renderStatistics(total, blocks, pending, valid, perOrganization) {
+    document.getElementById('total-donations').textContent = `${total} €`;
+    document.getElementById('total-blocks').textContent = blocks;
+    document.getElementById('pending-transactions').textContent = pending;
+    
+    // valid === null: der Node hat die Chain seit dem Start noch nicht ganz geprüft
+    const validBadge = document.getElementById('chain-valid');
+    if (valid === null) {
+        validBadge.innerHTML = '<span class="status-badge">⏳ Wird geprüft</span>';
+    } else if (valid) {
+        validBadge.innerHTML = '<span class="status-badge valid">✓ Gültig</span>';
+    } else {
+        validBadge.innerHTML = '<span class="status-badge invalid">✗ Ungültig</span>';
+    }
+    
+    // Spenden pro Organisation
+    const orgList = document.getElementById('org-list');
+    orgList.innerHTML = '';
+    
+    const sortedOrgs = Object.entries(perOrganization)
+        .sort((a, b) => b[1] - a[1]);
+        
+    sortedOrgs.forEach(([org, amount]) => {
+        const item = document.createElement('div');
+        item.className = 'org-item';
+        item.innerHTML = `
+            <span class="org-name">${org}</span>
+            <span class="org-amount">${amount} €</span>
+        `;
+        orgList.appendChild(item);
+    });
+}
+
 // ==================== RECENT TRANSACTIONS ====================
 
+// Light-Modus: nur Spenden mit gültigem Merkle-Proof gegen die geprüften Header
+async function loadLightTransactions() {
+    const data = await apiRequest('/transactions/recent?limit=10');
+    if (!light.checkpoint || data.length > lightHeight()) {
+        await syncHeaders();
+    }
+    return data.transactions
+        .filter(proofData => proofData.block > 0)
+        .map(proofData => {
+            try {
+                return verifyTransactionProof(proofData);
+            } catch (error) {
+                console.error('Ungültiger Proof:', error);
+                return null;
+            }
+        })
+        .filter(tx => tx !== null);
+}
+
 async function loadRecentTransactions() {
     try {
-        const data = await apiRequest('/chain');
-        const chain = data.chain;
-        
         const container = document.getElementById('recent-transactions');
+        let recentTransactions;
         
-        // Alle Transaktionen sammeln (außer Genesis)
-        let allTransactions = [];
-        for (let i = 1; i < chain.length; i++) {
-            const block = chain[i];
-            block.transactions.forEach(tx => {
-                allTransactions.push({
-                    ...tx,
-                    blockIndex: block.index
+        if (LIGHT_MODE) {
+            recentTransactions = await loadLightTransactions();
+        } else {
+            const data = await apiRequest('/chain');
+            const chain = data.chain;
+            
+            // Alle Transaktionen sammeln (außer Genesis)
+            let allTransactions = [];
+            for (let i = 1; i < chain.length; i++) {
+                const block = chain[i];
+                block.transactions.forEach(tx => {
+                    allTransactions.push({
+                        ...tx,
+                        blockIndex: block.index
+                    });
                 });
-            });
+            }
+            
+            // Neueste zuerst, nur die letzten 10 anzeigen
+            recentTransactions = allTransactions.reverse().slice(0, 10);
         }
         
-        // Neueste zuerst
-        allTransactions.reverse();
-        
-        // Nur die letzten 10 anzeigen
-        const recentTransactions = allTransactions.slice(0, 10);
-        
         if (recentTransactions.length === 0) {
             container.innerHTML = '<p class="loading">Noch keine Transaktionen</p>';
             return;
@@ -266,8 +329,23 @@ async function loadRecentTransactions() {
 
 async function loadBlockchain() {
     try {
-        const data = await apiRequest('/chain');
-        const chain = data.chain;
+        let chain;
+        if (LIGHT_MODE) {
+            // Nur die zuletzt geprüften Header (ohne Transaktionen)
+            await syncHeaders();
+            chain = light.recent.map(header => ({
+                index: header.index,
+                timestamp: header.timestamp,
+                hash: header.hash,
+                previous_hash: header.previousHash,
+                nonce: header.nonce,
+                pruned: true,
+                tx_count: header.txCount
+            }));
+        } else {
+            const data = await apiRequest('/chain');
+            chain = data.chain;
+        }
         
         const container = document.getElementById('blockchain-view');
         
@@ -286,7 +364,8 @@ async function loadBlockchain() {
             const item = document.createElement('div');
             item.className = 'block-item';
             
-            const txCount = block.transactions.length;
+            // Gekürzte Blöcke (pruned) enthalten nur noch die Anzahl
+            const txCount = block.pruned ? block.tx_count : block.transactions.length;
             const time = formatDate(block.timestamp);
             
             item.innerHTML = `
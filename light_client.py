@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Light-Client für die Spenden-Blockchain
+Lädt nur die Block-Header (GET /headers), prüft Proof-of-Work und
+Verkettung selbst und vertraut dem Node nur für Daten, die er mit einem
+Merkle-Proof belegen kann (GET /transactions/<id>/proof).
+
+Vertrauensanker ist der Genesis-Block: er ist für jede Schwierigkeit fest
+(siehe blockchain.genesis_block), ein Node kann also keine andere Chain
+unterschieben, ohne den Proof-of-Work dafür zu leisten.
+
+Spendensummen kommen aus den Summaries der Header (über den Summary-Hash im
+gehashten Header festgeschrieben), einzelne Spenden aus Inclusion-Proofs
+gegen die Merkle-Wurzel des jeweiligen Headers.
+
+Aufruf:
+    python3 light_client.py --node http://192.168.1.100:5000
+    python3 light_client.py --node http://192.168.1.100:5000 --tx <transaction_id>
+"""
+
+import argparse
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from blockchain import genesis_block
+from encoding import (ORGANIZATIONS, BINARY_MIME, block_header, decode_headers, decode_transaction,
+                      encode_nonce, from_cents, to_cents, transaction_id_from_bytes)
+from merkle import verify_proof
+from transport import HttpTransport
+
+
+class VerificationError(ValueError):
+    """Daten eines Nodes passen nicht zu den geprüften Headern."""
+
+
+def verify_header(header_data: Dict, previous: Dict, difficulty: int):
+    """
+    Prüft einen Header gegen seinen Vorgänger: Index, Verkettung, Hash
+    (aus den Header-Daten neu berechnet) und Proof-of-Work.
+
+    Raises:
+        VerificationError: wenn eine der Prüfungen fehlschlägt oder die
+            Header-Daten sich nicht kodieren lassen (z.B. unbekannte Organisation)
+    """
+    if header_data["index"] != previous["index"] + 1:
+        raise VerificationError(f"Header #{header_data['index']} folgt nicht auf #{previous['index']}")
+    if header_data["previous_hash"] != previous["hash"]:
+        raise VerificationError(f"Header #{header_data['index']}: falscher previous_hash")
+
+    unknown = [org for org in header_data["summary"] if org not in ORGANIZATIONS]
+    if unknown:
+        raise VerificationError(f"Header #{header_data['index']}: unbekannte Organisation {unknown[0]!r}")
+    try:
+        summary = {org: to_cents(amount) for org, amount in header_data["summary"].items()}
+        header = block_header(header_data["index"], header_data["timestamp"], header_data["previous_hash"],
+                              bytes.fromhex(header_data["tx_root"]), summary, header_data["tx_count"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise VerificationError(f"Header #{header_data['index']}: fehlerhafte Header-Daten ({e})") from e
+    block_hash = hashlib.sha256(header + encode_nonce(header_data["nonce"])).hexdigest()
+    if block_hash != header_data["hash"]:
+        raise VerificationError(f"Header #{header_data['index']}: Hash passt nicht zu den Daten")
+    if not block_hash.startswith("0" * difficulty):
+        raise VerificationError(f"Header #{header_data['index']}: Proof-of-Work ungültig")
+
+
+class LightClient:
+    """
+    Hält die geprüften Header einer Chain (ohne Transaktionen).
+
+    Attributes:
+        headers: Geprüfte Header ab Genesis (wie Block.header_data())
+    """
+
+    def __init__(self, node: str, difficulty: int = 4, transport=None, timeout: float = 10.0):
+        """
+        Args:
+            node: URL des Nodes (z.B. "http://192.168.1.100:5000")
+            difficulty: Mining-Schwierigkeit der Chain
+            transport: Transport für Anfragen (Standard: HttpTransport)
+        """
+        self.node = node.rstrip("/")
+        self.difficulty = difficulty
+        self.transport = transport or HttpTransport()
+        self.timeout = timeout
+        self.headers: List[Dict[str, Any]] = [genesis_block(difficulty).header_data()]
+
+    @property
+    def height(self) -> int:
+        return len(self.headers)
+
+    # ==================== HEADER ====================
+
+    def _fetch_headers(self, start: int) -> Tuple[List[Dict], int]:
+        """Lädt eine Seite Header ab 'start'. Returns: (Header, Chain-Länge beim Node)."""
+        response = self.transport.get(f"{self.node}/headers?start={start}",
+                                      headers={"Accept": BINARY_MIME}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"/headers: HTTP {response.status_code}")
+        if response.headers.get("Content-Type", "").startswith(BINARY_MIME):
+            return decode_headers(response.content), int(response.headers["X-Chain-Length"])
+        data = response.json()
+        return data["headers"], data["length"]
+
+    def sync(self) -> int:
+        """
+        Lädt neue Header und prüft sie. Passt der erste neue Header nicht an
+        den eigenen Tip (Fork), wird schrittweise weiter zurück gesucht
+        (1, 2, 4, ... Blöcke). Übernommen wird nur eine längere Chain.
+
+        Returns:
+            Höhe (Anzahl geprüfter Header) nach dem Sync
+
+        Raises:
+            VerificationError: wenn der Node ungültige Header liefert
+            requests.exceptions.RequestException: bei Netzwerkfehlern
+        """
+        fork = len(self.headers)
+        step = 1
+        while True:
+            batch, length = self._fetch_headers(fork)
+            if length <= len(self.headers) or not batch:
+                return len(self.headers)
+            if batch[0]["previous_hash"] == self.headers[fork - 1]["hash"]:
+                break
+            if fork == 1:
+                raise VerificationError("Chain des Nodes hat einen anderen Genesis-Block")
+            fork = max(1, fork - step)
+            step *= 2
+
+        candidate = self.headers[:fork]
+        while True:
+            for header_data in batch:
+                verify_header(header_data, candidate[-1], self.difficulty)
+                candidate.append(header_data)
+            if len(candidate) >= length:
+                break
+            batch, length = self._fetch_headers(len(candidate))
+            if not batch:
+                break
+
+        if len(candidate) > len(self.headers):
+            self.headers = candidate
+        return len(self.headers)
+
+    def totals(self) -> Dict[str, Any]:
+        """
+        Spendensummen aus den geprüften Headern.
+
+        Returns:
+            {"total": Gesamtsumme, "per_organization": {Organisation: Summe}} wie GET /stats
+        """
+        cents = {org: 0 for org in ORGANIZATIONS}
+        for header_data in self.headers:
+            for org, amount in header_data["summary"].items():
+                cents[org] += to_cents(amount)
+        return {
+            "total": from_cents(sum(cents.values())),
+            "per_organization": {org: from_cents(value) for org, value in cents.items()}
+        }
+
+    # ==================== TRANSAKTIONEN ====================
+
+    def _verify_inclusion(self, proof_data: Dict, tx_id: str) -> Dict[str, Any]:
+        """
+        Prüft eine Antwort von /transactions/<id>/proof gegen die geprüften Header.
+        Die Transaktion wird aus der Kodierung gelesen, nicht aus dem JSON.
+        """
+        encoded = bytes.fromhex(proof_data["encoded"])
+        if transaction_id_from_bytes(encoded) != tx_id:
+            raise VerificationError(f"Transaktion {tx_id[:16]}: Kodierung passt nicht zur ID")
+
+        block_index = proof_data["block"]
+        if block_index >= len(self.headers):
+            self.sync()
+        if block_index >= len(self.headers):
+            raise VerificationError(f"Transaktion {tx_id[:16]}: Block #{block_index} unbekannt")
+        header_data = self.headers[block_index]
+
+        proof = [(step["side"], bytes.fromhex(step["hash"])) for step in proof_data["proof"]]
+        if not verify_proof(bytes.fromhex(tx_id), proof, bytes.fromhex(header_data["tx_root"])):
+            raise VerificationError(f"Transaktion {tx_id[:16]}: Merkle-Proof ungültig")
+
+        transaction, _ = decode_transaction(encoded)
+        transaction["id"] = tx_id
+        return {
+            "transaction": transaction,
+            "block": block_index,
+            "block_hash": header_data["hash"],
+            "confirmations": len(self.headers) - block_index
+        }
+
+    def verify_transaction(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Prüft, ob eine Spende in der Chain enthalten ist.
+
+        Returns:
+            Transaktion mit Block und Bestätigungen, None wenn der Node sie
+            (noch) nicht in einem Block hat
+
+        Raises:
+            VerificationError: wenn der Proof nicht zu den Headern passt
+        """
+        response = self.transport.get(f"{self.node}/transactions/{tx_id}/proof", timeout=self.timeout)
+        if response.status_code in (404, 410):
+            return None
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"/transactions/{tx_id}/proof: HTTP {response.status_code}")
+        return self._verify_inclusion(response.json(), tx_id)
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Die neuesten Spenden des Nodes, jede per Inclusion-Proof geprüft.
+
+        Raises:
+            VerificationError: wenn ein Proof nicht zu den Headern passt
+        """
+        response = self.transport.get(f"{self.node}/transactions/recent?limit={limit}", timeout=self.timeout)
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"/transactions/recent: HTTP {response.status_code}")
+        return [self._verify_inclusion(proof_data, proof_data["transaction"]["id"])
+                for proof_data in response.json()["transactions"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Light-Client (nur Header, Proofs für Spenden)")
+    parser.add_argument("--node", default="http://localhost:5000", help="URL des Nodes")
+    parser.add_argument("--difficulty", type=int, default=4, help="Mining-Schwierigkeit der Chain")
+    parser.add_argument("--tx", help="Spende mit dieser ID per Merkle-Proof prüfen")
+    parser.add_argument("--recent", type=int, default=5, help="So viele neueste Spenden prüfen")
+    args = parser.parse_args()
+
+    client = LightClient(args.node, difficulty=args.difficulty)
+    height = client.sync()
+    totals = client.totals()
+
+    print("\n" + "="*60)
+    print(f"  LIGHT-CLIENT ({args.node})")
+    print("="*60)
+    print(f"Geprüfte Header: {height} (Tip {client.headers[-1]['hash'][:20]}...)")
+    print(f"Spenden gesamt:  {totals['total']}€")
+    for org, amount in totals["per_organization"].items():
+        print(f"  {org}: {amount}€")
+
+    if args.tx:
+        result = client.verify_transaction(args.tx)
+        if result is None:
+            print(f"\nSpende {args.tx[:16]}...: nicht in einem Block")
+        else:
+            tx = result["transaction"]
+            print(f"\n✅ Spende {args.tx[:16]}... in Block #{result['block']} "
+                  f"({result['confirmations']} Bestätigungen): {tx['sender']} → {tx['recipient']}: {tx['amount']}€")
+    elif args.recent:
+        print("\nNeueste Spenden (geprüft):")
+        for result in client.recent(args.recent):
+            tx = result["transaction"]
+            print(f"  ✅ #{result['block']}: {tx['sender']} → {tx['recipient']}: {tx['amount']}€")
+    print("="*60 + "\n")
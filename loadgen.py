@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Lastgenerator für Spenden
+Schickt realistische Spenden-Mixe an einen oder mehrere Nodes und misst
+Latenz-Perzentile (p50/p95/p99), Fehlerrate und die Zeit vom Senden bis
+zur Aufnahme in einen Block (über die neuen Blöcke, GET /chain?start=).
+
+Modi:
+    open   - Ankünfte nach Poisson-Prozess mit fester Rate, unabhängig davon,
+             wie schnell der Node antwortet (Latenz ab geplantem Sendezeitpunkt)
+    closed - feste Anzahl Clients, jeder sendet erst nach der letzten Antwort
+
+Aufruf:
+    python3 loadgen.py --nodes http://localhost:5000 --mode open --rate 20 --duration 30
+    python3 loadgen.py --nodes http://localhost:5000,http://localhost:5001 --mode closed --concurrency 8
+    python3 loadgen.py --sim 3 --mode open --rate 50       # ohne echte Nodes (cluster.py)
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from encoding import ORGANIZATIONS
+from transport import HttpTransport
+
+
+# Spenden-Mix: typische Beträge mit Gewichtung (kleine Beträge häufiger)
+AMOUNTS = [5, 10, 20, 25, 50, 100, 250]
+AMOUNT_WEIGHTS = [30, 25, 15, 10, 12, 6, 2]
+
+# Nicht alle Organisationen sind gleich beliebt
+ORGANIZATION_WEIGHTS = [30, 20, 20, 20, 10]
+
+# Anteil anonymer Spenden
+ANONYMOUS_SHARE = 0.3
+
+# Beim Verfolgen der Aufnahme werden so viele schon gesehene Blöcke erneut
+# geladen (falls ein Fork sie inzwischen ersetzt hat)
+REORG_DEPTH = 6
+
+
+def random_donation(rng: random.Random) -> Dict:
+    """Erzeugt eine zufällige, realistische Spende."""
+    sender = "Anonymer Spender" if rng.random() < ANONYMOUS_SHARE else f"Spender{rng.randint(1, 5000)}"
+    amount = rng.choices(AMOUNTS, AMOUNT_WEIGHTS)[0]
+    if rng.random() < 0.2:
+        amount += rng.randint(1, 99) / 100  # krumme Beträge
+    return {
+        "sender": sender,
+        "recipient": rng.choices(ORGANIZATIONS, ORGANIZATION_WEIGHTS[:len(ORGANIZATIONS)])[0],
+        "amount": amount
+    }
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """p-Perzentil (0..100) einer Liste nach der Nearest-Rank-Methode, None wenn leer."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadGenerator:
+    """Sendet Spenden und sammelt Messwerte (thread-sicher)."""
+
+    def __init__(self, nodes: List[str], transport_factory=HttpTransport, seed: int = 42,
+                 timeout: float = 10.0):
+        self.nodes = nodes
+        self.timeout = timeout
+        self._transport_factory = transport_factory
+        self._local = threading.local()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._next_node = 0
+
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.sent = 0
+        self.error_kinds: Dict[str, int] = {}
+        self.accepted: Dict[str, float] = {}      # tx_id → Sendezeitpunkt
+        self.inclusion_delays: List[float] = []
+
+    def _transport(self):
+        # Eine Verbindung (Session) pro Thread
+        if not hasattr(self._local, "transport"):
+            self._local.transport = self._transport_factory()
+        return self._local.transport
+
+    def _pick_node(self) -> str:
+        with self._lock:
+            node = self.nodes[self._next_node % len(self.nodes)]
+            self._next_node += 1
+        return node
+
+    def _donation(self) -> Dict:
+        with self._rng_lock:
+            return random_donation(self._rng)
+
+    def send_one(self, scheduled: Optional[float] = None):
+        """
+        Sendet eine Spende. Bei 'scheduled' wird die Latenz ab dem geplanten
+        Zeitpunkt gemessen (vermeidet Coordinated Omission im Open-Loop-Modus).
+        Die Zeit bis zur Aufnahme in einen Block zählt ab demselben Zeitpunkt.
+        """
+        node = self._pick_node()
+        start = scheduled if scheduled is not None else time.perf_counter()
+        error = None
+        tx_id = None
+        try:
+            response = self._transport().post(f"{node}/transactions/new", json=self._donation(),
+                                              timeout=self.timeout)
+            if response.status_code == 201:
+                tx_id = response.json().get("transaction_id")
+            else:
+                error = f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            error = type(e).__name__
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            self.sent += 1
+            self.latencies.append(latency)
+            if error:
+                self.errors += 1
+                self.error_kinds[error] = self.error_kinds.get(error, 0) + 1
+            elif tx_id:
+                self.accepted[tx_id] = start
+
+    def run_open(self, rate: float, duration: float, max_workers: int = 64):
+        """Open-Loop: Poisson-Ankünfte mit 'rate' Spenden pro Sekunde."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            start = time.perf_counter()
+            next_send = start
+            while next_send - start < duration:
+                with self._rng_lock:
+                    next_send += self._rng.expovariate(rate)
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send_one, next_send)
+
+    def run_closed(self, concurrency: int, duration: float):
+        """Closed-Loop: 'concurrency' Clients senden jeweils nach der letzten Antwort."""
+        deadline = time.perf_counter() + duration
+
+        def worker():
+            while time.perf_counter() < deadline:
+                self.send_one()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def track_inclusion(self, stop: threading.Event, interval: float = 0.5):
+        """
+        Prüft einmal pro Intervall, welche angenommenen Spenden schon in einem
+        Block sind: pro Node eine Anfrage nach den neuen Blöcken (ab der
+        zuletzt gesehenen Höhe, REORG_DEPTH Blöcke überlappend) statt einer
+        Anfrage pro offener Spende, damit die Messung die Last nicht verfälscht.
+        """
+        heights: Dict[str, int] = {}   # Node → Chain-Länge bei der letzten Abfrage
+        for node in self.nodes:
+            try:
+                heights[node] = self._transport().get(f"{node}/tip", timeout=self.timeout).json()["height"]
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                heights[node] = 0
+
+        while not stop.wait(interval):
+            for node in self.nodes:
+                start = max(1, heights[node] - REORG_DEPTH)
+                try:
+                    response = self._transport().get(f"{node}/chain?start={start}", timeout=self.timeout)
+                    data = response.json() if response.status_code == 200 else None
+                except (requests.exceptions.RequestException, ValueError):
+                    continue
+                if not data:
+                    continue
+                heights[node] = data["length"]
+                now = time.perf_counter()
+                with self._lock:
+                    for block in data["chain"]:
+                        for tx in block["transactions"]:
+                            sent_at = self.accepted.pop(tx.get("id"), None)
+                            if sent_at is not None:
+                                self.inclusion_delays.append(now - sent_at)
+
+    def report(self, elapsed: float) -> Dict:
+        """Fasst die Messwerte zusammen (Zeiten in Millisekunden bzw. Sekunden)."""
+        def ms(value):
+            return None if value is None else value * 1000
+
+        return {
+            "sent": self.sent,
+            "elapsed_s": elapsed,
+            "throughput_per_s": self.sent / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / self.sent if self.sent else 0.0,
+            "errors": self.error_kinds,
+            "latency_ms": {
+                "p50": ms(percentile(self.latencies, 50)),
+                "p95": ms(percentile(self.latencies, 95)),
+                "p99": ms(percentile(self.latencies, 99)),
+                "max": ms(max(self.latencies) if self.latencies else None),
+            },
+            "inclusion_s": {
+                "confirmed": len(self.inclusion_delays),
+                "unconfirmed": len(self.accepted),
+                "p50": percentile(self.inclusion_delays, 50),
+                "p95": percentile(self.inclusion_delays, 95),
+                "p99": percentile(self.inclusion_delays, 99),
+            }
+        }
+
+
+def run(nodes: List[str], mode: str = "open", rate: float = 10.0, concurrency: int = 4,
+        duration: float = 10.0, inclusion_timeout: float = 10.0, seed: int = 42,
+        transport_factory=HttpTransport) -> Dict:
+    """Führt einen Lasttest aus und gibt den Bericht zurück."""
+    generator = LoadGenerator(nodes, transport_factory=transport_factory, seed=seed)
+    stop = threading.Event()
+    tracker = threading.Thread(target=generator.track_inclusion, args=(stop,), daemon=True)
+    tracker.start()
+
+    start = time.perf_counter()
+    if mode == "open":
+        generator.run_open(rate, duration)
+    else:
+        generator.run_closed(concurrency, duration)
+    elapsed = time.perf_counter() - start
+
+    # Nach dem Lasttest noch auf Aufnahme in Blöcke warten
+    deadline = time.perf_counter() + inclusion_timeout
+    while generator.accepted and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    stop.set()
+    tracker.join()
+
+    report = generator.report(elapsed)
+    report.update({"mode": mode, "nodes": nodes, "rate": rate if mode == "open" else None,
+                   "concurrency": concurrency if mode == "closed" else None})
+    return report
+
+
+def print_report(report: Dict):
+    latency = report["latency_ms"]
+    inclusion = report["inclusion_s"]
+
+    def fmt(value, unit):
+        return "-" if value is None else f"{value:.2f} {unit}"
+
+    print("\n" + "="*60)
+    print(f"  LASTTEST ({report['mode']}-loop, {len(report['nodes'])} Node(s))")
+    print("="*60)
+    print(f"Gesendet:      {report['sent']} in {report['elapsed_s']:.1f}s "
+          f"({report['throughput_per_s']:.1f}/s)")
+    print(f"Fehlerrate:    {report['error_rate']:.2%} {report['errors'] or ''}")
+    print(f"Latenz:        p50 {fmt(latency['p50'], 'ms')} | p95 {fmt(latency['p95'], 'ms')} | "
+          f"p99 {fmt(latency['p99'], 'ms')}")
+    print(f"Im Block nach: p50 {fmt(inclusion['p50'], 's')} | p95 {fmt(inclusion['p95'], 's')} | "
+          f"p99 {fmt(inclusion['p99'], 's')} ({inclusion['unconfirmed']} noch offen)")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lastgenerator für Spenden")
+    parser.add_argument("--nodes", default="http://localhost:5000",
+                        help="Kommagetrennte Node-URLs (Round-Robin)")
+    parser.add_argument("--sim", type=int, default=0,
+                        help="Statt echter Nodes einen simulierten Cluster mit N Nodes verwenden")
+    parser.add_argument("--mode", choices=["open", "closed"], default="open")
+    parser.add_argument("--rate", type=float, default=10.0, help="Spenden pro Sekunde (open)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Anzahl Clients (closed)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Dauer in Sekunden")
+    parser.add_argument("--inclusion-timeout", type=float, default=10.0,
+                        help="Nach dem Test so lange auf Aufnahme in Blöcke warten")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Bericht als JSON speichern")
+    args = parser.parse_args()
+
+    if args.sim:
+        from cluster import Cluster, SimulatedTransport
+        cluster = Cluster(args.sim)
+        nodes = cluster.addresses
+        transport_factory = lambda: SimulatedTransport(cluster.network, "loadgen")  # noqa: E731
+    else:
+        nodes = [node.strip().rstrip("/") for node in args.nodes.split(",") if node.strip()]
+        transport_factory = HttpTransport
+
+    report = run(nodes, mode=args.mode, rate=args.rate, concurrency=args.concurrency,
+                 duration=args.duration, inclusion_timeout=args.inclusion_timeout,
+                 seed=args.seed, transport_factory=transport_factory)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Bericht gespeichert: {args.output}")
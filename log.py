@@ -0,0 +1,155 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# Eigene Stufe zwischen INFO und WARNING für seltene Zusammenfassungen
+# (Block gemined, Chain ersetzt). Standard im Betrieb: nur SUMMARY und höher.
+SUMMARY = 25
+logging.addLevelName(SUMMARY, "SUMMARY")
+
+DEFAULT_LEVEL = "SUMMARY"
+RATE_LIMIT_SECONDS = 60.0
+QUEUE_SIZE = 10000
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Gibt den Logger für ein Modul zurück (z.B. "blockchain", "node")."""
+    return logging.getLogger(f"spenden.{name}")
+
+
+def kv(**fields: Any) -> Dict[str, Any]:
+    """
+    Strukturierte Felder für einen Log-Aufruf:
+        log.info("Block gemined", extra=kv(index=3, nonce=1234))
+    """
+    return {"fields": fields}
+
+
+def rate_limited(key: str, **fields: Any) -> Dict[str, Any]:
+    """
+    Wie kv(), aber gleiche Meldungen (gleicher key) werden höchstens einmal pro
+    RATE_LIMIT_SECONDS ausgegeben; die Anzahl unterdrückter Meldungen wird beim
+    nächsten Mal als Feld "suppressed" angehängt.
+    """
+    return {"fields": fields, "rate_key": key}
+
+
+class RateLimitFilter(logging.Filter):
+    """Fasst wiederholte Meldungen (z.B. "Peer nicht erreichbar") zusammen."""
+
+    def __init__(self, interval: float = RATE_LIMIT_SECONDS):
+        super().__init__()
+        self.interval = interval
+        self._last: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last.get(key, float("-inf")) < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+
+        if suppressed:
+            record.fields = dict(getattr(record, "fields", {}), suppressed=suppressed)
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, der bei voller Queue verwirft statt zu blockieren."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Zeit, Stufe, Logger, Meldung und Felder als key=value."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+        line = f"{timestamp} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Meldung (für Log-Sammler)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Richtet das Logging ein: Meldungen werden nur in eine Queue gelegt und von
+    einem Hintergrund-Thread ausgegeben, damit langsame Ausgabe (z.B. Journal
+    auf SD-Karte) keine Request-Threads blockiert.
+
+    Args:
+        level: Log-Stufe (Standard: Umgebungsvariable LOG_LEVEL, sonst SUMMARY)
+        fmt: "text" oder "json" (Standard: Umgebungsvariable LOG_FORMAT, sonst text)
+    """
+    global _listener
+
+    level = (level or os.environ.get("LOG_LEVEL", DEFAULT_LEVEL)).upper()
+    fmt = fmt or os.environ.get("LOG_FORMAT", "text")
+
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger("spenden")
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    root.propagate = False
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Gibt alle noch wartenden Meldungen aus und beendet den Hintergrund-Thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from encoding import encode_transaction, transaction_id_from_bytes
+from log import get_logger, kv
+
+
+log = get_logger("mempool")
+
+
+# Verfügbare Strategien, wenn der Mempool voll ist
+EVICT_OLDEST = "oldest"   # Älteste Transaktion verwerfen, neue annehmen
+REJECT_NEW = "reject"     # Neue Transaktion ablehnen
+
+
+def transaction_id(transaction: Dict) -> str:
+    """
+    Berechnet die ID einer Transaktion (SHA-256 über die kanonische Binärkodierung).
+    Gleiche Transaktionen haben auf allen Nodes die gleiche ID.
+
+    Args:
+        transaction: Transaktion als Dictionary
+
+    Returns:
+        Hex-String der Transaktions-ID
+    """
+    return transaction_id_from_bytes(encode_transaction(transaction))
+
+
+class Mempool:
+    """
+    Warteschlange für noch nicht geminte Transaktionen.
+
+    Ein Hash-Index (ID → Transaktion) erlaubt Duplikat-Erkennung in O(1),
+    eine Deque hält die Ankunftsreihenfolge. Entfernte Transaktionen werden
+    nur aus dem Index gelöscht und beim Lesen der Deque übersprungen.
+    Anzahl und Speicherverbrauch sind begrenzt.
+    """
+
+    def __init__(self, max_size: int = 1000, max_bytes: int = 1_000_000,
+                 eviction_policy: str = EVICT_OLDEST):
+        """
+        Initialisiert einen leeren Mempool.
+
+        Args:
+            max_size: Maximale Anzahl Transaktionen
+            max_bytes: Maximaler (geschätzter) Speicherverbrauch in Bytes
+            eviction_policy: EVICT_OLDEST oder REJECT_NEW
+        """
+        if eviction_policy not in (EVICT_OLDEST, REJECT_NEW):
+            raise ValueError(f"Unbekannte Eviction-Strategie: {eviction_policy}")
+
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+
+        self._index: Dict[str, Dict] = {}     # ID → Transaktion
+        self._sizes: Dict[str, int] = {}      # ID → geschätzte Größe in Bytes
+        self._order: Deque[str] = deque()     # IDs in Ankunftsreihenfolge
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.evicted_count = 0  # Anzahl verdrängter Transaktionen (Statistik)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __bool__(self) -> bool:
+        return bool(self._index)
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self._index
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iteriert in Ankunftsreihenfolge über eine Kopie der Transaktionen."""
+        with self._lock:
+            return iter([self._index[tx_id] for tx_id in self._order if tx_id in self._index])
+
+    @property
+    def size_bytes(self) -> int:
+        """Geschätzter Speicherverbrauch aller Transaktionen in Bytes."""
+        return self._bytes
+
+    def add(self, transaction: Dict) -> bool:
+        """
+        Fügt eine Transaktion hinzu.
+
+        Args:
+            transaction: Transaktion mit gesetztem "id"-Feld
+
+        Returns:
+            True wenn hinzugefügt, False bei Duplikat oder vollem Mempool
+        """
+        tx_id = transaction["id"]
+        size = len(json.dumps(transaction))
+
+        with self._lock:
+            if tx_id in self._index:
+                return False
+
+            if size > self.max_bytes:
+                return False
+
+            # Platz schaffen, falls nötig
+            while self._index and (len(self._index) >= self.max_size
+                                   or self._bytes + size > self.max_bytes):
+                if self.eviction_policy == REJECT_NEW:
+                    return False
+                evicted = self._pop_oldest()
+                self.evicted_count += 1
+                # Die verdrängte Spende wurde schon bestätigt (201) - nicht still verwerfen
+                log.warning("Mempool voll: Transaktion verdrängt", extra=kv(
+                    id=evicted["id"][:16], sender=evicted.get("sender"), amount=evicted.get("amount")))
+
+            self._index[tx_id] = transaction
+            self._sizes[tx_id] = size
+            self._order.append(tx_id)
+            self._bytes += size
+            return True
+
+    def take(self, count: int) -> List[Dict]:
+        """
+        Entnimmt bis zu 'count' Transaktionen (älteste zuerst).
+
+        Args:
+            count: Maximale Anzahl (z.B. Block-Kapazität)
+
+        Returns:
+            Liste der entnommenen Transaktionen
+        """
+        taken = []
+        with self._lock:
+            while self._index and len(taken) < count:
+                taken.append(self._pop_oldest())
+        return taken
+
+    def requeue(self, transactions: List[Dict]):
+        """
+        Stellt mit take() entnommene Transaktionen wieder an den Anfang
+        (z.B. wenn das Mining fehlschlägt). Sie waren schon angenommen,
+        daher ohne Prüfung der Grenzen.
+        """
+        with self._lock:
+            for transaction in reversed(transactions):
+                tx_id = transaction["id"]
+                if tx_id in self._index:
+                    continue
+                size = len(json.dumps(transaction))
+                self._index[tx_id] = transaction
+                self._sizes[tx_id] = size
+                self._order.appendleft(tx_id)
+                self._bytes += size
+
+    def remove(self, tx_ids: Iterable[str]) -> int:
+        """
+        Entfernt Transaktionen anhand ihrer IDs (z.B. nach Chain-Ersetzung).
+
+        Returns:
+            Anzahl tatsächlich entfernter Transaktionen
+        """
+        removed = 0
+        with self._lock:
+            for tx_id in tx_ids:
+                if tx_id in self._index:
+                    self._discard(tx_id)
+                    removed += 1
+            self._compact()
+        return removed
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """Gibt den Zeitstempel der ältesten Transaktion zurück (oder None)."""
+        with self._lock:
+            self._skip_stale()
+            if not self._order:
+                return None
+            return self._index[self._order[0]]["timestamp"]
+
+    def oldest_age(self, now: Optional[float] = None) -> float:
+        """Alter der ältesten Transaktion in Sekunden (0, wenn leer)."""
+        oldest = self.oldest_timestamp()
+        if oldest is None:
+            return 0.0
+        return (now or time.time()) - oldest
+
+    def clear(self):
+        """Leert den Mempool."""
+        with self._lock:
+            self._index.clear()
+            self._sizes.clear()
+            self._order.clear()
+            self._bytes = 0
+
+    # -------------------- Interne Hilfsmethoden (Lock muss gehalten werden) --------------------
+
+    def _discard(self, tx_id: str) -> Dict:
+        """Entfernt eine Transaktion aus dem Index (Deque-Eintrag bleibt stale)."""
+        self._bytes -= self._sizes.pop(tx_id)
+        return self._index.pop(tx_id)
+
+    def _skip_stale(self):
+        """Entfernt bereits gelöschte IDs vom Anfang der Deque."""
+        while self._order and self._order[0] not in self._index:
+            self._order.popleft()
+
+    def _pop_oldest(self) -> Dict:
+        self._skip_stale()
+        return self._discard(self._order.popleft())
+
+    def _compact(self):
+        """Baut die Deque neu auf, wenn sie überwiegend aus stale IDs besteht."""
+        if len(self._order) > 2 * len(self._index) + 64:
+            self._order = deque(tx_id for tx_id in self._order if tx_id in self._index)
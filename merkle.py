@@ -0,0 +1,72 @@
+import hashlib
+from typing import List, Tuple
+
+
+# Präfixe trennen Blätter und innere Knoten (verhindert, dass ein innerer
+# Knoten als Blatt ausgegeben werden kann)
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+# Wurzel eines Blocks ohne Transaktionen
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def _leaf_hash(leaf: bytes) -> bytes:
+    return hashlib.sha256(_LEAF + leaf).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE + left + right).digest()
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """
+    Merkle-Wurzel über die Transaktions-IDs eines Blocks (32 Bytes).
+    Bei ungerader Anzahl wird der letzte Knoten unverändert eine Ebene
+    nach oben gereicht (nicht dupliziert).
+
+    Args:
+        leaves: Transaktions-IDs als Bytes, in Block-Reihenfolge
+    """
+    if not leaves:
+        return EMPTY_ROOT
+    level = [_leaf_hash(leaf) for leaf in leaves]
+    while len(level) > 1:
+        next_level = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Tuple[str, bytes]]:
+    """
+    Inclusion-Proof für das Blatt an Position 'index'.
+
+    Returns:
+        Liste von (Seite, Hash) von unten nach oben; Seite "L" bzw. "R" gibt
+        an, auf welcher Seite der Geschwister-Knoten steht
+    """
+    if not 0 <= index < len(leaves):
+        raise IndexError(f"Kein Blatt an Position {index}")
+    proof = []
+    level = [_leaf_hash(leaf) for leaf in leaves]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("L" if sibling < index else "R", level[sibling]))
+        # Ohne Geschwister (letzter Knoten bei ungerader Anzahl) geht es unverändert nach oben
+        next_level = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: List[Tuple[str, bytes]], root: bytes) -> bool:
+    """Prüft, ob 'leaf' mit dem Proof zur Merkle-Wurzel 'root' führt."""
+    node = _leaf_hash(leaf)
+    for side, sibling in proof:
+        node = _node_hash(sibling, node) if side == "L" else _node_hash(node, sibling)
+    return node == root
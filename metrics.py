@@ -0,0 +1,224 @@
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Standard-Buckets für Dauer-Histogramme (Sekunden)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Basisklasse: Metrik mit optionalen Labels (z.B. peer, endpoint)."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values, **kwargs) -> "_Metric":
+        """Gibt die Metrik für eine bestimmte Label-Kombination zurück."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: erwartet Labels {self.labelnames}")
+
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[str, Tuple[str, ...], str, float]]:
+        """Liefert (Suffix, Label-Werte, Extra-Label, Wert) für die Ausgabe."""
+        if not self.labelnames:
+            return [(suffix, (), extra, value) for suffix, extra, value in self._values()]
+        samples = []
+        for key, child in list(self._children.items()):
+            samples.extend((suffix, key, extra, value) for suffix, extra, value in child._values())
+        return samples
+
+    def _values(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, label_values, extra, value in self._samples():
+            labels = _format_labels(self.labelnames, label_values, extra)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Zähler, der nur steigt (z.B. gemined Blöcke, Fehler). Name endet auf _total."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def _values(self):
+        return [("", "", self._value)]
+
+
+class Gauge(_Metric):
+    """Momentanwert (z.B. Mempool-Größe). Optional über eine Funktion berechnet."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Wert wird erst beim Abruf von /metrics berechnet (kein Aufwand im Hot-Path)."""
+        self._function = function
+
+    def _values(self):
+        value = self._function() if self._function else self._value
+        return [("", "", value)]
+
+
+class _Timer(ContextDecorator):
+    """Misst die Dauer eines Blocks bzw. Funktionsaufrufs in Sekunden."""
+
+    def __init__(self, histogram: "Histogram"):
+        self._histogram = histogram
+        self._start = 0.0
+
+    def _recreate_cm(self):
+        # Als Decorator: pro Aufruf ein eigener Timer (thread-sicher)
+        return _Timer(self._histogram)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten (z.B. Dauer) in festen Buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # letzter Bucket = +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def time(self) -> _Timer:
+        """Context-Manager / Decorator, der die Dauer beobachtet."""
+        return _Timer(self)
+
+    def _values(self):
+        values = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self._counts):
+            cumulative += count
+            values.append(("_bucket", f'le="{_format_value(bound)}"', cumulative))
+        values.append(("_sum", "", self._sum))
+        values.append(("_count", "", self._count))
+        return values
+
+
+class Registry:
+    """
+    Sammlung aller Metriken eines Prozesses.
+    Metriken mit gleichem Namen werden wiederverwendet (get-or-create).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metrik {name} existiert bereits mit anderem Typ")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat (für GET /metrics)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Globale Registry (wird von blockchain.py und node.py verwendet)
+REGISTRY = Registry()
+
+# Content-Type des Prometheus-Textformats
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
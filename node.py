@@ -1,30 +1,243 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, redirect, request
 from flask_cors import CORS
 import requests
-from blockchain import Blockchain
+from blockchain import Blockchain, CONSENSUS_PHASE_SECONDS
+from encoding import (ORGANIZATIONS, BINARY_MIME, encode_chain, decode_chain, encode_headers,
+                      decode_headers, encode_transaction, decode_transaction)
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from log import SUMMARY, get_logger, kv, rate_limited, setup_logging
+from peers import DISCOVERED, PeerManager
+from storage import ChainStore
+from transport import HttpTransport
+import profiler
+import hmac
+import os
+import queue
 import threading
 import time
-from typing import Set
+import uuid
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+from urllib.parse import urlsplit
 
 
+log = get_logger("node")
+
 # Flask App initialisieren
 app = Flask(__name__)
-CORS(app)  # Erlaubt Frontend-Zugriff von anderen Domains
+CORS(app, expose_headers=["X-Chain-Length"])  # Erlaubt Frontend-Zugriff von anderen Domains
+
+# Datenverzeichnis für Blöcke und Snapshots (ohne: Chain nur im Arbeitsspeicher)
+NODE_DATA_DIR = os.environ.get("NODE_DATA_DIR")
+
+# Gekürzter Node: nur die neuesten PRUNE_DEPTH Blöcke mit Transaktionen behalten,
+# ältere nur als Header + Spendensummen (ohne: Archiv-Node mit voller Historie)
+PRUNE_DEPTH = int(os.environ["PRUNE_DEPTH"]) if os.environ.get("PRUNE_DEPTH") else None
+
+# Archiv-Node, an den Anfragen nach hier gekürzten Blöcken weitergeleitet werden
+ARCHIVE_NODE = os.environ.get("ARCHIVE_NODE")
+
+# Höchstens so viele Header pro Anfrage an /headers (Light-Clients laden seitenweise)
+HEADERS_MAX = 2000
+
+# Höchstens so viele Transaktionen mit Proof pro Anfrage an /transactions/recent
+RECENT_MAX = 50
+
+# Alle wie viele Sekunden die ganze Chain geprüft wird (Ergebnis: chain_valid in /stats)
+CHAIN_AUDIT_INTERVAL = 600
+
+# Blockchain-Instanz erstellen (mit NODE_DATA_DIR: gespeicherte Chain laden)
+blockchain = Blockchain(difficulty=4, store=ChainStore(NODE_DATA_DIR) if NODE_DATA_DIR else None,
+                        prune_depth=PRUNE_DEPTH)
+
+# Bekannte Nodes (andere Raspberry Pis) mit Erreichbarkeit und Score
+peer_nodes = PeerManager(
+    max_peers=int(os.environ.get("MAX_PEERS", 16)),
+    fanout=int(os.environ.get("GOSSIP_FANOUT", 4))
+)
+
+# Eigene Adresse, wie Peers diesen Node erreichen (z.B. "http://192.168.1.100:5000").
+# Wird bei Anfragen an Peers mitgeschickt, damit sie diesen Node kennenlernen.
+# Ohne: andere Nodes finden diesen Node nur per /nodes/register.
+NODE_ADDRESS = os.environ.get("NODE_ADDRESS")
+
+# Zufällige ID dieses Prozesses (in /health), damit Discovery den eigenen Node
+# auch unter einer anderen Adresse (localhost, zweite IP) erkennt
+NODE_ID = uuid.uuid4().hex
+
+# Alle wie viele Sekunden Peers ohne gemeldeten Tip nach ihrem Tip gefragt (Heartbeat)
+# und Peer-Listen ausgetauscht werden
+PEER_INTERVAL = 30
+
+# Fork-Suche beim Sync: so viele Header unter dem eigenen Tip werden zuerst verglichen
+# (reicht das nicht, wird das Fenster verdoppelt)
+FORK_SEARCH_WINDOW = 16
+
+# Adressen, unter denen Discovery den eigenen Node gefunden hat
+_own_addresses = {NODE_ADDRESS} if NODE_ADDRESS else set()
+
+# Prüfung unbekannter Adressen aus "X-Peer-Address" per /health: eigene kleine
+# Warteschlange (verdrängt keine Weiterleitungen) und höchstens
+# PROBES_PER_MINUTE Prüfungen pro Minute
+PROBE_QUEUE_MAX = 16
+PROBES_PER_MINUTE = 30
+_probe_queue: "queue.Queue" = queue.Queue(maxsize=PROBE_QUEUE_MAX)
+_probe_thread: Optional[threading.Thread] = None
+_probe_lock = threading.Lock()   # schützt _probing, _probe_times und _probe_thread
+_probing = set()                 # Adressen in der Warteschlange oder in Prüfung
+_probe_times = deque()           # Startzeiten der Prüfungen der letzten Minute
+
+# Gemeinsames Geheimnis der Nodes (optional). Mit Token lernt ein Node Adressen
+# nur aus Anfragen mit passendem "X-Peer-Token", ohne nur, wenn die Adresse
+# auf den anfragenden Rechner zeigt (siehe is_peer_request)
+PEER_TOKEN = os.environ.get("PEER_TOKEN")
+
+# Transport für Anfragen an Peers (im Cluster-Harness durch ein simuliertes Netzwerk ersetzt)
+transport = HttpTransport()
+
+# Höchstens so viele wartende Weiterleitungen (Gossip, Sync nach Block-Meldung);
+# darüber werden neue verworfen (der Heartbeat holt verpasste Blöcke nach)
+RELAY_QUEUE_MAX = 1000
+_relay_queue: "queue.Queue" = queue.Queue(maxsize=RELAY_QUEUE_MAX)
+_relay_thread: Optional[threading.Thread] = None
+_relay_thread_lock = threading.Lock()
+
+# Format für die Kommunikation mit Peers: "binary" (kompakt) oder "json"
+# Browser bekommen immer JSON, Peers handeln das Format per Header aus.
+WIRE_FORMAT = os.environ.get("WIRE_FORMAT", "binary")
+
+
+def wants_binary() -> bool:
+    """Prüft, ob der Client das Binärformat bevorzugt (Accept-Header)."""
+    return request.accept_mimetypes.best == BINARY_MIME
+
+
+# Zugriff auf /admin/*: mit ADMIN_TOKEN nur per Header "X-Admin-Token",
+# ohne Token nur von localhost (z.B. per SSH auf dem Pi)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+def is_admin_request() -> bool:
+    """Prüft, ob die Anfrage Admin-Endpoints verwenden darf."""
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+
+def peer_headers(headers: Optional[dict] = None) -> dict:
+    """HTTP-Header für Anfragen an Peers, mit eigener Adresse (falls NODE_ADDRESS gesetzt)."""
+    headers = dict(headers or {})
+    if NODE_ADDRESS:
+        headers["X-Peer-Address"] = NODE_ADDRESS
+    if PEER_TOKEN:
+        headers["X-Peer-Token"] = PEER_TOKEN
+    return headers
+
+
+def requesting_address() -> Optional[str]:
+    """Adresse des anfragenden Nodes aus "X-Peer-Address" (ungeprüft; None wenn keine/wir selbst)."""
+    address = request.headers.get("X-Peer-Address", "").rstrip("/")
+    if not address.startswith(("http://", "https://")) or address in _own_addresses:
+        return None
+    return address
 
-# Blockchain-Instanz erstellen
-blockchain = Blockchain(difficulty=4)
 
-# Set für bekannte Nodes (andere Raspberry Pis)
-peer_nodes: Set[str] = set()
+def is_peer_request(address: str) -> bool:
+    """
+    Prüft, ob die Anfrage von dem Node unter 'address' stammen kann: mit
+    PEER_TOKEN muss "X-Peer-Token" passen, ohne muss die Adresse auf den
+    anfragenden Rechner zeigen. So kann kein Client den Node Anfragen an
+    beliebige fremde Adressen stellen lassen.
+    """
+    if PEER_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Peer-Token", ""), PEER_TOKEN)
+    return urlsplit(address).hostname == request.remote_addr
+
+
+def trusted_requesting_address() -> Optional[str]:
+    """Adresse aus "X-Peer-Address", wenn die Anfrage sie belegt (siehe is_peer_request)."""
+    address = requesting_address()
+    if address is None or not is_peer_request(address):
+        return None
+    return address
+
+
+def learn_peer_address() -> Optional[str]:
+    """
+    Liest die Adresse des anfragenden Nodes (Header "X-Peer-Address").
+    Unbekannte Adressen werden nur aus Anfragen von Nodes übernommen
+    (is_peer_request), im Hintergrund per /health geprüft und erst danach
+    als entdeckter Peer aufgenommen (wie bei discover_peers).
+    
+    Returns:
+        Die Adresse, wenn sie ein bekannter Peer ist (sonst None)
+    """
+    address = requesting_address()
+    if address is None:
+        return None
+    if address in peer_nodes:
+        return address
+    if len(peer_nodes) < peer_nodes.max_peers and is_peer_request(address):
+        queue_probe(address)
+    return None
+
+
+# ==================== METRIKEN ====================
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "node_http_request_seconds", "Bearbeitungsdauer pro Endpoint in Sekunden",
+    ["endpoint", "method", "status"])
+BROADCAST_SECONDS = REGISTRY.histogram(
+    "node_broadcast_seconds", "Dauer einer Broadcast-Anfrage an einen Peer in Sekunden",
+    ["peer", "kind"])
+BROADCAST_FAILURES = REGISTRY.counter(
+    "node_broadcast_failures_total", "Fehlgeschlagene Broadcasts an Peers", ["peer", "kind"])
+CONSENSUS_BYTES = REGISTRY.counter(
+    "node_consensus_bytes_total", "Beim Konsens von Peers geladene Bytes", ["peer"])
+
+REGISTRY.gauge("node_chain_height", "Anzahl Blöcke in der Chain").set_function(
+    lambda: len(blockchain.chain))
+REGISTRY.gauge("node_mempool_transactions", "Wartende Transaktionen im Mempool").set_function(
+    lambda: len(blockchain.mempool))
+REGISTRY.gauge("node_mempool_bytes", "Geschätzter Speicher des Mempools").set_function(
+    lambda: blockchain.mempool.size_bytes)
+REGISTRY.gauge("node_mempool_oldest_age_seconds", "Alter der ältesten wartenden Transaktion").set_function(
+    lambda: blockchain.mempool.oldest_age())
+REGISTRY.gauge("node_mempool_evicted", "Aus dem vollen Mempool verdrängte Transaktionen").set_function(
+    lambda: blockchain.mempool.evicted_count)
+REGISTRY.gauge("node_chain_pruned_blocks", "Gekürzte Blöcke (nur Header + Spendensummen)").set_function(
+    lambda: blockchain.pruned_height - 1)
+REGISTRY.gauge("node_peers", "Anzahl bekannter Peers").set_function(lambda: len(peer_nodes))
+REGISTRY.gauge("node_peers_available", "Peers, die gerade nicht im Backoff sind").set_function(
+    lambda: len(peer_nodes.available()))
+REGISTRY.gauge("node_peers_evicted", "Wegen Fehlern entfernte Peers").set_function(
+    lambda: peer_nodes.evicted_count)
+REGISTRY.gauge("node_relay_queue", "Wartende Weiterleitungen an Peers").set_function(
+    lambda: _relay_queue.qsize())
+RELAY_DROPPED = REGISTRY.counter(
+    "node_relay_dropped_total", "Wegen voller Warteschlange verworfene Weiterleitungen")
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Bei aktiver cProfile-Sitzung (/admin/profile) wird der Request mitprofiliert
+    g.request_profile = profiler.begin()
 
-# Organisationen (fest vorgegeben)
-ORGANIZATIONS = [
-    "Rotes Kreuz",
-    "WWF",
-    "Ärzte ohne Grenzen",
-    "UNICEF",
-    "Greenpeace"
-]
+
+@app.after_request
+def observe_request_duration(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unbekannt"
+        REQUEST_SECONDS.labels(endpoint, request.method, response.status_code).observe(
+            time.perf_counter() - start)
+    return response
+
+
+@app.teardown_request
+def stop_request_profile(exc):
+    profiler.end(g.pop("request_profile", None))
 
 
 # ==================== REST API ENDPOINTS ====================
@@ -34,17 +247,86 @@ def health_check():
     """Prüft, ob der Node läuft."""
     return jsonify({
         "status": "running",
+        "node_id": NODE_ID,
         "blocks": len(blockchain.chain),
-        "pending_transactions": len(blockchain.mempool)
+        "pending_transactions": len(blockchain.mempool),
+        "pruned_blocks": blockchain.pruned_height - 1
     }), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Metriken im Prometheus-Textformat (Mining, Validierung, Peers, Mempool, Endpoints)."""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route('/chain', methods=['GET'])
 def get_chain():
-    """Gibt die komplette Blockchain zurück."""
+    """
+    Gibt die Blockchain zurück, mit ?start=&end= nur die Blöcke start..end-1.
+    Mit "Accept: application/x-spenden-binary" im Binärformat (für Peers).
+    
+    Gekürzte Blöcke enthalten nur Header und Spendensummen. Wird ein Ausschnitt
+    mit gekürzten Blöcken angefragt und ist ARCHIVE_NODE gesetzt, wird an den
+    Archiv-Node weitergeleitet.
+    """
+    length = len(blockchain.chain)
+    start = max(0, request.args.get("start", 0, type=int))
+    end = min(length, request.args.get("end", length, type=int))
+    
+    ranged = "start" in request.args or "end" in request.args
+    if ranged and ARCHIVE_NODE and max(start, 1) < min(end, blockchain.pruned_height):
+        return redirect(f"{ARCHIVE_NODE.rstrip('/')}/chain?start={start}&end={end}", code=307)
+    
+    chain_data = blockchain.get_chain_data(start, end)
+    if wants_binary():
+        return Response(encode_chain(chain_data), mimetype=BINARY_MIME)
+    
     return jsonify({
-        "chain": blockchain.get_chain_data(),
-        "length": len(blockchain.chain)
+        "chain": chain_data,
+        "length": length,
+        "start": start
+    }), 200
+
+
+@app.route('/headers', methods=['GET'])
+def get_headers():
+    """
+    Gibt die Block-Header (ohne Transaktionen) ab ?start= zurück, höchstens
+    HEADERS_MAX pro Anfrage. Für Light-Clients, die nur Header laden und
+    Proof-of-Work und Verkettung selbst prüfen.
+    Mit "Accept: application/x-spenden-binary" im Binärformat, die
+    Chain-Länge steht dann im Header "X-Chain-Length".
+    """
+    length = len(blockchain.chain)
+    start = max(0, request.args.get("start", 0, type=int))
+    end = min(length, request.args.get("end", length, type=int), start + HEADERS_MAX)
+    
+    headers = blockchain.get_headers(start, end)
+    if wants_binary():
+        response = Response(encode_headers(headers), mimetype=BINARY_MIME)
+        response.headers["X-Chain-Length"] = str(length)
+        return response
+    
+    return jsonify({
+        "headers": headers,
+        "length": length,
+        "start": start
+    }), 200
+
+
+@app.route('/tip', methods=['GET'])
+def get_tip():
+    """
+    Gibt Höhe (Anzahl Blöcke) und Hash des neuesten Blocks zurück.
+    Peers fragen das im Heartbeat ab und laden Blöcke nur, wenn dieser Node
+    weiter ist.
+    """
+    learn_peer_address()
+    chain = blockchain.chain
+    return jsonify({
+        "height": len(chain),
+        "hash": chain[-1].hash
     }), 200
 
 
@@ -59,6 +341,9 @@ def new_transaction():
         "recipient": "Rotes Kreuz",
         "amount": 50
     }
+    
+    Antwort: 201 mit transaction_id; 400 bei ungültigen Daten, 409 wenn die
+    Transaktion schon im Mempool oder in einem Block ist, 503 bei vollem Mempool.
     """
     data = request.get_json()
     
@@ -72,21 +357,89 @@ def new_transaction():
         return jsonify({"error": "Ungültige Organisation"}), 400
     
     # Transaktion zur Blockchain hinzufügen
-    blockchain.add_transaction(
-        sender=data['sender'],
-        recipient=data['recipient'],
-        amount=data['amount']
-    )
+    height = len(blockchain.chain)
+    try:
+        transaction = blockchain.build_transaction(
+            sender=data['sender'],
+            recipient=data['recipient'],
+            amount=data['amount']
+        )
+    except ValueError as e:
+        # Meldung nennt das Feld (Betrag, Absender, Zeitstempel)
+        return jsonify({"error": str(e)}), 400
+    
+    if blockchain.add_transaction(transaction['sender'], transaction['recipient'], transaction['amount'],
+                                  timestamp=transaction['timestamp']) is None:
+        # Abgelehnt: entweder schon bekannt (Mempool/Block) oder kein Platz im Mempool
+        known = blockchain.find_transaction(transaction['id'])
+        if known is not None:
+            return jsonify({
+                "error": "Transaktion doppelt",
+                "transaction_id": transaction['id'],
+                "status": known["status"]
+            }), 409
+        return jsonify({"error": "Mempool voll"}), 503
     
-    # Transaktion an alle Peers broadcasten
-    broadcast_transaction(data)
+    # Transaktion (inkl. Zeitstempel, damit die ID überall gleich ist) an alle Peers broadcasten
+    broadcast_transaction(transaction)
+    
+    # Volle Mempools werden beim Hinzufügen gemined - neuen Block melden
+    if len(blockchain.chain) > height:
+        broadcast_new_block()
     
     return jsonify({
         "message": "Transaktion erfolgreich hinzugefügt",
+        "transaction_id": transaction['id'],
         "mempool_size": len(blockchain.mempool)
     }), 201
 
 
+@app.route('/transactions/<tx_id>', methods=['GET'])
+def get_transaction_status(tx_id):
+    """
+    Gibt den Status einer Transaktion zurück:
+    "confirmed" (mit Block-Index) oder "pending" (noch im Mempool).
+    """
+    status = blockchain.find_transaction(tx_id)
+    
+    if status is None:
+        return jsonify({"error": "Transaktion unbekannt"}), 404
+    
+    return jsonify({"transaction_id": tx_id, **status}), 200
+
+
+@app.route('/transactions/<tx_id>/proof', methods=['GET'])
+def get_transaction_proof(tx_id):
+    """
+    Gibt eine bestätigte Transaktion mit Merkle-Inclusion-Proof zurück
+    (für Light-Clients, die nur Header kennen).
+    
+    Ist der Block gekürzt, wird an ARCHIVE_NODE weitergeleitet (ohne: 410).
+    """
+    proof = blockchain.transaction_proof(tx_id)
+    
+    if proof is None:
+        return jsonify({"error": "Transaktion nicht in der Chain"}), 404
+    
+    if proof.get("pruned"):
+        if ARCHIVE_NODE:
+            return redirect(f"{ARCHIVE_NODE.rstrip('/')}/transactions/{tx_id}/proof", code=307)
+        return jsonify({"error": "Block gekürzt", "block": proof["block"]}), 410
+    
+    return jsonify({"transaction_id": tx_id, **proof}), 200
+
+
+@app.route('/transactions/recent', methods=['GET'])
+def get_recent_transactions():
+    """Die neuesten bestätigten Transaktionen (?limit=, Standard 10) mit Inclusion-Proofs."""
+    limit = min(max(1, request.args.get("limit", 10, type=int)), RECENT_MAX)
+    
+    return jsonify({
+        "transactions": blockchain.recent_transactions(limit),
+        "length": len(blockchain.chain)
+    }), 200
+
+
 @app.route('/mine', methods=['POST'])
 def mine_block():
     """
@@ -118,26 +471,47 @@ def get_organizations():
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    """Gibt Statistiken über die Blockchain zurück."""
-    total_donations = 0
-    donations_per_org = {org: 0 for org in ORGANIZATIONS}
-    
-    # Alle Transaktionen durchgehen (außer Genesis)
-    for block in blockchain.chain[1:]:  # Genesis Block überspringen
-        for tx in block.transactions:
-            if tx['recipient'] in ORGANIZATIONS:
-                total_donations += tx['amount']
-                donations_per_org[tx['recipient']] += tx['amount']
+    """
+    Gibt Statistiken über die Blockchain zurück.
+    Die Summen werden pro Block fortgeschrieben, nicht bei jeder Anfrage berechnet.
+    chain_valid ist das Ergebnis der letzten vollständigen Prüfung
+    (chain_audit_thread), null bis sie nach dem Start einmal gelaufen ist.
+    """
+    totals = blockchain.get_donation_totals()
     
     return jsonify({
-        "total_donations": total_donations,
-        "donations_per_organization": donations_per_org,
+        "total_donations": totals["total"],
+        "donations_per_organization": totals["per_organization"],
         "total_blocks": len(blockchain.chain),
         "pending_transactions": len(blockchain.mempool),
-        "chain_valid": blockchain.is_chain_valid()
+        "chain_valid": blockchain.chain_valid
     }), 200
 
 
+@app.route('/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Spenden pro Organisation im Zeitverlauf, aus pro Block fortgeschriebenen
+    Rollups (ohne Durchlauf durch die Chain).
+    
+    Query-Parameter:
+        resolution: "minute", "hour" (Standard) oder "day"
+        start, end: Zeitraum als Unix-Zeit [start, end); Standard: die
+                    letzten 60 Buckets, höchstens 1440 Buckets pro Anfrage
+    
+    Buckets ohne Spenden werden ausgelassen.
+    """
+    try:
+        result = blockchain.analytics.query(
+            request.args.get("resolution", "hour"),
+            start=request.args.get("start", type=float),
+            end=request.args.get("end", type=float)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 200
+
+
 # ==================== P2P ENDPOINTS ====================
 
 @app.route('/nodes/register', methods=['POST'])
@@ -156,10 +530,10 @@ def register_node():
     if not node_address:
         return jsonify({"error": "Keine Node-Adresse angegeben"}), 400
     
-    # Node zur Peer-Liste hinzufügen
-    peer_nodes.add(node_address)
+    # Node zur Peer-Liste hinzufügen (manuell registrierte Peers werden nie entfernt)
+    peer_nodes.add(node_address.rstrip("/"))
     
-    print(f"🔗 Neuer Peer registriert: {node_address}")
+    log.info("Neuer Peer registriert", extra=kv(peer=node_address))
     
     return jsonify({
         "message": "Node erfolgreich registriert",
@@ -169,10 +543,20 @@ def register_node():
 
 @app.route('/nodes/list', methods=['GET'])
 def list_nodes():
-    """Gibt alle bekannten Peer-Nodes zurück."""
+    """
+    Gibt die erreichbaren Peer-Nodes zurück ("peers", ohne Peers im Backoff,
+    damit Discovery keine toten Adressen verbreitet) und alle bekannten mit
+    Zustand ("details": Score, Latenz, Backoff).
+    Dient auch dem Peer-Austausch: schickt ein Node seine Adresse im Header
+    "X-Peer-Address" mit, wird er nach Prüfung als entdeckter Peer
+    aufgenommen (siehe learn_peer_address).
+    """
+    learn_peer_address()
+    
     return jsonify({
-        "peers": list(peer_nodes),
-        "count": len(peer_nodes)
+        "peers": peer_nodes.shareable(),
+        "count": len(peer_nodes),
+        "details": peer_nodes.snapshot()
     }), 200
 
 
@@ -181,26 +565,7 @@ def consensus():
     """
     Konsens-Algorithmus: Ersetzt die Chain durch die längste gültige Chain.
     """
-    replaced = False
-    
-    for peer in peer_nodes:
-        try:
-            # Chain vom Peer holen
-            response = requests.get(f"{peer}/chain", timeout=5)
-            
-            if response.status_code == 200:
-                peer_chain = response.json()['chain']
-                
-                # Versuchen, unsere Chain zu ersetzen
-                if blockchain.replace_chain(peer_chain):
-                    replaced = True
-                    print(f"🔄 Chain von {peer} übernommen!")
-        
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  Peer {peer} nicht erreichbar: {e}")
-            continue
-    
-    if replaced:
+    if run_consensus():
         return jsonify({
             "message": "Chain wurde ersetzt",
             "new_length": len(blockchain.chain)
@@ -217,17 +582,43 @@ def receive_transaction():
     """
     Empfängt eine Transaktion von einem Peer-Node.
     Wird aufgerufen, wenn ein anderer Pi eine Transaktion broadcasted.
+    Akzeptiert JSON oder das Binärformat (Content-Type: application/x-spenden-binary).
     """
-    data = request.get_json()
+    if request.mimetype == BINARY_MIME:
+        try:
+            data, _ = decode_transaction(request.get_data())
+        except (ValueError, IndexError, UnicodeDecodeError) as e:
+            return jsonify({"error": f"Ungültige Transaktion: {e}"}), 400
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not all(key in data for key in ('sender', 'recipient', 'amount')):
+            return jsonify({"error": "Fehlende Felder"}), 400
     
     # Transaktion hinzufügen (ohne erneutes Broadcasting)
-    blockchain.add_transaction(
-        sender=data['sender'],
-        recipient=data['recipient'],
-        amount=data['amount']
-    )
+    # Duplikate (gleiche ID) werden vom Mempool verworfen
+    height = len(blockchain.chain)
+    try:
+        transaction = blockchain.add_transaction(
+            sender=data['sender'],
+            recipient=data['recipient'],
+            amount=data['amount'],
+            timestamp=data.get('timestamp')
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Ungültige Transaktion: {e}"}), 400
+    
+    if transaction is None:
+        return jsonify({"message": "Transaktion bereits bekannt oder Mempool voll"}), 200
     
-    print(f"📩 Transaktion von Peer empfangen: {data['sender']} → {data['recipient']}")
+    log.debug("Transaktion von Peer empfangen", extra=kv(id=transaction['id'][:16]))
+    
+    # Neue Transaktionen weiterleiten (Broadcasts erreichen nur GOSSIP_FANOUT Peers),
+    # bekannte wurden oben verworfen - so endet die Weiterleitung
+    # Im Hintergrund, damit der Request des Absenders nicht auf das ganze Netz wartet
+    sender = learn_peer_address()
+    relay(broadcast_transaction, transaction, exclude=[sender] if sender else ())
+    if len(blockchain.chain) > height:
+        relay(broadcast_new_block)
     
     return jsonify({"message": "Transaktion empfangen"}), 200
 
@@ -235,49 +626,515 @@ def receive_transaction():
 @app.route('/blocks/receive', methods=['POST'])
 def receive_block():
     """
-    Empfängt einen neuen Block von einem Peer-Node.
-    Triggert automatisch Konsens, um die Chain zu synchronisieren.
+    Empfängt die Meldung eines neuen Blocks von einem Peer-Node.
+    
+    Erwartet JSON mit dem Tip des Peers:
+    {
+        "height": 42,
+        "hash": "0000..."
+    }
+    Ist der Peer nicht weiter als wir, passiert nichts. Sonst werden nur die
+    fehlenden Blöcke geladen (im Hintergrund, siehe relay und sync_announced).
     """
-    print("📦 Neuer Block von Peer empfangen - starte Konsens...")
+    sender = learn_peer_address()
+    announcer = sender or trusted_requesting_address()
+    data = request.get_json(silent=True) or {}
+    height = data.get("height")
+    if not isinstance(height, int):
+        # Meldung ohne Tip: Tips der besten Peers abfragen
+        height = None
+    elif sender:
+        peer_nodes.record_tip(sender, height, data.get("hash", ""))
+    
+    if height is not None and height <= len(blockchain.chain):
+        return jsonify({"message": "Block bereits bekannt"}), 200
+    
+    log.debug("Neuer Block von Peer gemeldet - starte Sync", extra=kv(peer=sender, height=height))
+    relay(sync_announced, sender, height, announcer)
+    
+    return jsonify({"message": "Block empfangen, Sync gestartet"}), 202
+
+
+@app.route('/admin/profile', methods=['POST'])
+def profile_node():
+    """
+    Profiliert den laufenden Node für einige Sekunden (ohne Neustart).
+    
+    JSON-Body (alles optional):
+        mode: "sample" (Standard, Stacks aller Threads im collapsed-Format
+              für flamegraph.pl/speedscope) oder "cprofile" (Requests, Mining,
+              Konsens und Broadcasts mit cProfile)
+        seconds: Dauer (Standard 10, maximal 120)
+        interval: Sampling-Abstand in Sekunden (Standard 0.01)
+        format: bei cprofile "text" (Tabelle) oder "pstats" (.prof-Datei)
+    """
+    if not is_admin_request():
+        return jsonify({"error": "Nicht erlaubt"}), 403
+    
+    options = request.get_json(silent=True) or {}
+    mode = options.get("mode", "sample")
+    try:
+        seconds = float(options.get("seconds", 10))
+        interval = float(options.get("interval", profiler.DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return jsonify({"error": "seconds und interval müssen Zahlen sein"}), 400
     
-    # Konsens-Algorithmus ausführen
-    consensus()
+    try:
+        if mode == "sample":
+            result = profiler.sample(seconds, interval)
+            body, mimetype, filename = result.collapsed(), "text/plain", "profile.collapsed"
+        elif mode == "cprofile":
+            session = profiler.cprofile(seconds)
+            if options.get("format") == "pstats":
+                body, mimetype, filename = session.dump(), "application/octet-stream", "profile.prof"
+            else:
+                body, mimetype, filename = session.report(), "text/plain", "profile.txt"
+        else:
+            return jsonify({"error": f"Unbekannter Modus: {mode}"}), 400
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
     
-    return jsonify({"message": "Block empfangen, Konsens durchgeführt"}), 200
+    log.log(SUMMARY, "Profiling abgeschlossen", extra=kv(mode=mode, seconds=seconds))
+    return Response(body, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
 
 
 # ==================== HELPER FUNCTIONS ====================
 
-def broadcast_transaction(transaction_data: dict):
+@profiler.profiled
+def fetch_tip(peer: str) -> Optional[dict]:
+    """
+    Fragt den Tip eines Peers ab (GET /tip, wenige Bytes).
+    Dient zugleich als Heartbeat: Latenz und Erreichbarkeit werden gemeldet.
+    
+    Returns:
+        {"height": ..., "hash": ...} oder None, wenn der Peer nicht antwortet
+    """
+    start = time.perf_counter()
+    try:
+        response = transport.get(f"{peer}/tip", headers=peer_headers(), timeout=2)
+        CONSENSUS_BYTES.labels(peer).inc(len(response.content))
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"/tip: HTTP {response.status_code}")
+        tip = response.json()
+        height = int(tip["height"])
+    except requests.exceptions.RequestException as e:
+        if peer_nodes.record_failure(peer):
+            log.info("Peer entfernt", extra=kv(peer=peer, reason="nicht erreichbar"))
+        log.debug("Tip-Abfrage fehlgeschlagen", extra=kv(peer=peer, error=e))
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        peer_nodes.record_failure(peer)
+        log.warning("Ungültiger Tip von Peer", extra=rate_limited(f"invalid_tip:{peer}", peer=peer, error=e))
+        return None
+    
+    peer_nodes.record_success(peer, time.perf_counter() - start)
+    peer_nodes.record_tip(peer, height, tip.get("hash", ""))
+    return tip
+
+
+def find_fork(peer: str) -> int:
+    """
+    Sucht den ersten Block, in dem sich die Chain des Peers von unserer
+    unterscheidet. Verglichen werden die Hashes aus /headers, zuerst für
+    die letzten FORK_SEARCH_WINDOW Blöcke, bei Bedarf mit doppeltem Fenster
+    weiter zurück (Genesis ist immer gleich).
+    
+    Returns:
+        Fork-Höhe (Index des ersten abweichenden Blocks, mindestens 1)
+    
+    Raises:
+        requests.exceptions.RequestException: bei Netzwerkfehlern
+        ValueError: bei kaputten Header-Daten
+    """
+    chain = blockchain.chain
+    end = len(chain)
+    window = FORK_SEARCH_WINDOW
+    while True:
+        start = max(1, end - window)
+        if start >= end:
+            return end
+        response = transport.get(f"{peer}/headers?start={start}&end={end}",
+                                 headers=peer_headers({"Accept": f"{BINARY_MIME}, application/json;q=0.5"}),
+                                 timeout=5)
+        CONSENSUS_BYTES.labels(peer).inc(len(response.content))
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"/headers: HTTP {response.status_code}")
+        if response.headers.get("Content-Type", "").startswith(BINARY_MIME):
+            headers = decode_headers(response.content)
+        else:
+            headers = response.json()["headers"]
+        
+        # Erster abweichender Header (fehlende Header beim Peer zählen als Abweichung)
+        fork = next((header["index"] for header in headers if chain[header["index"]].hash != header["hash"]),
+                    start + len(headers))
+        if fork > start or start == 1:
+            return fork
+        end = start
+        window *= 2
+
+
+def fetch_blocks(peer: str, start: int) -> List[dict]:
+    """
+    Lädt die Blöcke ab 'start' von einem Peer (im Binärformat, falls konfiguriert).
+    
+    Raises:
+        requests.exceptions.RequestException: bei Netzwerkfehlern
+        ValueError: bei kaputten Block-Daten
+    """
+    headers = {}
+    if WIRE_FORMAT == "binary":
+        headers["Accept"] = f"{BINARY_MIME}, application/json;q=0.5"
+    with CONSENSUS_PHASE_SECONDS.labels("fetch").time():
+        response = transport.get(f"{peer}/chain?start={start}", headers=peer_headers(headers), timeout=5)
+    CONSENSUS_BYTES.labels(peer).inc(len(response.content))
+    # Ohne Latenz: die Dauer hängt hier vor allem von der Anzahl Blöcke ab
+    peer_nodes.record_success(peer)
+    if response.status_code != 200:
+        raise requests.exceptions.HTTPError(f"/chain: HTTP {response.status_code}")
+    
+    with CONSENSUS_PHASE_SECONDS.labels("decode").time():
+        if response.headers.get("Content-Type", "").startswith(BINARY_MIME):
+            return decode_chain(response.content)
+        return response.json()['chain']
+
+
+def sync_from_peer(peer: str, peer_height: int) -> bool:
+    """
+    Lädt die Blöcke ab dem Fork-Punkt von einem Peer, der weiter ist als wir,
+    und hängt sie an (Blockchain.extend_chain). Es werden nur die fehlenden
+    Blöcke übertragen und geprüft, nicht die ganze Chain.
+    
+    Zuerst werden die Blöcke ab unserem Tip geladen (der Normalfall: der Peer
+    hat nur neue Blöcke obendrauf). Passen sie nicht an unseren Tip, wird der
+    Fork-Punkt über die Header gesucht und ab dort geladen.
+    
+    Args:
+        peer: Adresse des Peers
+        peer_height: gemeldete Chain-Länge des Peers
+    
+    Returns:
+        True wenn unsere Chain dadurch länger wurde
+    """
+    if peer_height <= len(blockchain.chain):
+        return False
+    
+    try:
+        chain = blockchain.chain
+        fork = len(chain)
+        blocks = fetch_blocks(peer, fork)
+        if blocks and blocks[0]["previous_hash"] != chain[fork - 1].hash:
+            fork = find_fork(peer)
+            blocks = fetch_blocks(peer, fork)
+        
+        # Blöcke anhängen (Phasen validate und swap)
+        if blockchain.extend_chain(fork, blocks):
+            log.log(SUMMARY, "Blöcke von Peer übernommen",
+                    extra=kv(peer=peer, fork=fork, blocks=len(blocks), length=len(blockchain.chain)))
+            return True
+    
+    except requests.exceptions.RequestException as e:
+        peer_nodes.record_failure(peer)
+        log.warning("Peer nicht erreichbar", extra=rate_limited(f"unreachable:{peer}", peer=peer, error=e))
+    except (ValueError, KeyError, IndexError) as e:
+        peer_nodes.record_failure(peer)
+        log.warning("Ungültige Blöcke von Peer", extra=rate_limited(f"invalid_chain:{peer}", peer=peer, error=e))
+    return False
+
+
+def run_consensus(targets: Optional[Iterable[str]] = None) -> bool:
+    """
+    Fragt die Tips von Peers ab und synchronisiert mit denen, die eine
+    längere Chain haben (Longest Chain Rule). Peers auf gleicher Höhe kosten
+    nur die Tip-Abfrage. Wird vom Endpoint /consensus und bei Block-Meldungen
+    ohne Tip aufgerufen (braucht keinen Flask-Kontext).
+    
+    Args:
+        targets: zu fragende Peers (Standard: die besten SYNC_PEERS Peers,
+                 ohne Peers im Backoff)
+    
+    Returns:
+        True wenn die eigene Chain länger wurde
+    """
+    synced = False
+    if targets is None:
+        targets = peer_nodes.sync_targets()
+    
+    for peer in targets:
+        tip = fetch_tip(peer)
+        if tip is not None and sync_from_peer(peer, tip["height"]):
+            synced = True
+    
+    return synced
+
+
+# ==================== WEITERLEITUNG ====================
+
+def relay(task: Callable, *args, **kwargs):
+    """
+    Führt eine Weiterleitung (Gossip, Sync nach Block-Meldung) im
+    Hintergrund-Thread aus. So antwortet ein Node sofort, statt die
+    Weiterleitung durch das ganze Netz im Request des Absenders abzuwarten
+    (dessen Timeout würde sonst gesunde Peers in den Backoff schicken).
+    """
+    global _relay_thread
+    with _relay_thread_lock:
+        if _relay_thread is None:
+            _relay_thread = threading.Thread(target=relay_worker_thread, name="relay", daemon=True)
+            _relay_thread.start()
+    try:
+        _relay_queue.put_nowait((task, args, kwargs))
+    except queue.Full:
+        RELAY_DROPPED.inc()
+        log.warning("Weiterleitung verworfen: Warteschlange voll", extra=rate_limited("relay_full"))
+
+
+def relay_worker_thread():
+    """Hintergrund-Thread, der die Weiterleitungen aus relay() nacheinander ausführt."""
+    while True:
+        task, args, kwargs = _relay_queue.get()
+        try:
+            task(*args, **kwargs)
+        except Exception as e:
+            log.warning("Weiterleitung fehlgeschlagen", extra=rate_limited(
+                "relay_error", task=getattr(task, "__name__", task), error=e))
+        finally:
+            _relay_queue.task_done()
+
+
+def sync_announced(sender: Optional[str], height: Optional[int], announcer: Optional[str] = None):
     """
-    Sendet eine neue Transaktion an alle Peer-Nodes.
+    Sync nach einer Block-Meldung und übernommene Blöcke weitermelden.
+    Geladen wird beim meldenden Peer, wenn er bekannt ist, sonst bei den
+    besten bekannten Peers, bis die gemeldete Höhe erreicht ist (ohne
+    gemeldeten Tip: bei den SYNC_PEERS besten). Hat keiner von ihnen die
+    Blöcke (z.B. frisch gemined von einem Node außerhalb unserer vollen
+    Peer-Liste), wird der Melder erst per /health geprüft wie bei
+    discover_peers und nur dann bei ihm geladen.
+    
+    Args:
+        sender: meldender Peer (None, wenn er kein bekannter Peer ist)
+        height: gemeldete Chain-Länge (None, wenn nicht mitgeschickt)
+        announcer: Adresse des Melders aus "X-Peer-Address" (siehe trusted_requesting_address)
     """
-    for peer in peer_nodes:
+    if height is None:
+        synced = run_consensus([sender] if sender else None)
+    elif height <= len(blockchain.chain):
+        return  # Inzwischen über eine andere Meldung übernommen
+    elif sender:
+        synced = sync_from_peer(sender, height)
+    else:
+        synced = False
+        for peer in peer_nodes.sync_targets(count=peer_nodes.max_peers):
+            if len(blockchain.chain) >= height:
+                break
+            tip = fetch_tip(peer)
+            if tip is not None and sync_from_peer(peer, tip["height"]):
+                synced = True
+        if (len(blockchain.chain) < height and announcer
+                and check_node(announcer) is not None):
+            synced = sync_from_peer(announcer, height) or synced
+    if synced:
+        # Übernommene Blöcke weitermelden (erreicht die Peers außerhalb des Fan-outs)
+        broadcast_new_block(exclude=[announcer] if announcer else ())
+
+
+@profiler.profiled
+def broadcast_transaction(transaction_data: dict, exclude: Iterable[str] = ()):
+    """
+    Sendet eine neue Transaktion an höchstens GOSSIP_FANOUT Peers (nach Score
+    gewichtete Auswahl), die sie weiterleiten.
+    Im Binärformat, mit Fallback auf JSON für Peers ohne Binär-Unterstützung.
+    
+    Args:
+        exclude: Peers, die die Transaktion schon haben (z.B. der Absender)
+    """
+    encoded = encode_transaction(transaction_data) if WIRE_FORMAT == "binary" else None
+    
+    for peer in peer_nodes.gossip_targets(exclude):
+        start = time.perf_counter()
         try:
-            requests.post(
-                f"{peer}/transactions/receive",
-                json=transaction_data,
-                timeout=2
-            )
-            print(f"📤 Transaktion an {peer} gesendet")
+            response = None
+            if encoded is not None:
+                response = transport.post(
+                    f"{peer}/transactions/receive",
+                    data=encoded,
+                    headers=peer_headers({"Content-Type": BINARY_MIME}),
+                    timeout=2
+                )
+            if response is None or response.status_code == 415:
+                transport.post(
+                    f"{peer}/transactions/receive",
+                    json=transaction_data,
+                    headers=peer_headers(),
+                    timeout=2
+                )
+            duration = time.perf_counter() - start
+            BROADCAST_SECONDS.labels(peer, "transaction").observe(duration)
+            peer_nodes.record_success(peer, duration)
+            log.debug("Transaktion gesendet", extra=kv(peer=peer))
         except requests.exceptions.RequestException as e:
-            print(f"⚠️  Konnte Transaktion nicht an {peer} senden: {e}")
+            BROADCAST_FAILURES.labels(peer, "transaction").inc()
+            peer_nodes.record_failure(peer)
+            log.warning("Peer nicht erreichbar", extra=rate_limited(f"unreachable:{peer}", peer=peer, error=e))
 
 
-def broadcast_new_block():
+@profiler.profiled
+def broadcast_new_block(exclude: Iterable[str] = ()):
     """
-    Informiert alle Peer-Nodes über einen neuen Block.
+    Informiert höchstens GOSSIP_FANOUT Peers über einen neuen Block. Gemeldet
+    wird nur der Tip (Höhe und Hash); Peers, die nicht so weit sind, laden die
+    fehlenden Blöcke und melden sie weiter.
+    
+    Args:
+        exclude: Peers, die den Block schon haben (z.B. der meldende Peer)
     """
-    for peer in peer_nodes:
+    chain = blockchain.chain
+    tip = {"height": len(chain), "hash": chain[-1].hash}
+    for peer in peer_nodes.gossip_targets(exclude):
+        start = time.perf_counter()
         try:
-            requests.post(
+            transport.post(
                 f"{peer}/blocks/receive",
-                json={},
+                json=tip,
+                headers=peer_headers(),
                 timeout=2
             )
-            print(f"📤 Block-Benachrichtigung an {peer} gesendet")
+            duration = time.perf_counter() - start
+            BROADCAST_SECONDS.labels(peer, "block").observe(duration)
+            peer_nodes.record_success(peer, duration)
+            log.debug("Block-Benachrichtigung gesendet", extra=kv(peer=peer))
         except requests.exceptions.RequestException as e:
-            print(f"⚠️  Konnte Block-Benachrichtigung nicht an {peer} senden: {e}")
+            BROADCAST_FAILURES.labels(peer, "block").inc()
+            peer_nodes.record_failure(peer)
+            log.warning("Peer nicht erreichbar", extra=rate_limited(f"unreachable:{peer}", peer=peer, error=e))
+
+
+def heartbeat():
+    """
+    Fragt den Tip der Peers ab, die seit PEER_INTERVAL keinen gemeldet haben
+    (Block-Meldungen zählen mit), und synchronisiert, wenn einer weiter ist.
+    Fängt verpasste Meldungen auf; im Leerlauf kostet das nur die kleinen
+    /tip-Antworten.
+    """
+    for peer in peer_nodes.due_for_heartbeat(PEER_INTERVAL):
+        tip = fetch_tip(peer)
+        if tip is not None and sync_from_peer(peer, tip["height"]):
+            broadcast_new_block(exclude=[peer])
+
+
+def discover_peers() -> List[str]:
+    """
+    Peer-Austausch: holt die Peer-Liste eines (nach Score gewählten) Peers
+    und nimmt unbekannte Nodes auf, solange MAX_PEERS nicht erreicht ist.
+    Jeder Kandidat wird vorher per /health geprüft (erreichbar, nicht wir selbst).
+    
+    Returns:
+        Neu aufgenommene Peers
+    """
+    sources = peer_nodes.gossip_targets()[:1]
+    if not sources:
+        return []
+    source = sources[0]
+    try:
+        response = transport.get(f"{source}/nodes/list", headers=peer_headers(), timeout=2)
+        data = response.json()
+        if not isinstance(data, dict) or not isinstance(data.get("peers"), list):
+            raise ValueError("Antwort enthält keine Peer-Liste")
+        candidates = data["peers"]
+    except (requests.exceptions.RequestException, ValueError) as e:
+        peer_nodes.record_failure(source)
+        log.debug("Peer-Liste nicht abrufbar", extra=kv(peer=source, error=e))
+        return []
+    
+    added = []
+    for address in candidates:
+        if not isinstance(address, str) or not address.startswith(("http://", "https://")):
+            continue
+        address = address.rstrip("/")
+        if address in peer_nodes or address in _own_addresses:
+            continue
+        if len(peer_nodes) >= peer_nodes.max_peers:
+            break
+        if probe_peer(address, via=source):
+            added.append(address)
+    return added
+
+
+def check_node(address: str) -> Optional[float]:
+    """
+    Prüft per /health, ob unter 'address' ein Node dieses Netzes läuft (und
+    nicht wir selbst unter anderer Adresse).
+    
+    Returns:
+        Antwortzeit in Sekunden, oder None wenn die Prüfung fehlschlägt
+    """
+    start = time.perf_counter()
+    try:
+        health = transport.get(f"{address}/health", headers=peer_headers(), timeout=2).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    if not isinstance(health, dict) or not isinstance(health.get("node_id"), str):
+        return None
+    if health["node_id"] == NODE_ID:
+        _own_addresses.add(address)
+        return None
+    return time.perf_counter() - start
+
+
+def probe_peer(address: str, via: str) -> bool:
+    """
+    Prüft einen Kandidaten (siehe check_node) und nimmt ihn als entdeckten
+    Peer auf.
+    
+    Returns:
+        True wenn der Peer neu aufgenommen wurde
+    """
+    latency = check_node(address)
+    if latency is None or not peer_nodes.add(address, source=DISCOVERED):
+        return False
+    peer_nodes.record_success(address, latency)
+    log.info("Peer entdeckt", extra=kv(peer=address, via=via))
+    return True
+
+
+def queue_probe(address: str):
+    """
+    Stellt eine Adresse aus "X-Peer-Address" zur Prüfung an (siehe
+    probe_worker_thread). Ist die Warteschlange voll oder das Limit von
+    PROBES_PER_MINUTE erreicht, wird die Adresse verworfen (der Node meldet
+    sich wieder oder wird per Discovery gefunden).
+    """
+    global _probe_thread
+    now = time.monotonic()
+    with _probe_lock:
+        while _probe_times and now - _probe_times[0] >= 60:
+            _probe_times.popleft()
+        if address in _probing or len(_probe_times) >= PROBES_PER_MINUTE:
+            return
+        try:
+            _probe_queue.put_nowait(address)
+        except queue.Full:
+            return
+        _probing.add(address)
+        _probe_times.append(now)
+        if _probe_thread is None:
+            _probe_thread = threading.Thread(target=probe_worker_thread, name="probe", daemon=True)
+            _probe_thread.start()
+
+
+def probe_worker_thread():
+    """Hintergrund-Thread, der die Adressen aus queue_probe nacheinander prüft."""
+    while True:
+        address = _probe_queue.get()
+        try:
+            probe_peer(address, via="anfrage")
+        except Exception as e:
+            log.warning("Peer-Prüfung fehlgeschlagen", extra=rate_limited("probe_error", peer=address, error=e))
+        finally:
+            with _probe_lock:
+                _probing.discard(address)
+            _probe_queue.task_done()
 
 
 def auto_mine_thread():
@@ -288,27 +1145,41 @@ def auto_mine_thread():
     while True:
         time.sleep(30)  # Alle 30 Sekunden prüfen
         
-        if blockchain.mempool:
-            # Prüfen, ob die älteste Transaktion älter als 2 Minuten ist
-            oldest_tx = blockchain.mempool[0]
-            age = time.time() - oldest_tx['timestamp']
-            
-            if age > 120:  # 2 Minuten
-                print("⏰ Auto-Mining: Transaktionen sind älter als 2 Minuten")
-                blockchain.mine_pending_transactions()
-                broadcast_new_block()
+        # Prüfen, ob die älteste Transaktion älter als 2 Minuten ist (O(1))
+        # Pro Block wird nur bis zur Block-Kapazität entnommen
+        while blockchain.mempool and blockchain.mempool.oldest_age() > 120:  # 2 Minuten
+            log.info("Auto-Mining: Transaktionen sind älter als 2 Minuten")
+            blockchain.mine_pending_transactions()
+            broadcast_new_block()
 
 
-def sync_with_peers_thread():
+def peer_maintenance_thread():
     """
-    Hintergrund-Thread, der regelmäßig mit Peers synchronisiert.
+    Hintergrund-Thread für die Peer-Verwaltung: Heartbeat (Tip-Abfrage,
+    bei Bedarf Sync) und Austausch der Peer-Listen.
     """
     while True:
-        time.sleep(60)  # Jede Minute
-        
-        if peer_nodes:
-            print("🔄 Starte automatische Synchronisierung mit Peers...")
-            consensus()
+        time.sleep(PEER_INTERVAL)
+        try:
+            heartbeat()
+            discover_peers()
+        except Exception as e:
+            # Eine fehlerhafte Antwort darf den Thread nicht beenden
+            log.warning("Peer-Verwaltung fehlgeschlagen", extra=rate_limited("peer_maintenance", error=e))
+
+
+def chain_audit_thread():
+    """
+    Hintergrund-Thread, der die ganze Chain prüft: direkt nach dem Start
+    (die Blöcke vor dem Snapshot wurden beim Laden nicht geprüft) und danach
+    alle CHAIN_AUDIT_INTERVAL Sekunden.
+    """
+    while True:
+        try:
+            blockchain.audit_chain()
+        except Exception as e:
+            log.warning("Prüfung der Chain fehlgeschlagen", extra=rate_limited("chain_audit", error=e))
+        time.sleep(CHAIN_AUDIT_INTERVAL)
 
 
 # ==================== STARTUP ====================
@@ -316,6 +1187,9 @@ def sync_with_peers_thread():
 if __name__ == '__main__':
     import sys
     
+    # Logging einrichten (LOG_LEVEL=DEBUG für alle Meldungen, Standard: nur Warnungen + Zusammenfassungen)
+    setup_logging()
+    
     # Port aus Kommandozeilen-Argument lesen (Standard: 5000)
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
     
@@ -329,12 +1203,17 @@ if __name__ == '__main__':
     ║  API Endpoints:                              ║
     ║  • GET  /health                              ║
     ║  • GET  /chain                               ║
+    ║  • GET  /headers                             ║
+    ║  • GET  /tip                                 ║
     ║  • POST /transactions/new                    ║
     ║  • POST /mine                                ║
     ║  • GET  /organizations                       ║
     ║  • GET  /stats                               ║
+    ║  • GET  /analytics                           ║
+    ║  • GET  /metrics                             ║
     ║  • POST /nodes/register                      ║
     ║  • POST /consensus                           ║
+    ║  • POST /admin/profile                       ║
     ╚══════════════════════════════════════════════╝
     """)
     
@@ -342,9 +1221,13 @@ if __name__ == '__main__':
     mining_thread = threading.Thread(target=auto_mine_thread, daemon=True)
     mining_thread.start()
     
-    # Sync Thread starten
-    sync_thread = threading.Thread(target=sync_with_peers_thread, daemon=True)
-    sync_thread.start()
+    # Peer-Verwaltung (Heartbeat mit Sync, Discovery) starten
+    peer_thread = threading.Thread(target=peer_maintenance_thread, daemon=True)
+    peer_thread.start()
+    
+    # Vollständige Prüfung der Chain (chain_valid in /stats)
+    audit_thread = threading.Thread(target=chain_audit_thread, daemon=True)
+    audit_thread.start()
     
     # Flask App starten
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# Obergrenze bekannter Peers (neue über Discovery nur bis hierhin)
+MAX_PEERS = 16
+
+# An wie viele Peers eine Transaktion/Block-Meldung direkt geht (Rest per Weiterleitung)
+GOSSIP_FANOUT = 4
+
+# Von wie vielen Peers beim Konsens Chains geholt werden
+SYNC_PEERS = 3
+
+# Backoff nach Fehlern: BACKOFF_BASE * 2^(Fehler in Folge - 1), höchstens BACKOFF_MAX Sekunden
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 600.0
+
+# Entdeckte Peers werden nach so vielen Fehlern in Folge entfernt
+# (manuell registrierte bleiben, werden aber nur im Backoff-Takt versucht)
+EVICT_AFTER = 5
+
+# Gewicht neuer Latenz-Messungen im gleitenden Mittel
+LATENCY_ALPHA = 0.2
+
+# Referenz-Latenz für den Score: bei dieser Latenz halbiert sich der Latenz-Faktor
+LATENCY_REFERENCE = 0.1
+
+# Herkunft eines Peers
+MANUAL = "manual"           # per /nodes/register
+DISCOVERED = "discovered"   # aus der Peer-Liste eines anderen Nodes
+
+
+class Peer:
+    """Zustand eines Peers: Erreichbarkeit, Latenz, Erfolge/Fehler und Backoff."""
+
+    def __init__(self, address: str, source: str = MANUAL):
+        self.address = address
+        self.source = source
+        self.latency: Optional[float] = None   # gleitendes Mittel in Sekunden
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_seen: Optional[float] = None   # letzte erfolgreiche Anfrage
+        self.retry_at = 0.0                       # vorher nicht kontaktieren (Backoff)
+        self.tip_height = 0                       # zuletzt bekannter Tip (Heartbeat/Meldung)
+        self.tip_hash = ""
+        self.tip_at: Optional[float] = None
+
+    @property
+    def reliability(self) -> float:
+        """Anteil erfolgreicher Anfragen (mit je einem Erfolg/Fehler als Startwert)."""
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self) -> float:
+        """Score in (0, 1]: Zuverlässigkeit mal Latenz-Faktor, unbekannte Latenz zählt neutral."""
+        latency = self.latency if self.latency is not None else LATENCY_REFERENCE
+        return self.reliability * LATENCY_REFERENCE / (LATENCY_REFERENCE + latency)
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "address": self.address,
+            "source": self.source,
+            "score": round(self.score, 4),
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 2),
+            "successes": self.successes,
+            "failures": self.failures,
+            "backoff_s": round(max(0.0, self.retry_at - now), 1),
+            "last_seen_s": None if self.last_seen is None else round(now - self.last_seen, 1),
+            "tip_height": self.tip_height
+        }
+
+
+class PeerManager:
+    """
+    Verwaltet die bekannten Peers eines Nodes.
+
+    Jede Anfrage an einen Peer wird mit record_success/record_failure
+    gemeldet. Daraus ergeben sich Latenz (gleitendes Mittel), Zuverlässigkeit
+    und Score. Nach Fehlern wird ein Peer mit exponentiellem Backoff
+    übersprungen, statt bei jedem Broadcast einen vollen Timeout zu kosten;
+    entdeckte Peers werden nach EVICT_AFTER Fehlern in Folge entfernt.
+
+    Broadcasts gehen an eine nach Score gewichtete Zufallsauswahl von
+    höchstens 'fanout' Peers, der Konsens an die besten 'sync_peers'. Die
+    Kosten pro Node bleiben damit bei wachsendem Netz konstant; die übrigen
+    Peers erreicht eine Meldung über Weiterleitung.
+    """
+
+    def __init__(self, max_peers: int = MAX_PEERS, fanout: int = GOSSIP_FANOUT,
+                 sync_peers: int = SYNC_PEERS, rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_peers: Maximale Anzahl Peers (manuelle Registrierung geht immer)
+            fanout: Peers pro Broadcast
+            sync_peers: Peers pro Konsens-Runde
+            rng: Zufallsquelle für die Auswahl (für reproduzierbare Simulationen)
+            clock: Zeitquelle (monoton)
+        """
+        self.max_peers = max_peers
+        self.fanout = fanout
+        self.sync_peers = sync_peers
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._peers: Dict[str, Peer] = {}
+        self._lock = threading.Lock()
+
+        self.evicted_count = 0  # Anzahl entfernter Peers (Statistik)
+
+    def __len__(self) -> int:
+        return len(self._peers)
+
+    def __bool__(self) -> bool:
+        return bool(self._peers)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._peers
+
+    def __iter__(self) -> Iterator[str]:
+        """Iteriert über eine Kopie der Adressen."""
+        with self._lock:
+            return iter(list(self._peers))
+
+    # ==================== PEERS ====================
+
+    def add(self, address: str, source: str = MANUAL) -> bool:
+        """
+        Fügt einen Peer hinzu. Entdeckte Peers nur, solange max_peers nicht erreicht ist.
+
+        Returns:
+            True wenn der Peer neu ist
+        """
+        with self._lock:
+            peer = self._peers.get(address)
+            if peer is not None:
+                if source == MANUAL:
+                    peer.source = MANUAL
+                return False
+            if source != MANUAL and len(self._peers) >= self.max_peers:
+                return False
+            self._peers[address] = Peer(address, source)
+            return True
+
+    def remove(self, address: str):
+        with self._lock:
+            self._peers.pop(address, None)
+
+    def clear(self):
+        with self._lock:
+            self._peers.clear()
+
+    def record_success(self, address: str, latency: Optional[float] = None):
+        """
+        Meldet eine erfolgreiche Anfrage.
+
+        Args:
+            latency: Dauer in Sekunden (nur bei kleinen Anfragen angeben, nicht
+                     beim Laden ganzer Chains)
+        """
+        with self._lock:
+            peer = self._peers.get(address)
+            if peer is None:
+                return
+            peer.successes += 1
+            peer.consecutive_failures = 0
+            peer.retry_at = 0.0
+            peer.last_seen = self._clock()
+            if latency is not None:
+                peer.latency = latency if peer.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * peer.latency)
+
+    def record_failure(self, address: str) -> bool:
+        """
+        Meldet eine fehlgeschlagene Anfrage und setzt den Backoff.
+
+        Returns:
+            True wenn der Peer dadurch entfernt wurde
+        """
+        with self._lock:
+            peer = self._peers.get(address)
+            if peer is None:
+                return False
+            peer.failures += 1
+            peer.consecutive_failures += 1
+            if peer.source != MANUAL and peer.consecutive_failures >= EVICT_AFTER:
+                del self._peers[address]
+                self.evicted_count += 1
+                return True
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (peer.consecutive_failures - 1))
+            peer.retry_at = self._clock() + backoff
+            return False
+
+    def record_tip(self, address: str, height: int, block_hash: str):
+        """Merkt sich den Tip eines Peers (aus /tip oder einer Block-Meldung)."""
+        with self._lock:
+            peer = self._peers.get(address)
+            if peer is None:
+                return
+            peer.tip_height = height
+            peer.tip_hash = block_hash
+            peer.tip_at = self._clock()
+
+    # ==================== AUSWAHL ====================
+
+    def available(self) -> List[Peer]:
+        """Peers, die gerade nicht im Backoff sind."""
+        now = self._clock()
+        with self._lock:
+            return [peer for peer in self._peers.values() if peer.retry_at <= now]
+
+    def gossip_targets(self, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Zufallsauswahl von höchstens 'fanout' erreichbaren Peers, gewichtet nach
+        Score (Efraimidis-Spirakis: Schlüssel u^(1/Gewicht), die größten gewinnen).
+        Gute Peers werden bevorzugt, schlechte aber nicht ganz ausgeschlossen.
+        """
+        excluded = set(exclude)
+        candidates = [peer for peer in self.available() if peer.address not in excluded]
+        keys = [(self._rng.random() ** (1 / peer.score), peer.address) for peer in candidates]
+        keys.sort(reverse=True)
+        return [address for _, address in keys[:self.fanout]]
+
+    def sync_targets(self, count: Optional[int] = None) -> List[str]:
+        """Die 'count' (Standard: 'sync_peers') erreichbaren Peers mit dem besten Score."""
+        ranked = sorted(self.available(), key=lambda peer: peer.score, reverse=True)
+        return [peer.address for peer in ranked[:count or self.sync_peers]]
+
+    def due_for_heartbeat(self, interval: float) -> List[str]:
+        """Erreichbare Peers, deren Tip seit 'interval' Sekunden nicht gemeldet wurde."""
+        now = self._clock()
+        return [peer.address for peer in self.available()
+                if peer.tip_at is None or now - peer.tip_at >= interval]
+
+    def shareable(self) -> List[str]:
+        """Adressen für den Austausch mit anderen Nodes (ohne Peers im Backoff)."""
+        return [peer.address for peer in self.available()]
+
+    def snapshot(self) -> List[Dict]:
+        """Zustand aller Peers, bester Score zuerst (für /nodes/list)."""
+        now = self._clock()
+        with self._lock:
+            peers = sorted(self._peers.values(), key=lambda peer: peer.score, reverse=True)
+            return [peer.to_dict(now) for peer in peers]
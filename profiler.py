@@ -0,0 +1,246 @@
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Grenzen für Profiling-Sitzungen über /admin/profile
+MAX_SECONDS = 120.0
+DEFAULT_INTERVAL = 0.01   # Sampling alle 10 ms
+
+# Nur eine Sitzung gleichzeitig
+_session_lock = threading.Lock()
+
+# Ab Python 3.12 kann pro Prozess nur ein cProfile aktiv sein (sys.monitoring),
+# das dafür alle Threads misst: dann ein Profile für die ganze Sitzung
+_SHARED_PROFILE = sys.version_info >= (3, 12)
+
+# Aktive cProfile-Sitzung (None = aus, dann kostet @profiled nur einen Vergleich)
+_cprofile_session: Optional["CProfileSession"] = None
+_local = threading.local()
+
+
+class ProfilerBusy(RuntimeError):
+    """Es läuft bereits eine Profiling-Sitzung."""
+
+
+# ==================== SAMPLING ====================
+
+def _thread_label(name: str) -> str:
+    # "Thread-12 (process_request_thread)" → "Thread (process_request_thread)",
+    # damit alle Request-Threads im Flamegraph zusammengefasst werden
+    return re.sub(r"-\d+", "", name).replace(";", ":")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Fragt in festen Abständen die Stacks aller Threads ab (sys._current_frames)
+    und zählt gleiche Stacks. Kein Eingriff in den profilierten Code, daher
+    auch im laufenden Betrieb unbedenklich.
+
+    Ergebnis im "collapsed"-Format (eine Zeile pro Stack, Frames mit ";"
+    getrennt, am Ende die Anzahl Samples) - direkt nutzbar mit
+    flamegraph.pl oder speedscope.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.samples: Dict[str, int] = {}
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(_thread_label(names.get(ident, "unbekannt")))
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """Stacks im collapsed-Format, häufigste zuerst."""
+        lines = sorted(self.samples.items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in lines)
+
+
+# ==================== CPROFILE ====================
+
+class CProfileSession:
+    """
+    Sammelt cProfile-Daten aus allen Threads.
+
+    Bis Python 3.11 misst cProfile nur den Thread, in dem es aktiviert wurde.
+    Deshalb bekommt jeder markierte Aufruf (@profiled bzw. begin()/end() für
+    Flask-Requests) ein eigenes Profile, das danach in diese Sitzung
+    übernommen wird. Ab Python 3.12 läuft ein einziges Profile über die
+    ganze Sitzung (siehe _SHARED_PROFILE) und erfasst damit alles, nicht
+    nur markierte Aufrufe.
+    """
+
+    def __init__(self):
+        self.stats: Optional[pstats.Stats] = None
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile):
+        profile.create_stats()
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.calls += 1
+
+    def report(self, limit: int = 40, sort: str = "cumulative") -> str:
+        """Lesbare Tabelle der teuersten Funktionen."""
+        if self.stats is None:
+            return "Keine profilierten Aufrufe im Zeitraum.\n"
+        output = io.StringIO()
+        with self._lock:
+            self.stats.stream = output
+            self.stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def dump(self) -> bytes:
+        """Rohdaten im .prof-Format (z.B. für snakeviz oder pstats.Stats(datei))."""
+        with self._lock:
+            return marshal.dumps(self.stats.stats if self.stats else {})
+
+
+def begin() -> Optional[cProfile.Profile]:
+    """
+    Startet das Profiling eines Aufrufs im aktuellen Thread, falls gerade eine
+    cProfile-Sitzung läuft. Gibt das Profile zurück (für end()), sonst None.
+    """
+    session = _cprofile_session
+    if session is None or getattr(_local, "session", None) is not None:
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Ein anderes Profiling-Werkzeug ist aktiv: Aufruf ohne Profiling ausführen
+        return None
+    _local.session = session
+    return profile
+
+
+def end(profile: Optional[cProfile.Profile]):
+    """Beendet das mit begin() gestartete Profiling und übernimmt die Daten."""
+    if profile is None:
+        return
+    profile.disable()
+    # In die Sitzung übernehmen, in der der Aufruf begonnen hat
+    # (auch wenn sie inzwischen beendet wurde)
+    session, _local.session = _local.session, None
+    session.add(profile)
+
+
+def profiled(func):
+    """
+    Decorator für Hot-Paths (Mining, Konsens, Broadcasts): wird bei aktiver
+    cProfile-Sitzung mitprofiliert, sonst direkt ausgeführt.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _cprofile_session is None:
+            return func(*args, **kwargs)
+        profile = begin()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end(profile)
+    return wrapper
+
+
+# ==================== SITZUNGEN ====================
+
+def _clamp(seconds: float) -> float:
+    return max(0.1, min(float(seconds), MAX_SECONDS))
+
+
+def sample(seconds: float, interval: float = DEFAULT_INTERVAL) -> SamplingProfiler:
+    """
+    Sampelt alle Threads für 'seconds' Sekunden.
+
+    Raises:
+        ProfilerBusy: wenn bereits eine Sitzung läuft
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy("Es läuft bereits eine Profiling-Sitzung")
+    try:
+        profiler = SamplingProfiler(interval=max(0.001, float(interval)))
+        profiler.start()
+        time.sleep(_clamp(seconds))
+        profiler.stop()
+        return profiler
+    finally:
+        _session_lock.release()
+
+
+def cprofile(seconds: float) -> CProfileSession:
+    """
+    Aktiviert cProfile für 'seconds' Sekunden in allen markierten Aufrufen
+    (ab Python 3.12 für den ganzen Prozess).
+
+    Raises:
+        ProfilerBusy: wenn bereits eine Sitzung läuft
+    """
+    global _cprofile_session
+
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy("Es läuft bereits eine Profiling-Sitzung")
+    try:
+        session = CProfileSession()
+        if _SHARED_PROFILE:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                raise ProfilerBusy(f"Anderes Profiling-Werkzeug aktiv: {e}") from e
+            try:
+                time.sleep(_clamp(seconds))
+            finally:
+                profile.disable()
+            session.add(profile)
+            return session
+
+        _cprofile_session = session
+        time.sleep(_clamp(seconds))
+        _cprofile_session = None
+        return session
+    finally:
+        _cprofile_session = None
+        _session_lock.release()
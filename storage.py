@@ -0,0 +1,260 @@
+import glob
+import json
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from encoding import FORMAT_VERSION, encode_block
+from log import get_logger, kv
+
+
+log = get_logger("storage")
+
+# Dateinamen im Datenverzeichnis (NODE_DATA_DIR)
+BLOCKS_FILE = "blocks.dat"
+TX_INDEX_FILE = "txindex.dat"
+SNAPSHOT_PATTERN = "snapshot-*.json"
+
+# Format-Version der Snapshots (bei Änderungen am abgeleiteten Zustand erhöhen)
+SNAPSHOT_VERSION = 3   # 2: mit Analytics-Rollups, 3: Transaktions-Index in txindex.dat
+
+# Anzahl aufbewahrter Snapshots (ältere werden gelöscht)
+SNAPSHOTS_KEPT = 3
+
+_RECORD_LENGTH = struct.Struct(">I")
+
+# Kennung + Format-Version am Anfang von blocks.dat
+_FILE_HEADER = b"SPNB" + struct.pack(">B", FORMAT_VERSION)
+
+# txindex.dat: Kennung, u32 Anzahl abgedeckter Blöcke, dann Einträge
+# (u32 Block-Index, 32 Bytes Transaktions-ID) aufsteigend nach Block-Index
+_TX_INDEX_MAGIC = b"SPNX"
+_TX_INDEX_ENTRY = struct.Struct(">I32s")
+_TX_INDEX_START = len(_TX_INDEX_MAGIC) + _RECORD_LENGTH.size
+
+
+def _write_atomic(path: str, data: bytes):
+    """Schreibt eine Datei so, dass nach einem Absturz alte oder neue Version vorliegt."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ChainStore:
+    """
+    Speichert die Chain im Datenverzeichnis eines Nodes.
+
+    blocks.dat:   Kennung + Format-Version, dann ein Datensatz pro Block
+                  (u32 Länge + Binärkodierung aus encoding.py), neue Blöcke
+                  werden nur angehängt
+    txindex.dat:  Transaktions-ID → Block-Index, nur angehängt bzw. ab dem
+                  Fork-Punkt abgeschnitten; enthält auch die IDs gekürzter
+                  Blöcke
+    snapshot-*:   abgeleiteter Zustand (Spendensummen, Analytics-Rollups,
+                  validierte Höhe) mit Höhe und Tip-Hash, damit ein Neustart
+                  nicht die ganze Chain neu prüfen muss
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self.blocks_path = os.path.join(data_dir, BLOCKS_FILE)
+        self.tx_index_path = os.path.join(data_dir, TX_INDEX_FILE)
+        # Datei-Offset jedes Blocks (zum Abschneiden bei Chain-Ersetzung)
+        self._offsets: List[int] = []
+
+    # ==================== BLÖCKE ====================
+
+    def load_records(self) -> List[bytes]:
+        """
+        Lädt die Datensätze aller gespeicherten Blöcke (Binärkodierung, siehe
+        Block.from_record). Geprüft wird hier nur die Länge; ein
+        unvollständiger letzter Datensatz (Absturz beim Schreiben) wird
+        abgeschnitten.
+
+        Returns:
+            Ein Datensatz pro Block
+
+        Raises:
+            ValueError: wenn blocks.dat in einem anderen Format gespeichert ist
+        """
+        self._offsets = []
+        if not os.path.exists(self.blocks_path) or os.path.getsize(self.blocks_path) == 0:
+            _write_atomic(self.blocks_path, _FILE_HEADER)
+            return []
+
+        with open(self.blocks_path, "rb") as f:
+            data = f.read()
+        if not data.startswith(_FILE_HEADER):
+            raise ValueError(f"{self.blocks_path} hat ein anderes Format (erwartet Version {FORMAT_VERSION})")
+
+        records = []
+        offset = len(_FILE_HEADER)
+        while offset < len(data):
+            try:
+                (length,) = _RECORD_LENGTH.unpack_from(data, offset)
+                record = data[offset + _RECORD_LENGTH.size:offset + _RECORD_LENGTH.size + length]
+                if len(record) != length:
+                    raise ValueError("Datensatz unvollständig")
+            except (struct.error, ValueError) as e:
+                log.warning("Beschädigtes Ende von blocks.dat abgeschnitten",
+                            extra=kv(blocks=len(records), error=e))
+                self.truncate(len(records), known_offset=offset)
+                break
+            self._offsets.append(offset)
+            records.append(record)
+            offset += _RECORD_LENGTH.size + length
+        return records
+
+    def append(self, block_data: Dict):
+        """Hängt einen Block an."""
+        record = encode_block(block_data)
+        with open(self.blocks_path, "ab") as f:
+            self._offsets.append(f.tell())
+            f.write(_RECORD_LENGTH.pack(len(record)) + record)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def truncate(self, height: int, known_offset: Optional[int] = None):
+        """Entfernt alle Blöcke ab Index 'height'."""
+        if known_offset is None:
+            if height >= len(self._offsets):
+                return
+            known_offset = self._offsets[height]
+        with open(self.blocks_path, "r+b") as f:
+            f.truncate(known_offset)
+        del self._offsets[height:]
+
+    def rewrite(self, blocks: List[Dict]):
+        """Schreibt die ganze Chain neu (z.B. nach dem Kürzen alter Blöcke)."""
+        parts = [_FILE_HEADER]
+        offsets = []
+        offset = len(_FILE_HEADER)
+        for block_data in blocks:
+            record = encode_block(block_data)
+            offsets.append(offset)
+            parts.append(_RECORD_LENGTH.pack(len(record)) + record)
+            offset += _RECORD_LENGTH.size + len(record)
+        _write_atomic(self.blocks_path, b"".join(parts))
+        self._offsets = offsets
+
+    def replace_from(self, height: int, blocks: List[Dict]):
+        """
+        Ersetzt die gespeicherten Blöcke ab 'height' (Fork-Punkt) durch 'blocks'.
+        Der gemeinsame Teil der Chain wird nicht neu geschrieben.
+        """
+        self.truncate(height)
+        for block_data in blocks:
+            self.append(block_data)
+
+    # ==================== TRANSAKTIONS-INDEX ====================
+
+    def tx_index_height(self) -> int:
+        """Anzahl Blöcke, deren Transaktionen in txindex.dat stehen (0 ohne lesbare Datei)."""
+        try:
+            with open(self.tx_index_path, "rb") as f:
+                header = f.read(_TX_INDEX_START)
+        except OSError:
+            return 0
+        if len(header) != _TX_INDEX_START or not header.startswith(_TX_INDEX_MAGIC):
+            return 0
+        return _RECORD_LENGTH.unpack_from(header, len(_TX_INDEX_MAGIC))[0]
+
+    def load_tx_index(self) -> Dict[str, int]:
+        """
+        Liest den Transaktions-Index (nur Einträge der abgedeckten Blöcke).
+
+        Returns:
+            Transaktions-ID → Block-Index
+        """
+        height = self.tx_index_height()
+        if height == 0:
+            return {}
+        with open(self.tx_index_path, "rb") as f:
+            end = self._tx_entries_end(f, height)
+            f.seek(_TX_INDEX_START)
+            data = f.read(end - _TX_INDEX_START)
+        return {tx_id.hex(): index for index, tx_id in _TX_INDEX_ENTRY.iter_unpack(data)}
+
+    def replace_tx_ids_from(self, height: int, entries: List[Tuple[int, str]], new_height: int):
+        """
+        Ersetzt die Index-Einträge ab Block 'height' (Fork-Punkt) durch 'entries'.
+        Die Zahl abgedeckter Blöcke wird erst danach hochgesetzt, sodass nach
+        einem Absturz nie ein halb geschriebener Block als abgedeckt gilt.
+
+        Args:
+            height: erster geänderter Block (höchstens die bisher abgedeckten Blöcke)
+            entries: (Block-Index, Transaktions-ID) der Blöcke ab 'height'
+            new_height: danach abgedeckte Blöcke (Länge der Chain)
+        """
+        covered = self.tx_index_height()
+        if covered == 0:
+            _write_atomic(self.tx_index_path, _TX_INDEX_MAGIC + _RECORD_LENGTH.pack(0))
+        with open(self.tx_index_path, "r+b") as f:
+            if covered > height:
+                self._write_tx_index_height(f, height)
+            f.truncate(self._tx_entries_end(f, height))
+            f.seek(0, os.SEEK_END)
+            f.write(b"".join(_TX_INDEX_ENTRY.pack(index, bytes.fromhex(tx_id)) for index, tx_id in entries))
+            f.flush()
+            os.fsync(f.fileno())
+            self._write_tx_index_height(f, new_height)
+
+    @staticmethod
+    def _write_tx_index_height(f, height: int):
+        f.seek(len(_TX_INDEX_MAGIC))
+        f.write(_RECORD_LENGTH.pack(height))
+        f.flush()
+        os.fsync(f.fileno())
+
+    @staticmethod
+    def _tx_entries_end(f, height: int) -> int:
+        """Offset hinter dem letzten Eintrag mit Block-Index < 'height' (binäre Suche in der Datei)."""
+        f.seek(0, os.SEEK_END)
+        low, high = 0, (f.tell() - _TX_INDEX_START) // _TX_INDEX_ENTRY.size
+        while low < high:
+            middle = (low + high) // 2
+            f.seek(_TX_INDEX_START + middle * _TX_INDEX_ENTRY.size)
+            if _RECORD_LENGTH.unpack(f.read(_RECORD_LENGTH.size))[0] < height:
+                low = middle + 1
+            else:
+                high = middle
+        return _TX_INDEX_START + low * _TX_INDEX_ENTRY.size
+
+    # ==================== SNAPSHOTS ====================
+
+    def save_snapshot(self, state: Dict):
+        """
+        Speichert einen Snapshot des abgeleiteten Zustands.
+
+        Args:
+            state: Zustand inkl. "height" und "tip_hash" (siehe Blockchain.derived_state)
+        """
+        state = dict(state, version=SNAPSHOT_VERSION)
+        path = os.path.join(self.data_dir, f"snapshot-{state['height']:010d}.json")
+        _write_atomic(path, json.dumps(state, separators=(",", ":")).encode())
+
+        for old_path in self._snapshot_paths()[SNAPSHOTS_KEPT:]:
+            os.remove(old_path)
+
+    def load_snapshots(self) -> Iterator[Dict]:
+        """
+        Liefert die lesbaren Snapshots, neueste (höchste) zuerst.
+        Dateien werden erst beim Weiterzählen gelesen, meist passt schon der erste.
+        """
+        for path in self._snapshot_paths():
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("Snapshot nicht lesbar", extra=kv(path=path, error=e))
+                continue
+            if state.get("version") == SNAPSHOT_VERSION:
+                yield state
+
+    def _snapshot_paths(self) -> List[str]:
+        # Höhe ist mit führenden Nullen im Namen → Sortierung nach Name = nach Höhe
+        return sorted(glob.glob(os.path.join(self.data_dir, SNAPSHOT_PATTERN)), reverse=True)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Analytics-Rollups: Bucket-Grenzen, Abfragebereiche und
+Zurückrechnen bei Forks (ohne laufenden Node)
+
+Aufruf:
+    python3 -m pytest test_analytics.py
+"""
+
+from analytics import DEFAULT_BUCKETS, MAX_BUCKETS, DonationAnalytics, Rollup
+from blockchain import Blockchain
+from encoding import ORGANIZATIONS
+
+DAY = 1700006400   # Mitternacht UTC, durch 60, 3600 und 86400 teilbar
+
+
+def starts(rollup: Rollup) -> list:
+    return rollup.starts.tolist()
+
+
+def test_bucket_boundaries():
+    analytics = DonationAnalytics()
+    analytics.add_block(DAY + 59.999999, {"WWF": 100})
+    analytics.add_block(DAY + 60, {"WWF": 200})
+    analytics.add_block(DAY + 3599.5, {"UNICEF": 300})
+    analytics.add_block(DAY + 86400, {"UNICEF": 400})
+
+    rollups = analytics.rollups
+    assert starts(rollups["minute"]) == [DAY, DAY + 60, DAY + 3540, DAY + 86400]
+    assert starts(rollups["hour"]) == [DAY, DAY + 86400]
+    assert starts(rollups["day"]) == [DAY, DAY + 86400]
+
+    hour = analytics.query("hour", DAY, DAY + 3600)
+    assert hour["per_organization"]["WWF"] == 3 and hour["per_organization"]["UNICEF"] == 3
+    assert [bucket["total"] for bucket in hour["buckets"]] == [6]
+
+
+def test_blocks_out_of_order_and_empty_summary():
+    rollup = Rollup(60)
+    rollup.add(DAY + 600, {"WWF": 1})
+    rollup.add(DAY + 0, {"WWF": 2})
+    rollup.add(DAY + 300, {"WWF": 3})
+    rollup.add(DAY + 900, {})
+    assert starts(rollup) == [DAY, DAY + 300, DAY + 600]
+    assert rollup.query(DAY, DAY + 900)["per_organization"]["WWF"] == 0.06
+
+
+def test_remove_drops_empty_buckets():
+    rollup = Rollup(60)
+    rollup.add(DAY + 10, {"WWF": 100, "UNICEF": 50})
+    rollup.add(DAY + 20, {"WWF": 25})
+    rollup.add(DAY + 70, {"UNICEF": 5})
+
+    rollup.add(DAY + 20, {"WWF": 25}, sign=-1)
+    assert starts(rollup) == [DAY, DAY + 60]
+    rollup.add(DAY + 10, {"WWF": 100, "UNICEF": 50}, sign=-1)
+    assert starts(rollup) == [DAY + 60]
+    assert len(rollup.values) == len(rollup) * len(ORGANIZATIONS)
+
+    # Unbekannter Bucket: nichts anlegen
+    rollup.add(DAY + 600, {"WWF": 1}, sign=-1)
+    assert starts(rollup) == [DAY + 60]
+    assert rollup.query(DAY, DAY + 3600)["total"] == 0.05
+
+
+def test_query_ranges():
+    analytics = DonationAnalytics()
+    for minute in range(5):
+        analytics.add_block(DAY + minute * 60 + 30, {"WWF": 100 * (minute + 1)})
+
+    # Start mitten im Bucket zählt den ganzen Bucket, Ende ist exklusiv
+    result = analytics.query("minute", DAY + 90, DAY + 180)
+    assert [bucket["start"] for bucket in result["buckets"]] == [DAY + 60, DAY + 120]
+    result = analytics.query("minute", DAY + 60, DAY + 120)
+    assert [bucket["start"] for bucket in result["buckets"]] == [DAY + 60]
+    assert result["total"] == 2
+    assert analytics.query("minute", DAY + 300, DAY + 600)["buckets"] == []
+
+    # Ohne start: DEFAULT_BUCKETS vor end; zu lange Zeiträume werden vorne gekürzt
+    result = analytics.query("minute", end=DAY + 300)
+    assert result["start"] == DAY + 300 - DEFAULT_BUCKETS * 60
+    assert result["total"] == 15
+    result = analytics.query("minute", 0, DAY + 300)
+    assert result["start"] == DAY + 300 - MAX_BUCKETS * 60
+    assert len(result["buckets"]) == 5
+
+
+def test_forks_remove_dropped_blocks():
+    local = Blockchain(difficulty=1)
+    local.add_transaction("Gemeinsam", "WWF", 10)
+    local.mine_pending_transactions()
+    peer = Blockchain(difficulty=1)
+    assert peer.extend_chain(1, local.get_chain_data(1))
+
+    local.add_transaction("Lokal", "Greenpeace", 7)
+    local.mine_pending_transactions()
+    for n in range(2):
+        peer.add_transaction(f"Peer{n}", "UNICEF", 5)
+        peer.mine_pending_transactions()
+
+    # replace_chain baut die Rollups neu auf, extend_chain rechnet den lokalen Block heraus
+    replaced = Blockchain(difficulty=1)
+    assert replaced.extend_chain(1, local.get_chain_data(1))
+    assert replaced.replace_chain(peer.get_chain_data())
+    assert local.extend_chain(2, peer.get_chain_data(2))
+
+    for blockchain in (replaced, local):
+        assert blockchain.analytics.to_dict() == peer.analytics.to_dict()
+        result = blockchain.analytics.query("day")
+        assert result["per_organization"]["Greenpeace"] == 0
+        assert result["total"] == blockchain.get_donation_totals()["total"]
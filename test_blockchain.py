@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Übernahme von Blöcken und die Fork-Suche (ohne laufenden Node)
+
+Aufruf:
+    python3 -m pytest test_blockchain.py
+"""
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import node
+from blockchain import Blockchain
+from mempool import transaction_id
+
+
+def make_transaction(sender: str, amount: float, recipient: str = "UNICEF", timestamp: float = 1700000000) -> dict:
+    transaction = {"sender": sender, "recipient": recipient, "amount": amount, "timestamp": timestamp}
+    transaction["id"] = transaction_id(transaction)
+    return transaction
+
+
+def mine(blockchain: Blockchain, blocks: int, prefix: str):
+    for n in range(blocks):
+        blockchain.add_transaction(f"{prefix}{n}", "WWF" if n % 2 else "UNICEF", 10 + n, timestamp=1700000000 + n)
+        blockchain.mine_pending_transactions()
+
+
+def derived(blockchain: Blockchain) -> tuple:
+    return ([block.hash for block in blockchain.chain], blockchain.get_donation_totals(), dict(blockchain.tx_index),
+            blockchain.analytics.to_dict(), blockchain.validated_height)
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.status_code = 200
+        self.headers = {"Content-Type": "application/json"}
+        self.content = json.dumps(data).encode()
+        self._data = data
+
+    def json(self) -> dict:
+        return self._data
+
+
+class FakeTransport:
+    """Beantwortet /headers aus einer lokalen Blockchain und merkt sich die angefragten Bereiche."""
+
+    def __init__(self, blockchain: Blockchain):
+        self.blockchain = blockchain
+        self.ranges = []
+
+    def get(self, url: str, headers=None, timeout=None) -> FakeResponse:
+        query = parse_qs(urlsplit(url).query)
+        start, end = int(query["start"][0]), int(query["end"][0])
+        self.ranges.append((start, end))
+        return FakeResponse({"headers": self.blockchain.get_headers(start, end)})
+
+
+def test_extend_onto_fork():
+    local = Blockchain(difficulty=1)
+    mine(local, 3, "Gemeinsam")
+    peer = Blockchain(difficulty=1)
+    assert peer.extend_chain(1, local.get_chain_data(1))
+    mine(local, 2, "Lokal")
+    mine(peer, 4, "Peer")
+    local_ids = [tx["id"] for block in local.chain[4:] for tx in block.transactions]
+    blocks = peer.get_chain_data(4)
+
+    # Späterer Block ungültig: nichts übernehmen, abgeleiteter Zustand bleibt unverändert
+    before = derived(local)
+    tampered = json.loads(json.dumps(blocks))
+    tampered[-1]["transactions"][0]["amount"] = 999999
+    assert not local.extend_chain(4, tampered)
+    assert derived(local) == before
+
+    # Gültiger Fork: verworfene Blöcke werden aus Summen, Index und Analytics herausgerechnet
+    assert local.extend_chain(4, blocks)
+    assert [block.hash for block in local.chain] == [block.hash for block in peer.chain]
+    assert local.get_donation_totals() == peer.get_donation_totals()
+    assert local.tx_index == peer.tx_index
+    assert not any(tx_id in local.tx_index for tx_id in local_ids)
+    assert local.analytics.to_dict() == peer.analytics.to_dict()
+    assert local.validated_height == len(local.chain)
+    assert local.is_chain_valid()
+
+
+def test_find_fork_widens_window(monkeypatch):
+    local = Blockchain(difficulty=1)
+    mine(local, 9, "Gemeinsam")
+    peer = Blockchain(difficulty=1)
+    assert peer.extend_chain(1, local.get_chain_data(1))
+    mine(local, 50, "Lokal")
+    mine(peer, 55, "Peer")
+    transport = FakeTransport(peer)
+    monkeypatch.setattr(node, "blockchain", local)
+    monkeypatch.setattr(node, "transport", transport)
+
+    # Fenster 16, 32, 64 unter dem eigenen Tip (60 Blöcke), bis ein Header übereinstimmt
+    assert node.find_fork("http://peer") == 10
+    assert transport.ranges == [(44, 60), (12, 44), (1, 12)]
+
+
+def test_find_fork_peer_behind(monkeypatch):
+    local = Blockchain(difficulty=1)
+    mine(local, 20, "Gemeinsam")
+    peer = Blockchain(difficulty=1)
+    assert peer.extend_chain(1, local.get_chain_data(1, 15))
+    transport = FakeTransport(peer)
+    monkeypatch.setattr(node, "blockchain", local)
+    monkeypatch.setattr(node, "transport", transport)
+
+    # Beim Peer fehlende Header zählen als Abweichung
+    assert node.find_fork("http://peer") == 15
+    assert transport.ranges == [(5, 21)]
+
+
+def test_pruned_blocks_only_below_own_window():
+    source = Blockchain(difficulty=1)
+    for n in range(8 * source.max_transactions_per_block):
+        source.add_transaction(f"Spender{n}", "WWF", 1)
+    source.prune_depth = 2
+    source.prune()
+    data = source.get_chain_data()
+    assert data[1].get("pruned") and not data[-1].get("pruned")
+
+    assert not Blockchain(difficulty=1).replace_chain(data)  # Archiv-Node
+    assert not Blockchain(difficulty=1, prune_depth=8).extend_chain(1, data[1:])
+    pruned = Blockchain(difficulty=1, prune_depth=2)
+    assert pruned.extend_chain(1, data[1:])
+    assert pruned.get_donation_totals() == source.get_donation_totals()
+
+
+def test_pruned_block_ignores_transactions():
+    source = Blockchain(difficulty=1, prune_depth=2)
+    for n in range(8 * source.max_transactions_per_block):
+        source.add_transaction(f"Spender{n}", "WWF", 1)
+    source.prune()
+    data = source.get_chain_data()
+    forged = make_transaction("Mallory", 1000000)
+    data[1]["transactions"] = [forged]
+
+    pruned = Blockchain(difficulty=1, prune_depth=2)
+    assert pruned.extend_chain(1, data[1:])
+    assert pruned.chain[1].transactions == []
+    assert pruned.find_transaction(forged["id"]) is None
+    assert pruned.get_donation_totals() == source.get_donation_totals()
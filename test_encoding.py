@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für die Binärkodierung (ohne laufenden Node)
+
+Aufruf:
+    python3 -m pytest test_encoding.py
+"""
+
+import pytest
+
+from blockchain import Blockchain
+from encoding import (decode_block, decode_chain, decode_headers, decode_transaction, encode_block,
+                      encode_chain, encode_headers, encode_transaction, from_cents, to_cents, to_micros)
+
+
+def test_cents_round_trip():
+    assert to_cents(12.34) == 1234
+    assert from_cents(to_cents(50)) == 50
+    assert to_cents(2 ** 63 // 100) == 2 ** 63 // 100 * 100
+
+
+@pytest.mark.parametrize("amount", [1e300, -1e300, 2 ** 63, float("inf"), float("nan"), "10", True, None])
+def test_invalid_amount(amount):
+    with pytest.raises(ValueError):
+        to_cents(amount)
+
+
+@pytest.mark.parametrize("timestamp", [1e300, float("inf"), float("nan"), "1700000000"])
+def test_invalid_timestamp(timestamp):
+    with pytest.raises(ValueError):
+        to_micros(timestamp)
+
+
+def test_invalid_amount_not_added():
+    blockchain = Blockchain(difficulty=1)
+    with pytest.raises(ValueError):
+        blockchain.add_transaction("Alice", "UNICEF", float("inf"))
+    assert not blockchain.mempool
+
+
+@pytest.mark.parametrize("field, value", [("sender", 123), ("sender", None), ("sender", "x" * 70000),
+                                          ("recipient", ["WWF"]), ("recipient", None)])
+def test_invalid_strings(field, value):
+    transaction = {"sender": "Alice", "recipient": "WWF", "amount": 5, "timestamp": 1700000000}
+    transaction[field] = value
+    with pytest.raises(ValueError):
+        encode_transaction(transaction)
+
+
+def test_transaction_round_trip():
+    for recipient in ("WWF", "Tierheim Musterstadt"):
+        transaction = {"sender": "Jürgen", "recipient": recipient, "amount": 12.5, "timestamp": 1700000000.123456}
+        encoded = encode_transaction(transaction)
+        assert decode_transaction(encoded) == (transaction, len(encoded))
+
+
+def chain_with_pruned_block() -> Blockchain:
+    blockchain = Blockchain(difficulty=1)
+    for n in range(3 * blockchain.max_transactions_per_block):
+        blockchain.add_transaction(f"Spender{n}", "UNICEF" if n % 2 else "Kinderhilfe", 10 + n / 100)
+    blockchain.chain[1].prune()
+    return blockchain
+
+
+def test_block_round_trip():
+    blockchain = chain_with_pruned_block()
+    for block_data in blockchain.get_chain_data():
+        encoded = encode_block(block_data)
+        assert decode_block(encoded) == (block_data, len(encoded))
+    assert decode_chain(encode_chain(blockchain.get_chain_data())) == blockchain.get_chain_data()
+
+
+def test_headers_round_trip():
+    headers = chain_with_pruned_block().get_headers()
+    assert decode_headers(encode_headers(headers)) == headers
+
+
+def test_broken_chain_data():
+    encoded = encode_chain(chain_with_pruned_block().get_chain_data())
+    with pytest.raises(ValueError):
+        decode_chain(encoded[:-5])
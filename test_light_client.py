@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für den Light-Client: Header-Prüfung, Sync über einen Fork und
+Inclusion-Proofs (gegen eine lokale Blockchain statt eines Nodes)
+
+Aufruf:
+    python3 -m pytest test_light_client.py
+"""
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from blockchain import Blockchain
+from light_client import LightClient, VerificationError, verify_header
+
+
+class FakeResponse:
+    def __init__(self, data: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.content = json.dumps(data).encode()
+        self._data = data
+
+    def json(self) -> dict:
+        return self._data
+
+
+class FakeTransport:
+    """Beantwortet /headers und /transactions/... aus einer lokalen Blockchain (wie node.py)."""
+
+    def __init__(self, blockchain: Blockchain):
+        self.blockchain = blockchain
+
+    def get(self, url: str, headers=None, timeout=None) -> FakeResponse:
+        parts = urlsplit(url)
+        if parts.path == "/headers":
+            start = int(parse_qs(parts.query)["start"][0])
+            return FakeResponse({"headers": self.blockchain.get_headers(start),
+                                 "length": len(self.blockchain.chain)})
+        if parts.path == "/transactions/recent":
+            limit = int(parse_qs(parts.query)["limit"][0])
+            return FakeResponse({"transactions": self.blockchain.recent_transactions(limit)})
+        tx_id = parts.path.split("/")[2]
+        proof = self.blockchain.transaction_proof(tx_id)
+        return FakeResponse(proof) if proof else FakeResponse({"error": "unbekannt"}, 404)
+
+
+def mine(blockchain: Blockchain, blocks: int, prefix: str):
+    for n in range(blocks):
+        blockchain.add_transaction(f"{prefix}{n}", "WWF" if n % 2 else "UNICEF", 10 + n, timestamp=1700000000 + n)
+        blockchain.add_transaction(f"{prefix}{n}b", "Greenpeace", 1, timestamp=1700000000 + n)
+        blockchain.mine_pending_transactions()
+
+
+def client_for(blockchain: Blockchain) -> LightClient:
+    return LightClient("http://node", difficulty=1, transport=FakeTransport(blockchain))
+
+
+def test_sync_and_totals():
+    node = Blockchain(difficulty=1)
+    mine(node, 5, "Spender")
+    client = client_for(node)
+    assert client.sync() == len(node.chain)
+    assert [header["hash"] for header in client.headers] == [block.hash for block in node.chain]
+    assert client.totals() == node.get_donation_totals()
+
+
+def test_sync_follows_longer_fork():
+    node = Blockchain(difficulty=1)
+    mine(node, 3, "Gemeinsam")
+    fork = Blockchain(difficulty=1)
+    assert fork.extend_chain(1, node.get_chain_data(1))
+    mine(node, 2, "Alt")
+    mine(fork, 4, "Neu")
+
+    client = client_for(node)
+    assert client.sync() == 6
+    old_tip = client.headers[-1]["hash"]
+
+    # Node ist auf den längeren Fork gewechselt: Suche zurück bis Block 3, ab dort übernehmen
+    client.transport = FakeTransport(fork)
+    assert client.sync() == len(fork.chain)
+    assert [header["hash"] for header in client.headers] == [block.hash for block in fork.chain]
+    assert client.totals() == fork.get_donation_totals()
+
+    # Kürzere Chain (wieder der alte Zweig) wird nicht übernommen
+    client.transport = FakeTransport(node)
+    assert client.sync() == len(fork.chain)
+    assert old_tip not in [header["hash"] for header in client.headers]
+
+
+def test_invalid_headers_rejected():
+    node = Blockchain(difficulty=1)
+    mine(node, 2, "Spender")
+    previous, header = node.chain[0].header_data(), node.chain[1].header_data()
+    verify_header(header, previous, difficulty=1)
+
+    with pytest.raises(VerificationError, match="Hash passt nicht"):
+        verify_header(dict(header, nonce=header["nonce"] + 1), previous, difficulty=1)
+    with pytest.raises(VerificationError, match="Hash passt nicht"):
+        verify_header(dict(header, summary={"WWF": 1000.0}), previous, difficulty=1)
+    with pytest.raises(VerificationError, match="previous_hash"):
+        verify_header(node.chain[2].header_data(), dict(previous, index=1), difficulty=1)
+
+    # Richtig berechneter Hash ohne Proof-of-Work
+    block = node.chain[1]
+    while block.hash.startswith("0"):
+        block.nonce += 1
+        block.hash = block.calculate_hash()
+    with pytest.raises(VerificationError, match="Proof-of-Work"):
+        verify_header(block.header_data(), previous, difficulty=1)
+
+    # Unbekannte Organisation in der Summary: VerificationError statt KeyError
+    summary = dict(header["summary"], Unbekannt=5.0)
+    with pytest.raises(VerificationError, match="unbekannte Organisation"):
+        verify_header(dict(header, summary=summary), previous, difficulty=1)
+
+
+def test_sync_rejects_forged_header():
+    node = Blockchain(difficulty=1)
+    mine(node, 3, "Spender")
+    node.chain[2].summary = {"WWF": 100000}
+    node.chain[2].pruned = True
+    node.chain[2].tx_root = node.chain[2].header_data()["tx_root"]
+    client = client_for(node)
+    with pytest.raises(VerificationError):
+        client.sync()
+    assert client.height == 1
+
+
+def test_verify_inclusion():
+    node = Blockchain(difficulty=1)
+    mine(node, 3, "Spender")
+    client = client_for(node)
+    client.sync()
+
+    tx = node.chain[2].transactions[1]
+    result = client.verify_transaction(tx["id"])
+    assert result["block"] == 2 and result["transaction"] == tx
+    assert result["confirmations"] == len(node.chain) - 2
+    assert client.verify_transaction("00" * 32) is None
+    assert [result["transaction"]["id"] for result in client.recent(2)] == \
+        [tx["id"] for tx in reversed(node.chain[-1].transactions)]
+
+    proof = node.transaction_proof(tx["id"])
+    tampered = dict(proof, proof=[dict(step, hash="00" * 32) for step in proof["proof"]])
+    with pytest.raises(VerificationError, match="Merkle-Proof"):
+        client._verify_inclusion(tampered, tx["id"])
+
+    other = node.chain[1].transactions[0]
+    with pytest.raises(VerificationError, match="Kodierung"):
+        client._verify_inclusion(dict(proof, encoded=node.transaction_proof(other["id"])["encoded"]), tx["id"])
+
+    # Proof aus einem anderen Block passt nicht zu dessen Header
+    with pytest.raises(VerificationError, match="Merkle-Proof"):
+        client._verify_inclusion(dict(node.transaction_proof(other["id"]), block=2), other["id"])
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für Mempool und Duplikat-Erkennung (ohne laufenden Node)
+
+Aufruf:
+    python3 -m pytest test_mempool.py
+"""
+
+import json
+import time
+
+import pytest
+
+from blockchain import Block, Blockchain
+from mempool import EVICT_OLDEST, REJECT_NEW, Mempool, transaction_id
+
+
+def make_transaction(n: int, amount: float = 10) -> dict:
+    transaction = {"sender": f"Spender{n}", "recipient": "UNICEF", "amount": amount,
+                   "timestamp": 1700000000 + n}
+    transaction["id"] = transaction_id(transaction)
+    return transaction
+
+
+def test_duplicate_rejected():
+    mempool = Mempool()
+    tx = make_transaction(1)
+    assert mempool.add(tx)
+    assert not mempool.add(dict(tx))
+    assert len(mempool) == 1
+
+
+def test_evict_oldest_when_full():
+    mempool = Mempool(max_size=3, eviction_policy=EVICT_OLDEST)
+    txs = [make_transaction(n) for n in range(4)]
+    for tx in txs:
+        assert mempool.add(tx)
+    assert len(mempool) == 3
+    assert txs[0]["id"] not in mempool
+    assert mempool.evicted_count == 1
+
+
+def test_reject_new_when_full():
+    mempool = Mempool(max_size=2, eviction_policy=REJECT_NEW)
+    txs = [make_transaction(n) for n in range(3)]
+    assert mempool.add(txs[0]) and mempool.add(txs[1])
+    assert not mempool.add(txs[2])
+    assert [tx["id"] for tx in mempool] == [txs[0]["id"], txs[1]["id"]]
+
+
+def test_take_oldest_first():
+    mempool = Mempool()
+    txs = [make_transaction(n) for n in range(5)]
+    for tx in txs:
+        mempool.add(tx)
+    mempool.remove([txs[1]["id"]])
+    taken = mempool.take(3)
+    assert [tx["id"] for tx in taken] == [txs[0]["id"], txs[2]["id"], txs[3]["id"]]
+    assert len(mempool) == 1
+    assert mempool.take(10) == [txs[4]]
+    assert not mempool
+
+
+def test_byte_cap():
+    size = len(json.dumps(make_transaction(0)))
+    mempool = Mempool(max_bytes=2 * size)
+    for n in range(3):
+        assert mempool.add(make_transaction(n))
+    assert len(mempool) == 2
+    assert mempool.size_bytes <= 2 * size
+
+    # Größer als der ganze Mempool: abgelehnt, nichts verdrängt
+    assert not mempool.add(make_transaction(9, amount=10 ** 12) | {"sender": "x" * (2 * size)})
+    assert len(mempool) == 2
+
+
+def test_confirmed_transaction_not_added_again():
+    blockchain = Blockchain(difficulty=1)
+    txs = [blockchain.add_transaction(f"Spender{n}", "UNICEF", 10, timestamp=time.time() + n)
+           for n in range(blockchain.max_transactions_per_block)]
+    assert len(blockchain.chain) == 2  # voller Mempool wurde gemined
+
+    again = blockchain.add_transaction(txs[0]["sender"], txs[0]["recipient"], txs[0]["amount"],
+                                       timestamp=txs[0]["timestamp"])
+    assert again is None
+    assert not blockchain.mempool
+
+
+def test_rejection_reason_from_find_transaction():
+    # Wie /transactions/new: Duplikat (409) und voller Mempool (503) unterscheiden
+    blockchain = Blockchain(difficulty=1, mempool_max_size=1, mempool_eviction=REJECT_NEW)
+    tx = blockchain.build_transaction("Alice", "UNICEF", 10.005, timestamp=1700000000.1234567)
+    assert tx["amount"] == 10.01 and tx["timestamp"] == 1700000000.123457
+    assert blockchain.add_transaction(tx["sender"], tx["recipient"], tx["amount"],
+                                      timestamp=tx["timestamp"]) == tx
+
+    assert blockchain.add_transaction(tx["sender"], tx["recipient"], tx["amount"],
+                                      timestamp=tx["timestamp"]) is None
+    assert blockchain.find_transaction(tx["id"]) == {"status": "pending"}
+
+    other = blockchain.build_transaction("Bob", "UNICEF", 5, timestamp=1700000001)
+    assert blockchain.add_transaction(other["sender"], other["recipient"], other["amount"],
+                                      timestamp=other["timestamp"]) is None
+    assert blockchain.find_transaction(other["id"]) is None
+
+
+def test_block_reusing_confirmed_transaction_invalid():
+    blockchain = Blockchain(difficulty=1)
+    for n in range(blockchain.max_transactions_per_block):
+        blockchain.add_transaction(f"Spender{n}", "UNICEF", 10)
+    confirmed = blockchain.chain[1].transactions[0]
+
+    block = Block(len(blockchain.chain), [dict(confirmed)], blockchain.get_latest_block().hash)
+    block.mine_block(blockchain.difficulty)
+    assert not blockchain.extend_chain(len(blockchain.chain), [block.to_dict()])
+
+    blockchain.chain.append(block)
+    assert not blockchain.is_chain_valid()
+
+
+def test_requeue_restores_order():
+    mempool = Mempool()
+    txs = [make_transaction(n) for n in range(4)]
+    for tx in txs:
+        mempool.add(tx)
+    taken = mempool.take(2)
+    mempool.requeue(taken)
+    assert [tx["id"] for tx in mempool] == [tx["id"] for tx in txs]
+    assert mempool.size_bytes == sum(len(json.dumps(tx)) for tx in txs)
+
+
+def test_failed_mining_keeps_transactions(monkeypatch):
+    blockchain = Blockchain(difficulty=1)
+    blockchain.add_transaction("Alice", "UNICEF", 10)
+
+    def fail(self, difficulty):
+        raise ValueError("Another profiling tool is already active")
+    monkeypatch.setattr(Block, "mine_block", fail)
+    with pytest.raises(ValueError):
+        blockchain.mine_pending_transactions()
+    assert len(blockchain.mempool) == 1
+    assert len(blockchain.chain) == 1
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für Merkle-Wurzel und Inclusion-Proofs
+
+Aufruf:
+    python3 -m pytest test_merkle.py
+"""
+
+import hashlib
+
+import pytest
+
+from merkle import EMPTY_ROOT, merkle_proof, merkle_root, verify_proof
+
+
+def leaves(count: int) -> list:
+    return [hashlib.sha256(f"Spende{n}".encode()).digest() for n in range(count)]
+
+
+def test_proofs_for_all_leaf_counts():
+    for count in range(1, 10):
+        ids = leaves(count)
+        root = merkle_root(ids)
+        for index, leaf in enumerate(ids):
+            assert verify_proof(leaf, merkle_proof(ids, index), root), (count, index)
+
+
+def test_odd_count_promotes_last_leaf():
+    ids = leaves(5)
+    # Blatt 4 hat auf den unteren Ebenen kein Geschwister, nur oben die Wurzel der ersten vier
+    assert merkle_proof(ids, 4) == [("L", merkle_root(ids[:4]))]
+    # Nicht dupliziert: eine andere Wurzel als mit verdoppeltem letzten Blatt
+    assert merkle_root(ids) != merkle_root(ids + ids[-1:])
+
+
+def test_single_leaf_and_empty_block():
+    ids = leaves(1)
+    assert merkle_proof(ids, 0) == []
+    assert verify_proof(ids[0], [], merkle_root(ids))
+    assert not verify_proof(leaves(2)[1], [], merkle_root(ids))
+    assert merkle_root([]) == EMPTY_ROOT
+    with pytest.raises(IndexError):
+        merkle_proof([], 0)
+    with pytest.raises(IndexError):
+        merkle_proof(ids, 1)
+
+
+def test_tampered_proof_rejected():
+    ids = leaves(6)
+    root = merkle_root(ids)
+    proof = merkle_proof(ids, 2)
+    assert verify_proof(ids[2], proof, root)
+
+    side, sibling = proof[0]
+    assert not verify_proof(ids[2], [(side, bytes(32))] + proof[1:], root)       # anderer Geschwister-Hash
+    assert not verify_proof(ids[2], [("L" if side == "R" else "R", sibling)] + proof[1:], root)  # falsche Seite
+    assert not verify_proof(ids[2], proof[:-1], root)                             # unvollständig
+    assert not verify_proof(ids[3], proof, root)                                  # anderes Blatt
+    # Ein innerer Knoten ist kein Blatt (getrennte Präfixe)
+    assert not verify_proof(proof[-1][1], [], root)
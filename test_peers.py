@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für PeerManager: Backoff, Score, Entfernen und gewichtete
+Gossip-Auswahl (deterministisch über clock= und rng=)
+
+Aufruf:
+    python3 -m pytest test_peers.py
+"""
+
+import random
+
+from peers import (BACKOFF_BASE, BACKOFF_MAX, DISCOVERED, EVICT_AFTER, LATENCY_ALPHA, MANUAL,
+                   PeerManager)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def manager(clock: FakeClock, **kwargs) -> PeerManager:
+    return PeerManager(rng=random.Random(42), clock=clock, **kwargs)
+
+
+def test_backoff_doubles_and_resets():
+    clock = FakeClock()
+    peers = manager(clock)
+    peers.add("http://a")
+
+    for failures in range(1, 5):
+        assert not peers.record_failure("http://a")
+        backoff = BACKOFF_BASE * 2 ** (failures - 1)
+        assert peers.snapshot()[0]["backoff_s"] == backoff
+        clock.now += backoff - 0.1
+        assert peers.shareable() == []
+        clock.now += 0.1
+        assert peers.shareable() == ["http://a"]
+
+    peers.record_success("http://a")
+    peers.record_failure("http://a")
+    assert peers.snapshot()[0]["backoff_s"] == BACKOFF_BASE
+
+
+def test_backoff_capped_for_manual_peers():
+    clock = FakeClock()
+    peers = manager(clock)
+    peers.add("http://manuell")
+    for _ in range(20):
+        assert not peers.record_failure("http://manuell")
+    assert "http://manuell" in peers
+    assert peers.snapshot()[0]["backoff_s"] == BACKOFF_MAX
+
+
+def test_eviction_and_max_peers():
+    clock = FakeClock()
+    peers = manager(clock, max_peers=3)
+    assert peers.add("http://a", DISCOVERED)
+    assert peers.add("http://b", DISCOVERED)
+    assert peers.add("http://c", DISCOVERED)
+    assert not peers.add("http://d", DISCOVERED)   # voll
+    assert peers.add("http://manuell")               # manuell geht immer
+    assert len(peers) == 4
+
+    # Entdeckte Peers fliegen nach EVICT_AFTER Fehlern in Folge raus, dann ist wieder Platz
+    for n in range(EVICT_AFTER - 1):
+        assert not peers.record_failure("http://a")
+    assert peers.record_failure("http://a")
+    assert "http://a" not in peers and peers.evicted_count == 1
+    assert not peers.add("http://d", DISCOVERED)   # mit dem manuellen Peer immer noch 3
+    peers.remove("http://manuell")
+    assert peers.add("http://d", DISCOVERED)
+
+    # Erneut manuell registriert: bleibt trotz Fehlern
+    assert not peers.add("http://b", MANUAL)
+    for _ in range(EVICT_AFTER * 2):
+        peers.record_failure("http://b")
+    assert "http://b" in peers
+
+
+def test_score_from_reliability_and_latency():
+    clock = FakeClock()
+    peers = manager(clock)
+    for address in ("http://schnell", "http://langsam", "http://unzuverlaessig"):
+        peers.add(address)
+    peers.record_success("http://schnell", latency=0.01)
+    peers.record_success("http://langsam", latency=0.5)
+    peers.record_success("http://unzuverlaessig", latency=0.01)
+    for _ in range(3):
+        peers.record_failure("http://unzuverlaessig")
+    clock.now += BACKOFF_MAX
+
+    # Gleitendes Mittel der Latenz
+    peers.record_success("http://langsam", latency=0.1)
+    latency = next(peer for peer in peers.snapshot() if peer["address"] == "http://langsam")["latency_ms"]
+    assert latency == round((LATENCY_ALPHA * 0.1 + (1 - LATENCY_ALPHA) * 0.5) * 1000, 2)
+
+    # Score = Zuverlässigkeit (mit je einem Erfolg/Fehler als Startwert) mal 0.1 / (0.1 + Latenz)
+    scores = {peer["address"]: peer["score"] for peer in peers.snapshot()}
+    assert scores["http://schnell"] == round(2 / 3 * 0.1 / 0.11, 4)
+    assert scores["http://unzuverlaessig"] == round(2 / 6 * 0.1 / 0.11, 4)
+    assert scores["http://langsam"] == round(3 / 4 * 0.1 / (0.1 + latency / 1000), 4)
+    assert peers.sync_targets(count=3) == ["http://schnell", "http://unzuverlaessig", "http://langsam"]
+    assert peers.sync_targets() == peers.sync_targets(count=peers.sync_peers)
+    assert [peer["address"] for peer in peers.snapshot()] == peers.sync_targets(count=3)
+
+
+def good_and_bad(clock: FakeClock) -> PeerManager:
+    peers = manager(clock, fanout=1)
+    peers.add("http://gut")
+    peers.add("http://schlecht")
+    for _ in range(9):
+        peers.record_success("http://gut", latency=0.01)
+    peers.record_success("http://schlecht", latency=0.4)
+    peers.record_failure("http://schlecht")
+    return peers
+
+
+def test_weighted_gossip_selection():
+    clock = FakeClock()
+    peers, again = good_and_bad(clock), good_and_bad(clock)
+    clock.now += BACKOFF_BASE
+
+    draws = [peers.gossip_targets()[0] for _ in range(2000)]
+    # Gewichte etwa 0.83 zu 0.1 (erwartet ~89 % für den guten Peer):
+    # der schlechte Peer wird selten, aber nicht nie gewählt
+    assert 1700 < draws.count("http://gut") < 1950
+
+    # Gleicher Seed, gleiche Auswahl
+    assert [again.gossip_targets()[0] for _ in range(2000)] == draws
+
+
+def test_gossip_respects_fanout_exclude_and_backoff():
+    clock = FakeClock()
+    peers = manager(clock, fanout=2)
+    for n in range(5):
+        peers.add(f"http://{n}")
+    peers.record_failure("http://0")
+
+    for _ in range(50):
+        targets = peers.gossip_targets(exclude=["http://1"])
+        assert len(targets) == 2 and len(set(targets)) == 2
+        assert "http://0" not in targets and "http://1" not in targets
+    assert sorted(peers.gossip_targets(exclude=["http://1", "http://2", "http://3"])) == ["http://4"]
+
+
+def test_due_for_heartbeat():
+    clock = FakeClock()
+    peers = manager(clock)
+    peers.add("http://a")
+    peers.add("http://b")
+    peers.record_tip("http://a", 5, "ab")
+    assert peers.due_for_heartbeat(30) == ["http://b"]
+    clock.now += 30
+    assert sorted(peers.due_for_heartbeat(30)) == ["http://a", "http://b"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Unit-Tests für ChainStore: Snapshots, Transaktions-Index und beschädigtes
+Ende von blocks.dat (ohne laufenden Node)
+
+Aufruf:
+    python3 -m pytest test_storage.py
+"""
+
+import os
+
+from blockchain import PRUNE_BATCH, Blockchain
+from storage import BLOCKS_FILE, ChainStore
+
+
+def fill(blockchain: Blockchain, blocks: int):
+    for n in range(blocks * blockchain.max_transactions_per_block):
+        blockchain.add_transaction(f"Spender{n}", "UNICEF" if n % 2 else "WWF", 10 + n)
+
+
+def test_snapshot_round_trip(tmp_path):
+    blockchain = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=4)
+    fill(blockchain, 6)
+    assert len(blockchain.chain) == 7
+    assert list(ChainStore(str(tmp_path)).load_snapshots())
+
+    restored = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=4)
+    assert [block.hash for block in restored.chain] == [block.hash for block in blockchain.chain]
+    assert restored._snapshot_height > 1  # aus dem Snapshot fortgesetzt, nicht alles nachgespielt
+    assert restored.get_donation_totals() == blockchain.get_donation_totals()
+    # Transaktionen und Index erst bei Bedarf gelesen
+    assert restored._tx_index is None
+    assert restored.chain[1]._transactions is None
+    assert restored.tx_index == blockchain.tx_index
+    assert restored.chain[1].transactions == blockchain.chain[1].transactions
+    assert restored.analytics.to_dict() == blockchain.analytics.to_dict()
+    assert restored.validated_height == len(restored.chain)
+    assert restored.is_chain_valid()
+
+
+def test_torn_tail_truncated(tmp_path):
+    blockchain = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)))
+    fill(blockchain, 3)
+    path = os.path.join(str(tmp_path), BLOCKS_FILE)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 10)  # Absturz mitten im letzten Datensatz
+
+    restored = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)))
+    assert [block.hash for block in restored.chain] == [block.hash for block in blockchain.chain[:-1]]
+    assert restored.is_chain_valid()
+    assert os.path.getsize(path) < size - 10
+
+    # Weiterschreiben hinter dem abgeschnittenen Ende bleibt lesbar
+    fill(restored, 1)
+    reloaded = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)))
+    assert [block.hash for block in reloaded.chain] == [block.hash for block in restored.chain]
+
+
+def test_tx_index_after_pruning_and_crash(tmp_path):
+    blockchain = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=10, prune_depth=5)
+    fill(blockchain, PRUNE_BATCH + 10)
+    assert blockchain.chain[1].pruned
+    tx_index = dict(blockchain.tx_index)
+
+    # IDs gekürzter Blöcke bleiben nach dem Neustart bekannt
+    restored = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=10, prune_depth=5)
+    assert restored.tx_index == tx_index
+    first_id = next(tx_id for tx_id, index in tx_index.items() if index == 1)
+    assert restored.find_transaction(first_id)["status"] == "confirmed"
+
+    # Absturz zwischen blocks.dat und txindex.dat: fehlende Einträge werden nachgetragen
+    height = len(blockchain.chain)
+    ChainStore(str(tmp_path)).replace_tx_ids_from(height - 3, [], height - 3)
+    restored = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=10, prune_depth=5)
+    assert ChainStore(str(tmp_path)).tx_index_height() == height
+    assert restored.tx_index == tx_index
+
+
+def test_audit_finds_damaged_block(tmp_path):
+    blockchain = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=4)
+    fill(blockchain, 6)
+    assert blockchain.chain_valid is None
+    assert blockchain.audit_chain()
+
+    # Betrag in Block 1 auf der Disk verändern (vor dem Snapshot, wird beim Laden nicht geprüft)
+    path = os.path.join(str(tmp_path), BLOCKS_FILE)
+    with open(path, "rb") as f:
+        data = f.read()
+    donor = b"Spender0"
+    position = data.index(donor) + len(donor) + 1
+    with open(path, "wb") as f:
+        f.write(data[:position] + bytes([data[position] ^ 0x01]) + data[position + 1:])
+
+    restored = Blockchain(difficulty=1, store=ChainStore(str(tmp_path)), snapshot_interval=4)
+    assert len(restored.chain) == len(blockchain.chain)
+    assert not restored.audit_chain()
+    assert restored.chain_valid is False
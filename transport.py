@@ -0,0 +1,23 @@
+import requests
+
+
+class HttpTransport:
+    """
+    Standard-Transport für Anfragen an Peers (echtes HTTP über requests).
+    Eine Session hält Verbindungen offen (Keep-Alive), statt bei jedem
+    Broadcast neu zu verbinden.
+
+    Alle Peer-Anfragen in node.py laufen über ein Transport-Objekt, damit es
+    z.B. im Cluster-Harness (cluster.py) durch ein simuliertes Netzwerk
+    ersetzt werden kann. Fehler werden als requests.exceptions.RequestException
+    gemeldet.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.session.post(url, **kwargs)